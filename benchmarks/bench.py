@@ -0,0 +1,297 @@
+"""
+bench.py times the public validation functions over the per-feature corpora
+in benchmarks.corpora and writes the results as JSON, so that runs made on
+different commits can be compared.
+
+    python -m benchmarks.bench run --engine scanner --output new.json
+    python -m benchmarks.bench compare old.json new.json
+    python -m benchmarks.bench lists --engine pyparsing
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import pyparsing
+
+from benchmarks.corpora import CORPORA
+from edtf_validate import valid_edtf
+
+FUNCTIONS = [
+    'is_valid',
+    'isLevel0',
+    'isLevel1',
+    'isLevel2',
+    'conformsLevel0',
+    'conformsLevel1',
+    'conformsLevel2',
+    'is_valid_interval',
+]
+PERCENTILES = (50, 90, 99)
+# Budget for importing valid_edtf once pyparsing is loaded, checked on every run.
+IMPORT_TARGET_MS = 50
+# Run in a fresh interpreter: times the import, then the first call that
+# needs each level, which is when that level's grammar gets built.
+STARTUP_CODE = """
+import sys
+import time
+import pyparsing
+start = time.perf_counter_ns()
+from edtf_validate import valid_edtf
+times = [time.perf_counter_ns() - start]
+for candidate in ('1985-04-12', '1985-04-12?', '[1667,1668]'):
+    start = time.perf_counter_ns()
+    valid_edtf.is_valid(candidate, engine=sys.argv[1])
+    times.append(time.perf_counter_ns() - start)
+print(' '.join(map(str, times)))
+"""
+STARTUP_STEPS = ('import', 'first_level0', 'first_level1', 'first_level2')
+# numbers of elements in the lists timed by the lists command
+LIST_LENGTHS = (10, 100, 1000, 10000, 100000)
+
+
+def percentile(sorted_values, pct):
+    """Return the nearest-rank percentile of an already sorted list."""
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[rank - 1]
+
+
+def summarize(timings):
+    """Turn a list of per-call nanosecond timings into result statistics."""
+    timings = sorted(timings)
+    total = sum(timings)
+    result = {
+        'calls': len(timings),
+        'total_s': total / 1e9,
+        'throughput_per_s': len(timings) / (total / 1e9) if total else 0.0,
+        'mean_us': total / len(timings) / 1e3,
+        'max_us': timings[-1] / 1e3,
+    }
+    for pct in PERCENTILES:
+        result['p%d_us' % pct] = percentile(timings, pct) / 1e3
+    return result
+
+
+def time_calls(function, candidates, rounds):
+    """Call function on every candidate rounds times, timing each call."""
+    clock = time.perf_counter_ns
+    timings = []
+    for _ in range(rounds):
+        for candidate in candidates:
+            start = clock()
+            function(candidate)
+            timings.append(clock() - start)
+    return timings
+
+
+def time_startup(engine, runs):
+    """Time the import and first calls of valid_edtf in fresh interpreters."""
+    timings = {step: [] for step in STARTUP_STEPS}
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', STARTUP_CODE, engine])
+        for step, nanoseconds in zip(STARTUP_STEPS, output.split()):
+            timings[step].append(int(nanoseconds))
+    return {'startup/%s' % step: summarize(timings[step]) for step in STARTUP_STEPS}
+
+
+def peak_memory(function, candidates):
+    """Return the peak KiB allocated while calling function on the candidates."""
+    tracemalloc.start()
+    try:
+        for candidate in candidates:
+            function(candidate)
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def time_lists(engine, lengths, rounds):
+    """Time is_valid on choice and inclusive lists of each length."""
+    results = {}
+    for length in lengths:
+        lists = {
+            # plain dates ending in an open range: listElement then later
+            'choice': '[%s,1990..]' % ','.join(
+                '%04d-%02d' % (1000 + i % 900, i % 12 + 1) for i in range(length)),
+            # qualified and unspecified dates with ranges, as in ledgers
+            'inclusive': '{%s}' % ','.join(
+                '%04d?-%02d-~%02d' % (1000 + i % 900, i % 12 + 1, i % 28 + 1) if i % 3 == 0
+                else '%04d-%02d-XX' % (1000 + i % 900, i % 12 + 1) if i % 3 == 1
+                else '%04d..%04d' % (1000 + i % 900, 1001 + i % 900)
+                for i in range(length)),
+        }
+        for kind, candidate in sorted(lists.items()):
+            assert valid_edtf.is_valid(candidate, engine=engine)
+            result = summarize(time_calls(
+                lambda candidate: valid_edtf.is_valid(candidate, engine=engine),
+                [candidate], rounds))
+            result['elements'] = length
+            result['per_element_us'] = result['mean_us'] / length
+            results['lists/%s/%d' % (kind, length)] = result
+    return results
+
+
+def print_lists(results, out=sys.stdout):
+    out.write('%-30s %12s %14s\n' % ('benchmark', 'mean ms', 'us/element'))
+    for key, result in sorted(results.items(), key=lambda item: (
+            item[0].split('/')[1], item[1]['elements'])):
+        out.write('%-30s %12.2f %14.2f\n' % (
+            key, result['mean_us'] / 1e3, result['per_element_us']))
+
+
+def bound(name, engine):
+    """Return the named valid_edtf function with the engine filled in."""
+    function = getattr(valid_edtf, name)
+    if name == 'is_valid_interval':
+        # Interval checking happens after parsing and has no engine.
+        return function
+    return lambda candidate: function(candidate, engine=engine)
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(engine, rounds, corpora, functions, startup_runs=5, packrat=None, memory=False):
+    """Time each function on each corpus and return the results document."""
+    results = time_startup(engine, startup_runs) if startup_runs else {}
+    if packrat:
+        valid_edtf.enable_packrat(packrat)
+    for corpus_name in corpora:
+        candidates = CORPORA[corpus_name]
+        for name in functions:
+            if name == 'is_valid_interval':
+                candidates_used = [c for c in candidates if '/' in c]
+                if not candidates_used:
+                    continue
+            else:
+                candidates_used = candidates
+            function = bound(name, engine)
+            # Warm up so one-time costs are not counted in the first round.
+            for candidate in candidates_used:
+                function(candidate)
+            timings = time_calls(function, candidates_used, rounds)
+            result = results['%s/%s' % (corpus_name, name)] = summarize(timings)
+            if memory:
+                result['peak_kib'] = peak_memory(function, candidates_used)
+    valid_edtf.disable_packrat()
+    return {
+        'meta': {
+            'revision': git_revision(),
+            'engine': engine,
+            'rounds': rounds,
+            'packrat': packrat,
+            'import_target_ms': IMPORT_TARGET_MS,
+            'python': platform.python_version(),
+            'pyparsing': pyparsing.__version__,
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        },
+        'results': results,
+    }
+
+
+def print_results(document, out=sys.stdout):
+    meta = document['meta']
+    out.write('revision=%s engine=%s packrat=%s rounds=%s python=%s pyparsing=%s\n' % (
+        meta['revision'], meta['engine'], meta.get('packrat'), meta['rounds'],
+        meta['python'], meta['pyparsing']))
+    out.write('%-40s %12s %10s %10s %10s %10s\n' % (
+        'benchmark', 'calls/s', 'p50 us', 'p90 us', 'p99 us', 'peak KiB'))
+    for key, result in sorted(document['results'].items()):
+        out.write('%-40s %12.0f %10.1f %10.1f %10.1f %10s\n' % (
+            key, result['throughput_per_s'], result['p50_us'],
+            result['p90_us'], result['p99_us'],
+            '%.0f' % result['peak_kib'] if 'peak_kib' in result else '-'))
+    if 'startup/import' in document['results']:
+        import_ms = document['results']['startup/import']['p50_us'] / 1e3
+        out.write('import p50 %.1f ms, target %d ms: %s\n' % (
+            import_ms, meta['import_target_ms'],
+            'ok' if import_ms <= meta['import_target_ms'] else 'OVER'))
+
+
+def compare(old, new, out=sys.stdout):
+    """Print the p50 latency and throughput change of each shared benchmark."""
+    out.write('old: %s %s  new: %s %s\n' % (
+        old['meta']['revision'], old['meta']['engine'],
+        new['meta']['revision'], new['meta']['engine']))
+    out.write('%-40s %10s %10s %9s\n' % ('benchmark', 'old p50', 'new p50', 'speedup'))
+    for key in sorted(set(old['results']) & set(new['results'])):
+        old_p50 = old['results'][key]['p50_us']
+        new_p50 = new['results'][key]['p50_us']
+        old_rate = old['results'][key]['throughput_per_s']
+        new_rate = new['results'][key]['throughput_per_s']
+        speedup = new_rate / old_rate if old_rate else float('nan')
+        out.write('%-40s %10.1f %10.1f %8.2fx\n' % (key, old_p50, new_p50, speedup))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark edtf_validate.')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+    run_parser = commands.add_parser('run', help='time the validation functions')
+    run_parser.add_argument('--engine', choices=sorted(valid_edtf.ENGINES),
+                            default=valid_edtf.DEFAULT_ENGINE)
+    run_parser.add_argument('--rounds', type=int, default=5,
+                            help='passes over each corpus (default 5)')
+    run_parser.add_argument('--corpus', action='append', choices=sorted(CORPORA),
+                            help='corpus to run, repeatable (default all)')
+    run_parser.add_argument('--function', action='append', choices=FUNCTIONS,
+                            help='function to time, repeatable (default all)')
+    run_parser.add_argument('--startup-runs', type=int, default=5,
+                            help='fresh interpreters to time the import in, 0 to skip '
+                                 '(default 5)')
+    run_parser.add_argument('--packrat', type=int, metavar='SIZE',
+                            help='enable the grammar memo with this many entries')
+    run_parser.add_argument('--memory', action='store_true',
+                            help='also record the peak memory of one untimed pass')
+    run_parser.add_argument('-o', '--output', help='write the JSON results here')
+    lists_parser = commands.add_parser(
+        'lists', help='time is_valid on lists of growing length')
+    lists_parser.add_argument('--engine', choices=sorted(valid_edtf.ENGINES),
+                              default=valid_edtf.DEFAULT_ENGINE)
+    lists_parser.add_argument('--rounds', type=int, default=3,
+                              help='calls per list (default 3)')
+    lists_parser.add_argument('--length', type=int, action='append',
+                              help='elements per list, repeatable (default %s)' %
+                                   ', '.join(map(str, LIST_LENGTHS)))
+    lists_parser.add_argument('-o', '--output', help='write the JSON results here')
+    compare_parser = commands.add_parser('compare', help='compare two JSON results')
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        with open(args.old) as old_file, open(args.new) as new_file:
+            compare(json.load(old_file), json.load(new_file))
+        return
+    if args.command == 'lists':
+        results = time_lists(args.engine, args.length or LIST_LENGTHS, args.rounds)
+        print_lists(results)
+        if args.output:
+            with open(args.output, 'w') as output:
+                json.dump({'meta': {'revision': git_revision(), 'engine': args.engine,
+                                    'rounds': args.rounds,
+                                    'python': platform.python_version()},
+                           'results': results}, output, indent=2, sort_keys=True)
+        return
+    document = run(args.engine, args.rounds, args.corpus or list(CORPORA),
+                   args.function or FUNCTIONS, args.startup_runs, args.packrat,
+                   args.memory)
+    print_results(document)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(document, output, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
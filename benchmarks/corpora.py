@@ -0,0 +1,124 @@
+"""
+corpora.py holds the benchmark inputs, one list of candidates per EDTF
+feature so a change can be measured against the kind of string it affects.
+"""
+
+CORPORA = {
+    'level0_dates': [
+        '2001',
+        '0000',
+        '1000',
+        '1985-04',
+        '1985-04-12',
+        '2004-02-29',
+        '1900-12-31',
+        '0333-06-01',
+        '1964/2008',
+        '2004-06/2006-08',
+        '2004-02-01/2005-02-08',
+        '2004-02-01/2005',
+    ],
+    'level0_datetimes': [
+        '1985-04-12T23:20:30',
+        '1985-04-12T23:20:30Z',
+        '1985-04-12T23:20:30-04',
+        '1985-04-12T23:20:30+04:30',
+        '2004-01-01T10:10:10+05:00',
+        '2004-01-01T10:10:10-12',
+        '0000-01-01T00:00:00Z',
+        '2012-10-10T10:10:10+01',
+    ],
+    'level1_intervals': [
+        '1985-04-12/..',
+        '../1985-04-12',
+        '1985-04-12/',
+        '/1985-04-12',
+        '1985-04/..',
+        '../1985',
+        '1984~/2004-06',
+        '1984/2004-06~',
+        '1984?/2004%',
+        '1984-06-02?/2004-08-08~',
+        '2004-06-~01/2004-06-~20',
+        '2004-06-XX/2004-07-03',
+    ],
+    'seasons': [
+        '2001-21',
+        '2001-24',
+        '-2001-22',
+        '2001-21?',
+        '2001-33',
+        '2001-41',
+        '2001-39',
+        '2001-21/2002-24',
+        '2001-22/2001-23',
+        '2001-24/2002-21',
+    ],
+    'unspecified': [
+        '201X',
+        '20XX',
+        '2004-XX',
+        '1985-04-XX',
+        '1985-XX-XX',
+        '-1XXX-XX',
+        '1XXX-12',
+        '156X-12-25',
+        '15XX-12-XX',
+        'XXXX-12-XX',
+        '1984-1X',
+        '156X-12-2X',
+    ],
+    'long_years': [
+        'Y170000002',
+        'Y-170000002',
+        'Y17E7',
+        'Y-17E7',
+        'Y171010000S3',
+        'Y3388E2S3',
+        '1950S2',
+        'Y17101E4S3',
+        'Y-17101E4S3',
+    ],
+    'level2_lists': [
+        '[1667,1668,1670..1672]',
+        '[..1760-12-03]',
+        '[1760-12..]',
+        '[1760-01,1760-02,1760-12..]',
+        '[1667,1760-12]',
+        '[..1984]',
+        '{1667,1668,1670..1672}',
+        '{1960,1961-12}',
+        '{..1984}',
+        '[1667,1668,1670..1672,1678-12..1680-06]',
+        '{-1667,1668?,1670..1672,1678-12-%01}',
+        '2004-06-~01/2004-06-~20',
+        '?2004-06-~01/2004-06-~20',
+    ],
+    'junk': [
+        'Jan 12, 1990',
+        'n.d.',
+        'circa 1900',
+        'unknown',
+        '',
+        '1990s',
+        '12/25/1990',
+        '2001-13',
+        '2001-02-30',
+        '1985-04-12T25:20:30',
+        '[1667,1668',
+        '2004/2001',
+        '2001-21-01',
+        '1984-06-02?/2004-08-08~/2004',
+        '    ',
+    ],
+}
+
+# lists long enough to show how parsing scales with the number of elements
+CORPORA['long_lists'] = [
+    '[%s]' % ','.join('%04d-%02d' % (1000 + i, i % 12 + 1) for i in range(count))
+    for count in (20, 100, 200)
+] + [
+    '{%s}' % ','.join('%04d?-%02d-~%02d' % (1000 + i, i % 12 + 1, i % 28 + 1)
+                      for i in range(count))
+    for count in (20, 100, 200)
+]
@@ -0,0 +1,248 @@
+"""
+aio.py validates candidates from asyncio code without blocking the event
+loop. The parsing is done in an executor, a process pool by default, in
+batches, so the loop only hands batches over and collects the results;
+loop latency stays flat while throughput grows with the number of
+workers.
+
+    results = [await avalidate(candidate) for candidate in candidates]
+    async for valid in avalidate_stream(records()):
+        ...
+"""
+import asyncio
+import collections
+import concurrent.futures
+import multiprocessing
+import os
+
+from edtf_validate import valid_edtf
+
+
+def _validate_batch(edtf_candidates, level, engine):
+    """Validate a batch of candidates in an executor worker."""
+    return list(valid_edtf.validate_many(edtf_candidates, level, engine))
+
+
+def _executor_context():
+    """Return the context of the worker processes, started without forking.
+
+    The processes are started from a running event loop, whose process
+    usually has other threads, and forking such a process can leave a lock
+    held in the child; forkserver starts them from a clean process instead.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context()
+
+
+def _init_executor_worker(engine, parent_limits, store_args):
+    """Set up a worker with the limits and verdict store of its parent.
+
+    store_args is the (path, generation) of the parent's VerdictStore, or
+    None. The worker opens its own connection, which never trims.
+    """
+    valid_edtf.limits = parent_limits
+    if store_args is not None:
+        from edtf_validate.store import VerdictStore
+        path, generation = store_args
+        valid_edtf.verdict_store = VerdictStore(path, None, generation)
+    valid_edtf._prewarm(engine)
+
+
+class AsyncValidator(object):
+    """Validates candidates for asyncio code in an executor, in batches.
+
+    Without an executor, a pool of workers processes (the number of CPUs
+    by default) is started when first needed and shut down by close; a
+    given executor is left to its owner. Concurrent calls to validate are
+    gathered into batches of up to batch_size, sent once the loop has run
+    the callbacks already scheduled. At most max_pending batches, two per
+    worker by default, are in the executor at once, counting those of
+    validate and validate_stream together: further batches wait their
+    turn, and validate_stream reads no further ahead of its consumer.
+    The workers are started without forking, where the platform allows,
+    and take on the limits and verdict store enabled when they start.
+    Results are those of validate_many with the given level and engine;
+    without an engine, the DEFAULT_ENGINE of this process when a batch
+    is sent.
+    """
+
+    def __init__(self, workers=None, engine=None, batch_size=256, max_pending=None,
+                 executor=None):
+        valid_edtf._engine(engine)
+        if batch_size < 1:
+            raise ValueError('batch_size must be at least 1')
+        if max_pending is not None and max_pending < 1:
+            raise ValueError('max_pending must be at least 1')
+        self.workers = workers or os.cpu_count() or 1
+        self.engine = engine
+        self.batch_size = batch_size
+        self.max_pending = max_pending or 2 * self.workers
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._loop = None
+        self._batches = {}
+        self._slots = None
+        self._tasks = set()
+
+    def _engine_name(self):
+        """Return the engine to send, resolved here rather than in a worker."""
+        return self.engine or valid_edtf.DEFAULT_ENGINE
+
+    def _get_executor(self):
+        if self._executor is None:
+            # the workers build the grammar themselves, off the event loop
+            store = valid_edtf.verdict_store
+            store_args = (store.path, store.generation) if store is not None else None
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                self.workers, mp_context=_executor_context(),
+                initializer=_init_executor_worker,
+                initargs=(self._engine_name(), valid_edtf.limits, store_args))
+        return self._executor
+
+    def _bind(self):
+        """Return the running loop, resetting the batching state of another."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._batches = {}
+            self._slots = asyncio.Semaphore(self.max_pending)
+            self._tasks = set()
+        return loop
+
+    async def validate(self, edtf_candidate, level=None):
+        """Return the validate_many result for one candidate.
+
+        Cancelling the call drops the candidate if its batch has not been
+        sent yet, and its result otherwise.
+        """
+        loop = self._bind()
+        future = loop.create_future()
+        batch = self._batches.setdefault(level, [])
+        batch.append((edtf_candidate, future))
+        if len(batch) >= self.batch_size:
+            self._send(level)
+        elif len(batch) == 1:
+            loop.call_soon(self._send, level)
+        return await future
+
+    def _send(self, level):
+        batch = self._batches.pop(level, None)
+        if batch:
+            task = self._loop.create_task(self._run_batch(batch, level))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch, level):
+        async with self._slots:
+            batch = [(candidate, future) for candidate, future in batch
+                     if not future.done()]
+            if not batch:
+                return
+            try:
+                results = await self._loop.run_in_executor(
+                    self._get_executor(), _validate_batch,
+                    [candidate for candidate, _ in batch], level, self._engine_name())
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def validate_stream(self, edtf_candidates, level=None):
+        """Yield the validate_many result of each candidate, in order.
+
+        edtf_candidates may be an async or a plain iterable. A batch is
+        sent once batch_size candidates have been read, and the last
+        partial one once the input ends. Closing or cancelling the
+        consumer cancels the batches not yet started.
+        """
+        loop = self._bind()
+        executor = self._get_executor()
+        slots = self._slots
+        engine = self._engine_name()
+        pending = collections.deque()
+
+        async def send(batch):
+            # a slot shared with validate, given back once the batch is done
+            await slots.acquire()
+            future = loop.run_in_executor(
+                executor, _validate_batch, batch, level, engine)
+            future.add_done_callback(lambda _: slots.release())
+            pending.append(future)
+
+        try:
+            batch = []
+            async for edtf_candidate in _aiter(edtf_candidates):
+                batch.append(edtf_candidate)
+                if len(batch) < self.batch_size:
+                    continue
+                await send(batch)
+                batch = []
+                if len(pending) >= self.max_pending:
+                    for result in await pending.popleft():
+                        yield result
+            if batch:
+                await send(batch)
+            while pending:
+                for result in await pending.popleft():
+                    yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def close(self, wait=True):
+        """Shut down the worker processes this validator started."""
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        # waiting for the workers to exit would block the loop
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+async def _aiter(iterable):
+    """Iterate over an async or a plain iterable asynchronously."""
+    if hasattr(iterable, '__aiter__'):
+        async for item in iterable:
+            yield item
+    else:
+        for item in iterable:
+            yield item
+
+
+# the AsyncValidator used by avalidate and avalidate_stream
+_default_validator = None
+
+
+def default_validator():
+    """Return the AsyncValidator of avalidate, creating it if needed."""
+    global _default_validator
+    if _default_validator is None:
+        _default_validator = AsyncValidator()
+    return _default_validator
+
+
+async def avalidate(edtf_candidate, level=None):
+    """Validate one candidate in the default validator's worker processes."""
+    return await default_validator().validate(edtf_candidate, level)
+
+
+def avalidate_stream(edtf_candidates, level=None):
+    """Validate an async or plain iterable with the default validator."""
+    return default_validator().validate_stream(edtf_candidates, level)
+
+
+def shutdown(wait=True):
+    """Shut down the default validator's worker processes, if started."""
+    global _default_validator
+    if _default_validator is not None:
+        _default_validator.close(wait)
+        _default_validator = None
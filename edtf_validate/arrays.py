@@ -0,0 +1,184 @@
+"""
+arrays.py validates NumPy arrays of candidates. Plain Level 0 dates,
+YYYY-MM seasons and Level 0 intervals of them are checked on whole columns
+of characters at once; only the rest is handed to valid_edtf one string at
+a time. NumPy is optional and only needed here.
+"""
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from edtf_validate import valid_edtf
+
+# the level code of a candidate that is not valid
+INVALID = -1
+# not decided by the vectorized checks, so left to valid_edtf
+_UNDECIDED = -2
+_ZERO = ord('0')
+_NINE = ord('9')
+# the layout of each width of Level 0 date, d standing for any digit
+_DATE_LAYOUTS = {4: 'dddd', 7: 'dddd-dd', 10: 'dddd-dd-dd'}
+# the longest candidate the vectorized checks decide
+_LONGEST_DECIDED = '0000-00-00/0000-00-00'
+if np is not None:
+    # days the grammar allows in each month, which is 29 for any February
+    _GRAMMAR_MONTH_DAYS = np.array([0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+    # days in each month of a common year
+    _MONTH_DAYS = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+def _follows(chars, offset, layout):
+    """Return the mask of rows whose characters from offset follow the layout."""
+    matches = np.ones(len(chars), dtype=bool)
+    for position, symbol in enumerate(layout):
+        column = chars[:, offset + position]
+        if symbol == 'd':
+            matches &= (column >= _ZERO) & (column <= _NINE)
+        else:
+            matches &= column == ord(symbol)
+    return matches
+
+
+def _number(chars, offset, width):
+    """Return the numbers written in the digit columns from offset."""
+    number = np.zeros(len(chars), dtype=np.int64)
+    for position in range(offset, offset + width):
+        number = number * 10 + (chars[:, position].astype(np.int64) - _ZERO)
+    return number
+
+
+def _date(chars, offset, width):
+    """Return (ok, year, month, day) of the Level 0 dates of a width at offset.
+
+    ok marks the rows the grammar accepts as non_negative_date; month and
+    day are 1 where the date does not give them.
+    """
+    ok = _follows(chars, offset, _DATE_LAYOUTS[width])
+    year = _number(chars, offset, 4)
+    month = np.ones(len(chars), dtype=np.int64)
+    day = np.ones(len(chars), dtype=np.int64)
+    if width > 4:
+        month = _number(chars, offset + 5, 2)
+        ok &= (month >= 1) & (month <= 12)
+        month = np.where(ok, month, 1)
+    if width > 7:
+        day = _number(chars, offset + 8, 2)
+        ok &= (day >= 1) & (day <= _GRAMMAR_MONTH_DAYS[month])
+    return ok, year, month, day
+
+
+def _is_real(year, month, day):
+    """Return the mask of dates that exist, taking leap years into account."""
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    return day <= _MONTH_DAYS[month] + ((month == 2) & leap)
+
+
+def _day_number(year, month, day):
+    """bounds.day_number on arrays."""
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def _decide_dates(chars, lengths, codes):
+    """Fill in the codes of the dates and YYYY-MM seasons of Level 0 shape."""
+    for width in _DATE_LAYOUTS:
+        if chars.shape[1] < width:
+            continue
+        rows = np.flatnonzero((lengths == width) & (codes == _UNDECIDED))
+        sample = chars[rows]
+        if width == 7:
+            shaped = _follows(sample, 0, 'dddd-dd')
+            rows, sample = rows[shaped], sample[shaped]
+            month = _number(sample, 5, 2)
+            # 21-24 are Level 1 seasons and 25-41 Level 2 ones
+            codes[rows] = np.select(
+                [(month >= 1) & (month <= 12), (month >= 21) & (month <= 24),
+                 (month >= 25) & (month <= 41)],
+                [0, 1, 2], INVALID)
+        else:
+            shaped = _follows(sample, 0, _DATE_LAYOUTS[width])
+            ok = _date(sample[shaped], 0, width)[0]
+            codes[rows[shaped]] = np.where(ok, 0, INVALID)
+
+
+def _decide_intervals(chars, lengths, codes):
+    """Fill in the codes of the intervals between two Level 0 dates."""
+    for start_width in _DATE_LAYOUTS:
+        for end_width in _DATE_LAYOUTS:
+            width = start_width + 1 + end_width
+            if chars.shape[1] < width:
+                continue
+            rows = np.flatnonzero(
+                (lengths == width) & (codes == _UNDECIDED)
+                & (chars[:, start_width] == ord('/')))
+            sample = chars[rows]
+            start_ok, start_year, start_month, start_day = _date(sample, 0, start_width)
+            end_ok, end_year, end_month, end_day = _date(sample, start_width + 1, end_width)
+            # anything else, seasons say, is left to the grammar
+            decided = start_ok & end_ok
+            in_order = (
+                _is_real(start_year, start_month, start_day)
+                & _is_real(end_year, end_month, end_day)
+                & (_day_number(start_year, start_month, start_day)
+                   <= _day_number(end_year, end_month, end_day))
+            )
+            codes[rows[decided]] = np.where(in_order[decided], 0, INVALID)
+
+
+def _as_strings(flat):
+    """Return the candidates as a unicode array, with '' for non strings."""
+    if flat.dtype.kind == 'U' or not len(flat):
+        return flat.astype(str, copy=False)
+    if flat.dtype.kind == 'S':
+        return np.char.decode(flat, 'latin-1')
+    if flat.dtype.kind == 'O':
+        return np.array([value if isinstance(value, str) else '' for value in flat],
+                        dtype=str)
+    raise TypeError('validate_array needs an array of strings, not {}'.format(flat.dtype))
+
+
+def validate_array(candidates, level=None, engine=None, codes=False):
+    """Validate an array of candidates, returning an array of the same shape.
+
+    The result is a bool array by default; with codes set it is an int8
+    array of the lowest level each candidate needs, or INVALID. level and
+    engine work as in validate_many, interval endpoints included.
+    candidates may be a str, bytes or object array (from a CSV load, say);
+    objects that are not strings, like None or NaN, are invalid.
+
+    Level 0 dates of the form YYYY, YYYY-MM or YYYY-MM-DD, YYYY-MM seasons
+    and intervals between two such dates are decided with array
+    arithmetic; each distinct candidate of any other form is validated
+    once by valid_edtf. With valid_edtf.enable_limits on, candidates
+    rejected by the limits are invalid, and unless the limits admit every
+    candidate of those forms, all are validated by valid_edtf.
+    """
+    if np is None:
+        raise ImportError('validate_array requires numpy: pip install edtf-validate[numpy]')
+    valid_edtf._check_level(level)
+    array = np.asarray(candidates)
+    flat = _as_strings(array.reshape(-1))
+    levels = np.full(len(flat), _UNDECIDED, dtype=np.int8)
+    if len(flat) and valid_edtf._limits_admit(_LONGEST_DECIDED):
+        flat = np.ascontiguousarray(flat)
+        # longer candidates are told apart by their lengths, so only as many
+        # characters as the longest decided one are needed
+        width = min(max(flat.dtype.itemsize // 4, 1), len(_LONGEST_DECIDED))
+        chars = flat.astype('U%d' % width).view(np.uint32).reshape(len(flat), width)
+        lengths = np.char.str_len(flat)
+        _decide_dates(chars, lengths, levels)
+        _decide_intervals(chars, lengths, levels)
+    rest = np.flatnonzero(levels == _UNDECIDED)
+    if len(rest):
+        engine_classify = valid_edtf._engine(engine)
+        pairs = valid_edtf._verdict_pairs(flat[rest].tolist(), engine_classify, {})
+        levels[rest] = [found if valid else INVALID for _, (found, valid) in pairs]
+    if level is not None:
+        levels[levels > level] = INVALID
+    levels = levels.reshape(array.shape)
+    return levels if codes else levels != INVALID
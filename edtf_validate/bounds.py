@@ -0,0 +1,216 @@
+"""
+bounds.py turns EDTF dates into proleptic Gregorian day numbers, so the
+endpoints of an interval can be put in order by comparing integers. Unlike
+datetime it handles year 0000, negative years and long years, and it works
+out the earliest and latest dates that unspecified X digits can stand for.
+"""
+import itertools
+import re
+
+# season start and end months for use in interval checking
+# erring toward inclusivity
+SEASON_MONTHS = {
+    21: (1, 5),
+    22: (5, 8),
+    23: (8, 11),
+    24: (10, 12),
+}
+# an endpoint written as '' or '..' is open or unknown
+OPEN = ('', '..')
+# Long years of more digits than this are not worked out: their days are far
+# beyond what a 64-bit integer holds, and the year itself could take seconds
+# to compute. They resolve to SATURATED_YEAR, or its negative, instead.
+MAX_YEAR_DIGITS = 18
+SATURATED_YEAR = 10 ** MAX_YEAR_DIGITS
+
+_DATE = re.compile(r'(-?)([0-9X]{4})(?:-([0-9X]{2}))?(?:-([0-9X]{2}))?')
+_LONG_YEAR = re.compile(r'Y(-?)([0-9]+)(?:E([0-9]+))?')
+# qualifiers, and the whitespace the grammar skips between tokens
+_IGNORED = str.maketrans('', '', '?~% \t\n\r')
+
+
+def is_leap(year):
+    """Return whether the proleptic Gregorian year has a 29th of February."""
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def days_in_month(year, month):
+    if month == 2:
+        return 29 if is_leap(year) else 28
+    return 30 if month in (4, 6, 9, 11) else 31
+
+
+def day_number(year, month=1, day=1):
+    """Return the number of days from 1970-01-01 to the given date.
+
+    Years are astronomical, so 0000 is 1 BC and -0001 is 2 BC.
+    """
+    # days_from_civil, counting from a year that starts on the 1st of March
+    year -= month <= 2
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def _decimal(digits):
+    """Return the int of a string of decimal digits, however long."""
+    value = 0
+    for start in range(0, len(digits), 1000):
+        chunk = digits[start:start + 1000]
+        value = value * 10 ** len(chunk) + int(chunk)
+    return value
+
+
+def long_year_digits(digits, exponent):
+    """Return the number of digits of a long year's magnitude, 0 for zero.
+
+    digits and exponent are the strings written before and after its E;
+    exponent may be None. The year itself is never computed.
+    """
+    significant = digits.lstrip('0')
+    if not significant:
+        return 0
+    return len(significant) + _decimal(exponent or '0')
+
+
+def year_digits(date):
+    """Return the number of digits of the year of a date, at least four."""
+    match = _LONG_YEAR.fullmatch(date)
+    if match is None:
+        return 4
+    return max(long_year_digits(match.group(2), match.group(3)), 4)
+
+
+def _long_year_order(match):
+    """Return (sign, magnitude key) ordering the long year of a match exactly."""
+    sign, digits, exponent = match.groups()
+    significant = digits.lstrip('0')
+    if not significant:
+        return 0, ()
+    # of two magnitudes of as many digits, the one with the greater
+    # significant digits is greater
+    key = (long_year_digits(digits, exponent), significant.rstrip('0'))
+    return (-1 if sign else 1), key
+
+
+def _long_years_in_order(start, end):
+    """Return whether the long year start is not after the long year end."""
+    start_sign, start_key = _long_year_order(_LONG_YEAR.fullmatch(start))
+    end_sign, end_key = _long_year_order(_LONG_YEAR.fullmatch(end))
+    if start_sign != end_sign:
+        return start_sign < end_sign
+    if start_sign < 0:
+        return start_key >= end_key
+    return start_key <= end_key
+
+
+def _digits(pattern, descending):
+    """Yield the numbers a digit pattern stands for, X being any digit, in order."""
+    if 'X' not in pattern:
+        yield int(pattern)
+        return
+    any_digit = '9876543210' if descending else '0123456789'
+    choices = [any_digit if char == 'X' else char for char in pattern]
+    for digits in itertools.product(*choices):
+        yield int(''.join(digits))
+
+
+def _month_day(year, month, day, latest):
+    """Return the earliest or latest (month, day) the patterns allow in year."""
+    for month_number in _digits(month, latest):
+        if not 1 <= month_number <= 12:
+            continue
+        if day is None:
+            return month_number, None
+        month_length = days_in_month(year, month_number)
+        for day_of_month in _digits(day, latest):
+            if 1 <= day_of_month <= month_length:
+                return month_number, day_of_month
+    return None
+
+
+def resolve(date, latest=False):
+    """Return the earliest or latest (year, month, day, season) of a date.
+
+    The date is a year, year-month, year-month-day or year-season without
+    qualifiers, possibly with X digits, or a long year. month and day are
+    None where the date does not give them; a season gives its first or
+    last month in SEASON_MONTHS and its number. A long year of more than
+    MAX_YEAR_DIGITS digits resolves to SATURATED_YEAR, or its negative.
+    Returns None if the date is none of these or names no real day, like
+    2015-02-29.
+    """
+    match = _LONG_YEAR.fullmatch(date)
+    if match:
+        sign, digits, exponent = match.groups()
+        if long_year_digits(digits, exponent) > MAX_YEAR_DIGITS:
+            year = SATURATED_YEAR
+        else:
+            year = int(digits.lstrip('0') or '0') * 10 ** int(exponent or 0)
+        return -year if sign else year, None, None, None
+    match = _DATE.fullmatch(date)
+    if match is None:
+        return None
+    sign, year, month, day = match.groups()
+    negative = sign == '-'
+    # the latest of negative years is the one with the smallest magnitude
+    magnitudes = _digits(year, latest != negative)
+    if negative:
+        # there is no year -0000, so X digits never stand for it
+        magnitudes = (magnitude for magnitude in magnitudes if magnitude)
+    if month is not None and 'X' not in month and int(month) in SEASON_MONTHS:
+        magnitude = next(magnitudes, None)
+        if day is not None or magnitude is None:
+            return None
+        season = int(month)
+        return -magnitude if negative else magnitude, SEASON_MONTHS[season][latest], None, season
+    for magnitude in magnitudes:
+        year_number = -magnitude if negative else magnitude
+        if month is None:
+            return year_number, None, None, None
+        month_day = _month_day(year_number, month, day, latest)
+        if month_day is not None:
+            return (year_number,) + month_day + (None,)
+        if _month_day(2000, month, day, latest) is None:
+            # not even a leap year has such a day, so no year will
+            return None
+    return None
+
+
+def first_day(resolved):
+    """Return the day number of the first day of a resolved date."""
+    year, month, day, _ = resolved
+    return day_number(year, month or 1, day or 1)
+
+
+def last_day(resolved):
+    """Return the day number of the last day of a resolved date."""
+    year, month, day, _ = resolved
+    month = month or 12
+    return day_number(year, month, day or days_in_month(year, month))
+
+
+def in_order(start, end):
+    """Return whether an interval from start to end can be in order.
+
+    start and end may carry qualifiers and whitespace. The start is taken
+    at the earliest and the end at the latest its X digits and season
+    allow, both at their own precision, and the interval is in order if
+    the end does not begin before the start. Open or unknown ends are in
+    order with any date.
+    """
+    start = start.translate(_IGNORED)
+    end = end.translate(_IGNORED)
+    first = None if start in OPEN else resolve(start)
+    last = None if end in OPEN else resolve(end, latest=True)
+    if first is None or last is None:
+        return (first is not None or start in OPEN) and (last is not None or end in OPEN)
+    if abs(first[0]) == SATURATED_YEAR and first[0] == last[0]:
+        # both long years too large to work out, so compare their digits
+        return _long_years_in_order(start, end)
+    if first[3] and last[3] and first[0] == last[0]:
+        # seasons of one year overlap in SEASON_MONTHS, so go by number
+        return first[3] <= last[3]
+    return first_day(first) <= first_day(last)
@@ -0,0 +1,149 @@
+"""
+columns.py validates whole columns: pandas Series and Arrow arrays. A column
+is dictionary encoded, or its existing categories or dictionary used, so
+only its distinct values are validated, by arrays.validate_array, and the
+results are then taken back to every row by their codes. pandas and
+pyarrow are optional and only needed here; importing this module with
+pandas installed adds the `edtf` accessor to Series:
+
+    series.edtf.is_valid()
+    series.edtf.level()
+"""
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    pd = None
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover
+    pa = None
+
+from edtf_validate import valid_edtf
+from edtf_validate.arrays import INVALID, validate_array
+
+# the levels, in the order of the categories of column_levels results
+LEVELS = (0, 1, 2)
+
+
+def _is_series(column):
+    return pd is not None and isinstance(column, pd.Series)
+
+
+def _is_arrow(column):
+    return pa is not None and isinstance(column, (pa.Array, pa.ChunkedArray))
+
+
+def _distinct_levels(values, level, engine):
+    """Return the level codes of the distinct values, then INVALID.
+
+    Indexed with the codes of the rows, the last entry is the one of a
+    code of -1, which stands for a missing value.
+    """
+    distinct = np.empty(len(values) + 1, dtype=np.int8)
+    distinct[:-1] = validate_array(np.asarray(values, dtype=object), level, engine,
+                                   codes=True)
+    distinct[-1] = INVALID
+    return distinct
+
+
+def _row_levels(codes, values, level, engine):
+    """Return the level code of each row from its code into the distinct values."""
+    return _distinct_levels(values, level, engine)[codes]
+
+
+def _series_levels(series, level, engine):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, values = series.cat.codes.to_numpy(), series.cat.categories
+    else:
+        codes, values = pd.factorize(series)
+    return _row_levels(codes, values, level, engine)
+
+
+def _arrow_codes(array):
+    """Return the codes of a dictionary Array as a NumPy array, -1 if missing."""
+    return array.indices.fill_null(-1).to_numpy(zero_copy_only=False)
+
+
+def _map_arrow(column, level, engine, function):
+    """Apply function to the level codes of an Array, or of each chunk of a ChunkedArray.
+
+    The chunks of a ChunkedArray are encoded with one dictionary, so each
+    distinct value is validated once for the whole column.
+    """
+    if not pa.types.is_dictionary(column.type):
+        column = column.dictionary_encode()
+    if isinstance(column, pa.Array):
+        values = column.dictionary.to_numpy(zero_copy_only=False)
+        return function(_row_levels(_arrow_codes(column), values, level, engine))
+    column = column.unify_dictionaries()
+    if not column.num_chunks:
+        return pa.chunked_array([], type=function(np.empty(0, dtype=np.int8)).type)
+    values = column.chunk(0).dictionary.to_numpy(zero_copy_only=False)
+    distinct = _distinct_levels(values, level, engine)
+    return pa.chunked_array([function(distinct[_arrow_codes(chunk)])
+                             for chunk in column.chunks])
+
+
+def _check(column, level):
+    if np is None:
+        raise ImportError('columns requires numpy: pip install edtf-validate[pandas]')
+    valid_edtf._check_level(level)
+    if not _is_series(column) and not _is_arrow(column):
+        raise TypeError('expected a pandas Series or a pyarrow Array or ChunkedArray, '
+                        'not {}'.format(type(column).__name__))
+
+
+def validate_column(column, level=None, engine=None):
+    """Validate a column, returning a bool column of the same kind.
+
+    column is a pandas Series, whose index and name are kept, or a pyarrow
+    Array or ChunkedArray. Missing values are invalid. level and engine
+    work as in validate_many. Each distinct value is validated once.
+    """
+    _check(column, level)
+    if _is_series(column):
+        levels = _series_levels(column, level, engine)
+        return pd.Series(levels != INVALID, index=column.index, name=column.name)
+    return _map_arrow(column, level, engine, lambda levels: pa.array(
+        levels != INVALID, type=pa.bool_()))
+
+
+def column_levels(column, engine=None):
+    """Return the lowest level each value of a column needs, as categories.
+
+    A pandas Series gives a categorical Series with categories LEVELS, and
+    a pyarrow Array a dictionary array of int8 levels; values that are not
+    valid are missing.
+    """
+    _check(column, None)
+    if _is_series(column):
+        levels = _series_levels(column, None, engine)
+        return pd.Series(pd.Categorical.from_codes(levels, categories=list(LEVELS)),
+                         index=column.index, name=column.name)
+
+    def dictionary_levels(levels):
+        return pa.DictionaryArray.from_arrays(
+            pa.array(levels, type=pa.int8(), mask=levels == INVALID),
+            pa.array(LEVELS, type=pa.int8()))
+    return _map_arrow(column, None, engine, dictionary_levels)
+
+
+if pd is not None:
+    @pd.api.extensions.register_series_accessor('edtf')
+    class EDTFAccessor(object):
+        """EDTF validation of a Series, as series.edtf."""
+
+        def __init__(self, series):
+            self._series = series
+
+        def is_valid(self, level=None, engine=None):
+            """Return validate_column of the Series."""
+            return validate_column(self._series, level, engine)
+
+        def level(self, engine=None):
+            """Return column_levels of the Series."""
+            return column_levels(self._series, engine)
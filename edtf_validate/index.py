@@ -0,0 +1,196 @@
+"""
+index.py holds RangeIndex, which answers which validated EDTF values overlap,
+fall within or contain a span of time without scanning them all. Every
+value is reduced to the earliest and latest day numbers valid_edtf.parse
+gives it, so open intervals, seasons, unspecified digits and lists are
+indexed by the whole span they can stand for.
+"""
+import bisect
+import heapq
+import itertools
+
+from edtf_validate import valid_edtf
+
+# day numbers standing in for the open or unknown end of a span
+BEFORE_ALL = float('-inf')
+AFTER_ALL = float('inf')
+
+
+def _span_key(entry):
+    return entry[0], entry[1]
+
+
+class _Run(object):
+    """A static set of spans sorted by start, searchable as a binary tree.
+
+    The tree is implicit: the root of the entries in [lo, hi) is the one at
+    their middle, and max_ends holds for each entry the latest end found in
+    the subtree it is the root of, which lets stabbing queries skip every
+    subtree that ends too early.
+    """
+
+    __slots__ = ('starts', 'ends', 'values', 'max_ends')
+
+    def __init__(self, entries):
+        self.starts = [entry[0] for entry in entries]
+        self.ends = [entry[1] for entry in entries]
+        self.values = [entry[2] for entry in entries]
+        self.max_ends = list(self.ends)
+        self._fill_max_ends(0, len(entries))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def entries(self):
+        return zip(self.starts, self.ends, self.values)
+
+    def _fill_max_ends(self, lo, hi):
+        if lo >= hi:
+            return BEFORE_ALL
+        mid = (lo + hi) // 2
+        latest = max(self.ends[mid],
+                     self._fill_max_ends(lo, mid),
+                     self._fill_max_ends(mid + 1, hi))
+        self.max_ends[mid] = latest
+        return latest
+
+    def stabbing(self, latest_start, earliest_end):
+        """Yield the entries that start by latest_start and end from earliest_end."""
+        starts, ends, max_ends = self.starts, self.ends, self.max_ends
+        # entries past this point start too late, and so do their subtrees
+        limit = bisect.bisect_right(starts, latest_start)
+        stack = [(0, len(starts))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi or lo >= limit:
+                continue
+            mid = (lo + hi) // 2
+            if max_ends[mid] < earliest_end:
+                continue
+            stack.append((lo, mid))
+            if mid < limit:
+                if ends[mid] >= earliest_end:
+                    yield starts[mid], ends[mid], self.values[mid]
+                stack.append((mid + 1, hi))
+
+    def starting_between(self, first, last):
+        """Yield the entries whose start is from first to last."""
+        lo = bisect.bisect_left(self.starts, first)
+        hi = bisect.bisect_right(self.starts, last)
+        for position in range(lo, hi):
+            yield self.starts[position], self.ends[position], self.values[position]
+
+
+class RangeIndex(object):
+    """An index of EDTF values by the span of days they can stand for.
+
+    Values are kept in runs of geometrically decreasing size that are
+    merged as they fill up, so a bulk build sorts once, an insert costs
+    O(log n) amortized and a query O(log^2 n + k) for k results. Queries
+    take an EDTF string, whose earliest and latest days are used, a day
+    number, or an (earliest, latest) pair of day numbers with None for an
+    open end. Results are the stored values in order of span.
+    """
+
+    def __init__(self, candidates=(), values=None, engine=None):
+        self.engine = engine
+        self._runs = []
+        # candidates that were not valid EDTF or were rejected by the
+        # limits of valid_edtf.enable_limits, and so are not indexed
+        self.skipped = 0
+        self.extend(candidates, values)
+
+    def __len__(self):
+        return sum(len(run) for run in self._runs)
+
+    def _entry(self, candidate, value, parsed):
+        result = parsed.get(candidate, False)
+        if result is False:
+            result = parsed[candidate] = valid_edtf.parse(candidate, self.engine)
+        if result is None or result is valid_edtf.TOO_EXPENSIVE:
+            self.skipped += 1
+            return None
+        return (BEFORE_ALL if result.earliest is None else result.earliest,
+                AFTER_ALL if result.latest is None else result.latest,
+                candidate if value is None else value)
+
+    def insert(self, candidate, value=None):
+        """Index one candidate, under value if given; return whether it was valid."""
+        return self.extend([candidate], None if value is None else [value]) == 1
+
+    def extend(self, candidates, values=None):
+        """Index many candidates at once; return how many were valid.
+
+        values, if given, are stored in place of the candidates, in step
+        with them.
+        """
+        parsed = {}
+        if values is None:
+            values = itertools.repeat(None)
+        entries = [
+            entry for entry in (
+                self._entry(candidate, value, parsed)
+                for candidate, value in zip(candidates, values)
+            ) if entry is not None
+        ]
+        if entries:
+            entries.sort(key=_span_key)
+            self._add_run(_Run(entries))
+        return len(entries)
+
+    def _add_run(self, run):
+        self._runs.append(run)
+        self._runs.sort(key=len, reverse=True)
+        # merge while the smallest run is at least half the next, which
+        # keeps O(log n) runs
+        while len(self._runs) > 1 and 2 * len(self._runs[-1]) >= len(self._runs[-2]):
+            smaller = self._runs.pop()
+            larger = self._runs.pop()
+            merged = _Run(list(heapq.merge(larger.entries(), smaller.entries(),
+                                           key=_span_key)))
+            self._runs.append(merged)
+            self._runs.sort(key=len, reverse=True)
+
+    def _span(self, query):
+        """Return the (earliest, latest) day numbers a query stands for."""
+        if isinstance(query, str):
+            result = valid_edtf.parse(query, self.engine)
+            if result is None:
+                raise ValueError('Not a valid EDTF query: {!r}'.format(query))
+            if result is valid_edtf.TOO_EXPENSIVE:
+                raise ValueError('EDTF query rejected by the limits: {!r}'.format(query))
+            earliest, latest = result.earliest, result.latest
+        elif isinstance(query, int):
+            earliest = latest = query
+        else:
+            earliest, latest = query
+        return (BEFORE_ALL if earliest is None else earliest,
+                AFTER_ALL if latest is None else latest)
+
+    def _results(self, entries):
+        return [entry[2] for entry in sorted(entries, key=_span_key)]
+
+    def overlapping(self, query):
+        """Return the values whose span shares at least a day with the query's."""
+        earliest, latest = self._span(query)
+        return self._results(itertools.chain.from_iterable(
+            run.stabbing(latest, earliest) for run in self._runs))
+
+    def containing(self, query):
+        """Return the values whose span covers all of the query's."""
+        earliest, latest = self._span(query)
+        return self._results(itertools.chain.from_iterable(
+            run.stabbing(earliest, latest) for run in self._runs))
+
+    def within(self, query):
+        """Return the values whose span lies inside the query's."""
+        earliest, latest = self._span(query)
+        return self._results(
+            entry for run in self._runs
+            for entry in run.starting_between(earliest, latest)
+            if entry[1] <= latest
+        )
+
+    def at(self, point):
+        """Return the values whose span includes the day, or every day of a date."""
+        return self.containing(point)
@@ -0,0 +1,130 @@
+"""
+limits.py holds the input limits and time budget that valid_edtf enforces
+once they have been turned on with valid_edtf.enable_limits, so that a
+hostile or garbage candidate is turned away instead of holding up the
+caller.
+"""
+import contextlib
+import re
+import threading
+import time
+
+from edtf_validate import bounds
+
+# a long year with an exponent, whose digits are not all written out
+_EXPONENT_YEAR = re.compile(r'Y-?([0-9]+)E([0-9]+)')
+
+
+class _TooExpensive(object):
+    """The type of TOO_EXPENSIVE."""
+
+    __slots__ = ()
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return 'TOO_EXPENSIVE'
+
+    def __reduce__(self):
+        # unpickles as the module's singleton, e.g. from a worker process
+        return 'TOO_EXPENSIVE'
+
+
+# returned instead of a result for candidates rejected by the Limits; false
+# like an invalid result, but not equal to False or to any level
+TOO_EXPENSIVE = _TooExpensive()
+
+
+class BudgetExceeded(Exception):
+    """Raised by checkpoint once the time budget of the call has run out."""
+
+
+_local = threading.local()
+
+
+def checkpoint():
+    """Raise BudgetExceeded if the current thread is past its deadline.
+
+    Called between levels of the grammar and for each distinct list element,
+    where a budget can run out; it costs an attribute lookup when no budget
+    is being enforced.
+    """
+    deadline = getattr(_local, 'deadline', None)
+    if deadline is not None and time.monotonic() > deadline:
+        raise BudgetExceeded()
+
+
+class Limits(object):
+    """Bounds on what a single call may be asked to validate.
+
+    max_length caps the length of a candidate, max_list_elements the number
+    of elements of a list and max_year_digits the longest run of digits,
+    which only long years, their exponents and significant digits can make
+    longer than four, and the number of digits a long year with an
+    exponent stands for. These are checked before any parsing. time_budget is
+    the number of seconds a call may spend parsing; it is checked at each
+    checkpoint, so it bounds the work left once the input limits have let
+    a candidate through rather than interrupting a parse. None turns a
+    limit off.
+    """
+
+    __slots__ = ('max_length', 'max_list_elements', 'max_year_digits', 'time_budget',
+                 '_long_digit_run')
+
+    def __init__(self, max_length=65536, max_list_elements=10000, max_year_digits=64,
+                 time_budget=None):
+        for name, value in (('max_length', max_length),
+                            ('max_list_elements', max_list_elements),
+                            ('max_year_digits', max_year_digits)):
+            if value is not None and value < 1:
+                raise ValueError('{} must be at least 1'.format(name))
+        if time_budget is not None and time_budget <= 0:
+            raise ValueError('time_budget must be positive')
+        self.max_length = max_length
+        self.max_list_elements = max_list_elements
+        self.max_year_digits = max_year_digits
+        self.time_budget = time_budget
+        self._long_digit_run = None
+        if max_year_digits is not None:
+            self._long_digit_run = re.compile('[0-9]{%d}' % (max_year_digits + 1))
+
+    def __repr__(self):
+        return ('Limits(max_length={}, max_list_elements={}, max_year_digits={}, '
+                'time_budget={})'.format(self.max_length, self.max_list_elements,
+                                         self.max_year_digits, self.time_budget))
+
+    def admits(self, edtf_candidate):
+        """Return whether the candidate is within the input limits."""
+        if self.max_length is not None and len(edtf_candidate) > self.max_length:
+            return False
+        # only lists have commas, one fewer than their elements
+        if (
+            self.max_list_elements is not None
+            and edtf_candidate.count(',') >= self.max_list_elements
+        ):
+            return False
+        if (
+            self._long_digit_run is not None
+            and self._long_digit_run.search(edtf_candidate) is not None
+        ):
+            return False
+        if self.max_year_digits is not None and 'E' in edtf_candidate:
+            for digits, exponent in _EXPONENT_YEAR.findall(edtf_candidate):
+                if bounds.long_year_digits(digits, exponent) > self.max_year_digits:
+                    return False
+        return True
+
+    @contextlib.contextmanager
+    def budget(self):
+        """Give the parsing done by this thread in the block time_budget seconds."""
+        if self.time_budget is None:
+            yield
+            return
+        outer = getattr(_local, 'deadline', None)
+        deadline = time.monotonic() + self.time_budget
+        _local.deadline = deadline if outer is None else min(outer, deadline)
+        try:
+            yield
+        finally:
+            _local.deadline = outer
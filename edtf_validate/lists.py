@@ -0,0 +1,130 @@
+"""
+lists.py recognizes the choiceList and inclusiveList of level 2 for every
+validation engine. An engine supplies its listElement, earlier, later and
+consecutives productions; the alternatives of listContent are then tried in
+the grammar's order, so the verdicts are the grammar's, but each production
+is run once per distinct element text. The alternatives of listContent walk
+the same elements up to three times and ledgers repeat the same values, so
+the rest are dictionary lookups and the cost grows linearly with the list.
+Elements without qualifiers or X digits, the bulk of most lists, skip the
+alternatives of listElement that need them.
+
+A production is a function that takes the candidate and a position and
+returns the position just past its match, or -1. No production can match a
+',', so what it matches at the start of an element depends only on the text
+up to the next ','.
+"""
+from edtf_validate.limits import checkpoint
+
+# The alternatives of listElement before consecutives all match one of
+# these, so on an element without them only consecutives and date can.
+_QUALIFIED_OR_UNSPECIFIED = frozenset('?~%X')
+
+
+class ListProductions(object):
+    """The list element productions of one engine."""
+
+    __slots__ = ('element', 'earlier', 'later', 'consecutives', 'date')
+
+    def __init__(self, element, earlier, later, consecutives, date):
+        self.element = element
+        self.earlier = earlier
+        self.later = later
+        self.consecutives = consecutives
+        self.date = date
+
+
+def _memoized(production, s, plain=None):
+    """Return production on s, remembering its result for each element text.
+
+    plain, if given, is run instead on texts with nothing from
+    _QUALIFIED_OR_UNSPECIFIED.
+    """
+    results = {}
+
+    def parse(i):
+        end = s.find(',', i)
+        text = s[i:end] if end >= 0 else s[i:]
+        try:
+            length = results[text]
+        except KeyError:
+            checkpoint()
+            if plain is not None and _QUALIFIED_OR_UNSPECIFIED.isdisjoint(text):
+                j = plain(s, i)
+            else:
+                j = production(s, i)
+            length = results[text] = j - i if j >= 0 else -1
+        return i + length if length >= 0 else -1
+    return parse
+
+
+def _elements_then_commas(element, s, i):
+    """ZeroOrMore(listElement ',')"""
+    while True:
+        j = element(i)
+        if j < 0 or not s.startswith(',', j):
+            return i
+        i = j + 1
+
+
+def _commas_then_elements(element, s, i):
+    """ZeroOrMore(',' listElement)"""
+    while s.startswith(',', i):
+        j = element(i + 1)
+        if j < 0:
+            break
+        i = j
+    return i
+
+
+def list_content(s, i, productions):
+    """Return the end of the listContent at i in s, or -1."""
+    def plain_element(s, i):
+        # consecutives needs a '..', and the text was checked before the ','
+        end = s.find(',', i)
+        if s.find('..', i, end if end >= 0 else len(s)) >= 0:
+            j = productions.consecutives(s, i)
+            if j >= 0:
+                return j
+        return productions.date(s, i)
+
+    element = _memoized(productions.element, s, plain_element)
+    earlier = _memoized(productions.earlier, s)
+    later = _memoized(productions.later, s)
+    consecutives = _memoized(productions.consecutives, s)
+    # earlier "," ZeroOrMore(listElement ",") later
+    j = earlier(i)
+    if j >= 0 and s.startswith(',', j):
+        k = later(_elements_then_commas(element, s, j + 1))
+        if k >= 0:
+            return k
+    # ZeroOrMore(listElement ",") consecutives
+    # ZeroOrMore(listElement ",") later
+    j = _elements_then_commas(element, s, i)
+    k = consecutives(j)
+    if k >= 0:
+        return k
+    k = later(j)
+    if k >= 0:
+        return k
+    # earlier ZeroOrMore("," listElement)
+    j = earlier(i)
+    if j >= 0:
+        return _commas_then_elements(element, s, j)
+    # listElement OneOrMore("," listElement)
+    j = element(i)
+    if j >= 0:
+        k = _commas_then_elements(element, s, j)
+        if k > j:
+            return k
+    return consecutives(i)
+
+
+def bracketed_list(s, i, opening, closing, productions):
+    """opening listContent closing"""
+    if not s.startswith(opening, i):
+        return -1
+    j = list_content(s, i + 1, productions)
+    if j >= 0 and s.startswith(closing, j):
+        return j + 1
+    return -1
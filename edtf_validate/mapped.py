@@ -0,0 +1,137 @@
+"""
+mapped.py validates very large newline-delimited files without making a
+string of every line. The file is memory-mapped and one regular expression
+runs over its bytes, stepping over the lines that are plain Level 0 dates
+(YYYY, YYYY-MM or YYYY-MM-DD), which make up most real dumps. Only the
+other lines are copied out, and a line is decoded and parsed only the
+first time it is seen, so a repeated value costs a dictionary lookup.
+What comes back is an array of the offsets or line numbers of the lines
+that are not valid rather than a result per line.
+
+Lines end with '\\n'; a '\\r' before it is dropped, as reading the file as
+text would. Lines that are not UTF-8 are invalid.
+"""
+import mmap
+import re
+from array import array
+
+from edtf_validate import valid_edtf
+from edtf_validate.cache import ResultCache
+
+_FEBRUARY_DAY = rb'(?:0[1-9]|[12]\d)'
+_DAY_30 = rb'(?:0[1-9]|[12]\d|30)'
+_DAY_31 = rb'(?:0[1-9]|[12]\d|3[01])'
+# Level 0 dates of fixed width that the grammar accepts, which allows the
+# 29th of any February
+_LEVEL0_DATE = (
+    rb'\d{4}(?:-(?:(?:0[13578]|1[02])(?:-' + _DAY_31 + rb')?'
+    rb'|(?:0[469]|11)(?:-' + _DAY_30 + rb')?'
+    rb'|02(?:-' + _FEBRUARY_DAY + rb')?))?'
+)
+# a run of lines that are such dates; bounded, as the time the expression
+# takes per line grows with the length of an unbounded run
+_LEVEL0_RUN = re.compile(rb'(?:' + _LEVEL0_DATE + rb'\r?(?:\n|\Z)){0,1024}')
+_NOTHING = re.compile(b'')
+_LINE = re.compile(rb'[^\n]*')
+# the longest date the expression steps over, for checking it against the limits
+_LONGEST_DATE = '2000-01-01'
+# bytes of a mapping copied at once to count its newlines
+_COUNT_SIZE = 1 << 24
+
+
+class Scan(object):
+    """What scan_buffer found.
+
+    invalid holds the line numbers, counted from 1, or the byte offsets of
+    the lines that were not valid, in order, as an array of 64-bit ints.
+    total counts the lines and levels maps each level to the number of
+    valid lines that need it.
+    """
+
+    __slots__ = ('invalid', 'total', 'levels')
+
+    def __init__(self):
+        self.invalid = array('q')
+        self.total = 0
+        self.levels = {0: 0, 1: 0, 2: 0}
+
+    def __repr__(self):
+        return 'Scan(total={}, levels={}, invalid={})'.format(
+            self.total, self.levels, len(self.invalid))
+
+
+def _count_newlines(buffer, start, end):
+    """Return the number of newlines in buffer[start:end]."""
+    if isinstance(buffer, bytes):
+        return buffer.count(b'\n', start, end)
+    count = 0
+    for piece in range(start, end, _COUNT_SIZE):
+        count += bytes(buffer[piece:min(piece + _COUNT_SIZE, end)]).count(b'\n')
+    return count
+
+
+def scan_buffer(buffer, level=None, engine=None, line_numbers=True, cache_size=65536):
+    """Validate the newline-delimited candidates in a bytes-like object.
+
+    Returns a Scan whose invalid array holds the line numbers of the lines
+    that are not valid, or their byte offsets with line_numbers False.
+    level and engine work as in validate_many; lines rejected by the limits
+    are invalid. The verdicts of the last cache_size distinct lines that
+    needed the grammar are kept.
+    """
+    valid_edtf._check_level(level)
+    if not isinstance(buffer, (bytes, mmap.mmap)):
+        buffer = memoryview(buffer).cast('B')
+    if valid_edtf.metrics is not None:
+        valid_edtf.metrics.inc('calls', entry='scan_buffer')
+    engine_classify = valid_edtf._engine(engine)
+    seen = ResultCache(cache_size) if cache_size > 0 else None
+    scan = Scan()
+    size = len(buffer)
+    run = _LEVEL0_RUN if valid_edtf._limits_admit(_LONGEST_DATE) else _NOTHING
+    line_number = 1
+    counted = 0
+    undecided = 0
+    position = 0
+    while position < size:
+        step = run.match(buffer, position).end()
+        if step > position:
+            position = step
+            continue
+        line = _LINE.match(buffer, position)
+        undecided += 1
+        key = line.group()
+        verdict = seen.get(key) if seen is not None else None
+        if verdict is None:
+            text = key[:-1] if key.endswith(b'\r') else key
+            verdict = valid_edtf._verdict(text.decode('utf-8', 'replace'), engine_classify)
+            if seen is not None:
+                seen[key] = verdict
+        found, valid = verdict
+        if valid and (level is None or found <= level):
+            scan.levels[found] += 1
+        elif line_numbers:
+            line_number += _count_newlines(buffer, counted, position)
+            counted = position
+            scan.invalid.append(line_number)
+        else:
+            scan.invalid.append(position)
+        position = line.end() + 1
+    scan.total = line_number - 1 + _count_newlines(buffer, counted, size)
+    if size and buffer[size - 1:size] != b'\n':
+        scan.total += 1
+    # every line stepped over was a Level 0 date
+    scan.levels[0] += scan.total - undecided
+    return scan
+
+
+def scan_file(path, level=None, engine=None, line_numbers=True, cache_size=65536):
+    """scan_buffer over the file at path, memory-mapped."""
+    with open(path, 'rb') as candidates:
+        try:
+            mapping = mmap.mmap(candidates.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # an empty file cannot be mapped
+            return scan_buffer(b'', level, engine, line_numbers, cache_size)
+        with mapping:
+            return scan_buffer(mapping, level, engine, line_numbers, cache_size)
@@ -0,0 +1,156 @@
+"""
+metrics.py holds the counters and timing histograms that valid_edtf keeps
+once they have been turned on with valid_edtf.enable_metrics. A Registry
+can be read as a dict or in the Prometheus text exposition format, for
+long-lived workers to expose however they already report.
+"""
+import bisect
+import threading
+
+# upper bounds, in seconds, of the histogram buckets; every histogram also
+# has a +Inf bucket
+BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+           1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 0.1, 1.0)
+# the metrics valid_edtf records, with their Prometheus type and help text
+METRICS = {
+    'calls': ('counter', 'Calls per validation entry point.'),
+    'paths': ('counter', 'Classifications per path taken: limits, prefilter, cache, '
+                         'batch, engine or whitespace.'),
+    'matches': ('counter', 'Classifications per level and top-level production matched.'),
+    'seconds': ('histogram', 'Seconds spent per phase: grammar or interval.'),
+}
+
+
+class Histogram(object):
+    """Counts of observed values per bucket, with their sum."""
+
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def cumulative(self):
+        """Return (upper bound, observations at or below it) pairs, +Inf last."""
+        pairs = []
+        total = 0
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+def _key(name, labels):
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def _label_text(labels):
+    return ','.join('{}={}'.format(name, value) for name, value in labels)
+
+
+def _prometheus_labels(labels):
+    if not labels:
+        return ''
+    return '{%s}' % ','.join('{}="{}"'.format(name, value) for name, value in labels)
+
+
+def _prometheus_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry(object):
+    """Counters and histograms keyed by metric name and labels.
+
+    Labels are keyword arguments; values are turned into strings. Safe to
+    share between threads.
+    """
+
+    def __init__(self, namespace='edtf_validate', buckets=BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, amount=1, **labels):
+        """Add amount to the counter name with the given labels."""
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, seconds, **labels):
+        """Record seconds in the histogram name with the given labels."""
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def clear(self):
+        """Drop every recorded value."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def as_dict(self):
+        """Return the values as {name: {'label=value,...': value}}.
+
+        A histogram's value is a dict of its count, sum and cumulative
+        bucket counts keyed by upper bound.
+        """
+        result = {}
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                result.setdefault(name, {})[_label_text(labels)] = value
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                result.setdefault(name, {})[_label_text(labels)] = {
+                    'count': histogram.count,
+                    'sum': histogram.sum,
+                    'buckets': dict(histogram.cumulative()),
+                }
+        return result
+
+    def prometheus(self):
+        """Return the values in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, (histogram.cumulative(), histogram.sum))
+                                for key, histogram in self._histograms.items())
+        for kind, metrics in (('counter', counters), ('histogram', histograms)):
+            described = set()
+            for (name, labels), value in metrics:
+                full_name = '{}_{}'.format(self.namespace, name)
+                if kind == 'counter':
+                    full_name += '_total'
+                if name not in described:
+                    described.add(name)
+                    help_text = METRICS.get(name, (kind, name))[1]
+                    lines.append('# HELP {} {}'.format(full_name, help_text))
+                    lines.append('# TYPE {} {}'.format(full_name, kind))
+                if kind == 'counter':
+                    lines.append('{}{} {}'.format(full_name, _prometheus_labels(labels),
+                                                  value))
+                    continue
+                cumulative, total = value
+                for bound, count in cumulative:
+                    bucket_labels = labels + (('le', _prometheus_number(bound)),)
+                    lines.append('{}_bucket{} {}'.format(
+                        full_name, _prometheus_labels(bucket_labels), count))
+                lines.append('{}_sum{} {}'.format(full_name, _prometheus_labels(labels),
+                                                  _prometheus_number(total)))
+                lines.append('{}_count{} {}'.format(full_name, _prometheus_labels(labels),
+                                                    cumulative[-1][1]))
+        return '\n'.join(lines) + '\n' if lines else ''
@@ -0,0 +1,103 @@
+"""
+packrat.py memoizes the pyparsing grammar of valid_edtf, so alternatives
+that try the same production at the same position again reuse the first
+result. Unlike ParserElement.enable_packrat, which switches every pyparsing
+grammar in the process over to one shared cache, it only changes the
+elements it is applied to.
+"""
+import collections
+import contextlib
+import functools
+import threading
+
+from pyparsing import ParseBaseException, ParseResults
+
+
+def _elements(expressions):
+    """Yield every parser element reachable from the expressions once."""
+    seen = set()
+    stack = list(expressions)
+    while stack:
+        element = stack.pop()
+        if id(element) in seen:
+            continue
+        seen.add(id(element))
+        yield element
+        stack.extend(element.recurse())
+
+
+class Packrat(object):
+    """A bounded memo of where productions match.
+
+    Only the end of each match or the failure is kept, not the tokens, so a
+    production found in the memo returns no tokens: it is meant for telling
+    whether a candidate matches, as classify does. Results are only kept
+    while memoizing() is active, and at most maxsize of them per thread,
+    the oldest dropped first, so memory stays bounded whatever the length
+    of the candidate.
+    """
+
+    def __init__(self, maxsize=4096):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self.maxsize = maxsize
+        self._local = threading.local()
+
+    def apply(self, productions):
+        """Memoize the productions, and only them, in their whole grammar.
+
+        Terminals and anonymous sub-expressions cost more to look up than
+        to parse again, so they are not memoized.
+        """
+        named = set(map(id, productions))
+        for element in _elements(productions):
+            if id(element) in named:
+                element._parse = functools.partial(self._parse, element)
+            else:
+                # pyparsing copies elements along with this attribute, so a
+                # copy may still hold the original's memoized parse
+                element.__dict__.pop('_parse', None)
+
+    @staticmethod
+    def remove(productions):
+        """Undo apply for every element reachable from the productions."""
+        for element in _elements(productions):
+            element.__dict__.pop('_parse', None)
+
+    @contextlib.contextmanager
+    def memoizing(self):
+        """Share one memo between the parses made in this thread in the block."""
+        self._local.memo = collections.OrderedDict()
+        try:
+            yield
+        finally:
+            self._local.memo = None
+
+    def _parse(self, element, instring, loc, do_actions=True, callPreParse=True):
+        memo = getattr(self._local, 'memo', None)
+        if memo is None:
+            return element._parseNoCache(instring, loc, do_actions, callPreParse)
+        key = (id(element), instring, loc, do_actions, callPreParse)
+        try:
+            value = memo[key]
+        except KeyError:
+            pass
+        else:
+            if isinstance(value, Exception):
+                # raise a copy, as raising the stored one would attach to it
+                # a traceback holding on to every frame it passes through
+                raise value.__class__(*value.args)
+            return value, ParseResults()
+        try:
+            value = element._parseNoCache(instring, loc, do_actions, callPreParse)
+        except ParseBaseException as exc:
+            # keep a copy without the traceback, as pyparsing's cache does
+            self._store(memo, key, exc.__class__(*exc.args))
+            raise
+        self._store(memo, key, value[0])
+        return value
+
+    def _store(self, memo, key, value):
+        memo[key] = value
+        if len(memo) > self.maxsize:
+            memo.popitem(last=False)
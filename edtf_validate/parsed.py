@@ -0,0 +1,234 @@
+"""
+parsed.py describes a candidate that valid_edtf has accepted: what kind of
+EDTF it is, the dates it is made of, their qualifiers and unspecified
+digits, and the earliest and latest days it can stand for. The text is
+taken apart with string operations only, so it is never parsed twice;
+valid_edtf.parse only hands over strings the grammar has accepted.
+"""
+import re
+
+from edtf_validate import bounds
+
+KINDS = (
+    'date',
+    'datetime',
+    'season',
+    'long_year',
+    'significant_digits',
+    'interval',
+    'choice_list',
+    'inclusive_list',
+)
+# in the order they are reported in ParsedEDTF.qualifiers
+QUALIFIERS = '?~%'
+# first and last month of the level 2 seasons; a last month past 12 is in
+# the next year, as northern winter runs from December to February
+EXTENDED_SEASON_MONTHS = {
+    25: (3, 5), 26: (6, 8), 27: (9, 11), 28: (12, 14),
+    29: (9, 11), 30: (12, 14), 31: (3, 5), 32: (6, 8),
+    33: (1, 3), 34: (4, 6), 35: (7, 9), 36: (10, 12),
+    37: (1, 4), 38: (5, 8), 39: (9, 12),
+    40: (1, 6), 41: (7, 12),
+}
+# bits of an unspecified mask, one for each digit of YYYYMMDD
+YEAR_DIGITS = 0b11110000
+MONTH_DIGITS = 0b00001100
+DAY_DIGITS = 0b00000011
+
+# the range of a signed 64-bit integer; the ends stand for open or unknown
+# starts and ends, and the days of long years beyond it are clamped inside
+KEY_MIN = -2 ** 63
+KEY_MAX = 2 ** 63 - 1
+# the sort key of a candidate that is not valid: an empty span, after
+# every valid one
+INVALID_KEY = (KEY_MAX, KEY_MIN)
+
+_SEASON = re.compile(r'(-?[0-9]{4})-(2[1-9]|3[0-9]|4[01])')
+_UNQUALIFIED = str.maketrans('', '', QUALIFIERS)
+_WHITESPACE = str.maketrans('', '', ' \t\n\r')
+
+
+class ParsedEDTF(object):
+    """An accepted candidate, taken apart.
+
+    text is the candidate without the whitespace the grammar skips and
+    level the lowest level it needs. endpoints holds the interval ends or
+    list elements as written, or the candidate itself. qualifiers are the
+    distinct '?', '~' and '%' found anywhere in it, and unspecified has
+    one mask of X digits per endpoint (see YEAR_DIGITS). earliest and
+    latest are the day numbers of bounds.day_number, or None where the
+    candidate is open or unknown on that side. Instances are immutable.
+    """
+
+    __slots__ = ('text', 'level', 'kind', 'endpoints', 'qualifiers', 'unspecified',
+                 'earliest', 'latest')
+
+    def __init__(self, text, level, kind, endpoints, qualifiers, unspecified,
+                 earliest, latest):
+        values = (text, level, kind, endpoints, qualifiers, unspecified, earliest, latest)
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('ParsedEDTF is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('ParsedEDTF is immutable')
+
+    def _values(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __reduce__(self):
+        return self.__class__, self._values()
+
+    def __eq__(self, other):
+        if not isinstance(other, ParsedEDTF):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        return hash(self._values())
+
+    def __repr__(self):
+        return 'ParsedEDTF(%s)' % ', '.join(
+            '%s=%r' % (name, getattr(self, name)) for name in self.__slots__)
+
+
+def unspecified_mask(date):
+    """Return the mask of the X digits of a date, one bit per digit of YYYYMMDD."""
+    date = date.translate(_UNQUALIFIED).strip('.').lstrip('-')
+    if 'X' not in date:
+        return 0
+    digits = date.split('T')[0].replace('-', '')
+    mask = 0
+    for position, char in enumerate(digits[:8]):
+        if char == 'X':
+            mask |= 1 << (7 - position)
+    return mask
+
+
+def _significant_span(date):
+    """Return the span of the years a year with significant digits stands for."""
+    base, significant = date.split('S')
+    year = bounds.resolve(base)[0]
+    magnitude = abs(year)
+    if magnitude == bounds.SATURATED_YEAR:
+        # too large to work out which of its years the digits leave open
+        return bounds.day_number(year), bounds.day_number(year, 12, 31)
+    unit = 10 ** max(bounds.year_digits(base) - int(significant), 0)
+    low = magnitude // unit * unit
+    high = low + unit - 1
+    if year < 0:
+        low, high = -high, -low
+    return bounds.day_number(low), bounds.day_number(high, 12, 31)
+
+
+def date_span(date):
+    """Return the earliest and latest day numbers of a single accepted date."""
+    date = date.translate(_UNQUALIFIED).split('T')[0]
+    if 'S' in date:
+        return _significant_span(date)
+    match = _SEASON.fullmatch(date)
+    if match and int(match.group(2)) in EXTENDED_SEASON_MONTHS:
+        year = int(match.group(1))
+        first, last = EXTENDED_SEASON_MONTHS[int(match.group(2))]
+        end_year = year + (last - 1) // 12
+        last = (last - 1) % 12 + 1
+        return (bounds.day_number(year, first),
+                bounds.day_number(end_year, last, bounds.days_in_month(end_year, last)))
+    return (bounds.first_day(bounds.resolve(date)),
+            bounds.last_day(bounds.resolve(date, latest=True)))
+
+
+def _element_span(element):
+    """Return the span of a list element, open on the side of a bare '..'.
+
+    The grammar accepts consecutives written from the later date to the
+    earlier, like 1990..1980, so both of their dates are taken into account.
+    """
+    if '..' not in element:
+        return date_span(element)
+    start, end = element.split('..')
+    if start and end:
+        spans = date_span(start) + date_span(end)
+        return min(spans), max(spans)
+    return (date_span(start)[0] if start else None,
+            date_span(end)[1] if end else None)
+
+
+def _kind(text):
+    if 'T' in text:
+        return 'datetime'
+    if 'S' in text:
+        return 'significant_digits'
+    if text.startswith('Y'):
+        return 'long_year'
+    if _SEASON.fullmatch(text.translate(_UNQUALIFIED)):
+        return 'season'
+    return 'date'
+
+
+def kind(edtf_candidate):
+    """Return the KINDS entry of a candidate valid_edtf accepted."""
+    text = edtf_candidate.translate(_WHITESPACE)
+    if text[0] == '[':
+        return 'choice_list'
+    if text[0] == '{':
+        return 'inclusive_list'
+    if '/' in text:
+        return 'interval'
+    return _kind(text)
+
+
+def _taken_apart(text):
+    """Return the kind, endpoints, earliest and latest day of accepted text."""
+    if text[0] in '[{':
+        kind = 'choice_list' if text[0] == '[' else 'inclusive_list'
+        endpoints = tuple(text[1:-1].split(','))
+        spans = [_element_span(element) for element in endpoints]
+        starts = [start for start, _ in spans]
+        ends = [end for _, end in spans]
+        earliest = None if None in starts else min(starts)
+        latest = None if None in ends else max(ends)
+    elif '/' in text:
+        kind = 'interval'
+        endpoints = tuple(text.split('/'))
+        start, end = endpoints
+        earliest = None if start in bounds.OPEN else date_span(start)[0]
+        latest = None if end in bounds.OPEN else date_span(end)[1]
+    else:
+        kind = _kind(text)
+        endpoints = (text,)
+        earliest, latest = date_span(text)
+    return kind, endpoints, earliest, latest
+
+
+def decompose(edtf_candidate, level):
+    """Return the ParsedEDTF of a candidate valid_edtf accepted at level."""
+    text = edtf_candidate.translate(_WHITESPACE)
+    kind, endpoints, earliest, latest = _taken_apart(text)
+    qualifiers = ''.join(symbol for symbol in QUALIFIERS if symbol in text)
+    unspecified = tuple(unspecified_mask(endpoint) for endpoint in endpoints)
+    return ParsedEDTF(text, level, kind, endpoints, qualifiers, unspecified,
+                      earliest, latest)
+
+
+def _clamped(day):
+    # bounds saturates long years before working out their days, so day
+    # is a small int even for the longest of them
+    return min(max(day, KEY_MIN + 1), KEY_MAX - 1)
+
+
+def span_key(edtf_candidate):
+    """Return the (earliest, latest) sort key of a candidate valid_edtf accepted.
+
+    Both are day numbers as in ParsedEDTF, with KEY_MIN for an open or
+    unknown start and KEY_MAX for an open or unknown end.
+    """
+    _, _, earliest, latest = _taken_apart(edtf_candidate.translate(_WHITESPACE))
+    return (KEY_MIN if earliest is None else _clamped(earliest),
+            KEY_MAX if latest is None else _clamped(latest))
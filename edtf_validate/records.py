@@ -0,0 +1,173 @@
+"""
+records.py validates the dates held in metadata records as they stream
+past, without loading whole documents: XML, such as UNTL or Dublin Core,
+is read with iterparse and each record dropped once its fields are taken,
+and JSON lines are decoded one at a time. The fields to take are given by
+path, and each value found is validated, the verdicts of recently seen
+values being remembered in a bounded cache, so memory stays the same
+however long the export.
+
+    for record_id, field, value, valid in validate_xml(
+            'untl.xml', 'metadata', {'created': "date[@qualifier='creation']"},
+            record_id="meta[@qualifier='ark']"):
+        ...
+"""
+import json
+from xml.etree import ElementTree
+
+from edtf_validate import valid_edtf
+from edtf_validate.cache import ResultCache
+
+
+def _named(fields):
+    """Return fields as (name, path) pairs; a path alone is its own name."""
+    if isinstance(fields, str):
+        fields = [fields]
+    if isinstance(fields, dict):
+        return list(fields.items())
+    return [(path, path) for path in fields]
+
+
+def _xml_id(record, path, namespaces, number):
+    """Return the id of a record: an attribute, an element's text, or its number."""
+    if path is None:
+        return number
+    if path.startswith('@'):
+        return record.get(path[1:])
+    return record.findtext(path, namespaces=namespaces)
+
+
+def xml_fields(source, record, fields, record_id=None, namespaces=None):
+    """Yield (record_id, field, value) for the fields of each XML record.
+
+    source is a path or binary file. record is the tag of the record
+    elements, in {namespace}tag form where namespaced. fields is a path
+    relative to a record, a list of them, or a dict of field names to
+    paths, in ElementTree's path syntax with prefixes from namespaces. A
+    field may match many elements, each giving a value, which is their
+    text stripped of surrounding whitespace; elements without text are
+    skipped. record_id is '@attribute' of the record or the path
+    of an element holding its id, and records are numbered from 1 without
+    it. Records, and elements outside them, are dropped from the tree
+    once read.
+    """
+    named = _named(fields)
+    ancestors = []
+    open_records = 0
+    number = 0
+    for event, element in ElementTree.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            ancestors.append(element)
+            open_records += element.tag == record
+            continue
+        ancestors.pop()
+        if element.tag == record:
+            open_records -= 1
+            number += 1
+            identifier = _xml_id(element, record_id, namespaces, number)
+            for name, path in named:
+                for found in element.iterfind(path, namespaces):
+                    if found.text is not None:
+                        yield identifier, name, found.text.strip()
+        elif open_records:
+            # still needed by the record it is in
+            continue
+        # done with, along with everything in it
+        element.clear()
+        if ancestors:
+            ancestors[-1].remove(element)
+
+
+def _unlisted(values):
+    """Return values with the elements of lists, at any depth, in place of the lists."""
+    if not any(isinstance(value, list) for value in values):
+        return values
+    unlisted = []
+    for value in values:
+        if isinstance(value, list):
+            unlisted.extend(_unlisted(value))
+        else:
+            unlisted.append(value)
+    return unlisted
+
+
+def _json_values(document, keys):
+    """Return the values at the path of keys, looking into every list element."""
+    value = document
+    for depth, key in enumerate(keys):
+        if isinstance(value, list):
+            values = [value]
+            for rest_key in keys[depth:]:
+                values = [item[rest_key] for item in _unlisted(values)
+                          if isinstance(item, dict) and rest_key in item]
+            return [item for item in _unlisted(values) if item is not None]
+        if not isinstance(value, dict):
+            return []
+        value = value.get(key)
+    if isinstance(value, list):
+        return [value for value in _unlisted(value) if value is not None]
+    return [] if value is None else [value]
+
+
+def jsonl_fields(lines, fields, record_id=None):
+    """Yield (record_id, field, value) for the fields of each JSON line.
+
+    lines is an iterable of JSON texts, such as a file open on a JSON
+    lines export; blank lines are skipped. fields is a dotted path of keys
+    ('dates.created'), a list of them, or a dict of field names to paths;
+    lists on the way are looked into element by element, and missing keys
+    and nulls give no value. record_id is the path of the record's id, and
+    records are numbered by line from 1 without it. A line that is not
+    JSON raises ValueError naming it.
+    """
+    named = [(name, path.split('.')) for name, path in _named(fields)]
+    id_keys = record_id.split('.') if record_id is not None else None
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            document = json.loads(line)
+        except ValueError as error:
+            raise ValueError('line {}: {}'.format(number, error))
+        if id_keys is None:
+            identifier = number
+        else:
+            identifiers = _json_values(document, id_keys)
+            identifier = identifiers[0] if identifiers else None
+        for name, keys in named:
+            for value in _json_values(document, keys):
+                yield identifier, name, value
+
+
+def validate_fields(values, level=None, engine=None, cache_size=65536):
+    """Yield (record_id, field, value, valid) for (record_id, field, value) triples.
+
+    level and engine work as in validate_many, and values that are not
+    strings are not valid. The verdicts of the last cache_size distinct
+    values are remembered.
+    """
+    valid_edtf._check_level(level)
+    if valid_edtf.metrics is not None:
+        valid_edtf.metrics.inc('calls', entry='validate_fields')
+    engine_classify = valid_edtf._engine(engine)
+    seen = ResultCache(cache_size) if cache_size > 0 else None
+    for identifier, name, value in values:
+        if not isinstance(value, str):
+            yield identifier, name, value, False
+            continue
+        (_, (found, valid)), = valid_edtf._verdict_pairs([value], engine_classify, seen)
+        if valid and level is not None and found > level:
+            valid = False
+        yield identifier, name, value, valid
+
+
+def validate_xml(source, record, fields, record_id=None, namespaces=None, level=None,
+                 engine=None, cache_size=65536):
+    """validate_fields over xml_fields."""
+    return validate_fields(xml_fields(source, record, fields, record_id, namespaces),
+                           level, engine, cache_size)
+
+
+def validate_jsonl(lines, fields, record_id=None, level=None, engine=None, cache_size=65536):
+    """validate_fields over jsonl_fields."""
+    return validate_fields(jsonl_fields(lines, fields, record_id), level, engine, cache_size)
@@ -0,0 +1,617 @@
+"""
+scanner.py is a hand-written recognizer for the level 0, 1 and 2 grammar
+defined in valid_edtf.py. It is used as the 'scanner' engine of
+valid_edtf.classify.
+
+Every production is a function that takes the candidate and a position and
+returns the position just past its match, or -1 when it does not match.
+Alternatives are tried in the same order as in the pyparsing grammar and a
+successful alternative is never revisited, so the scanner accepts exactly
+the strings the grammar accepts. Fixed width terminals are checked with a
+single slice lookup instead of a chain of alternations.
+
+The grammar skips whitespace between tokens; the scanner does not model
+that, so valid_edtf only hands it candidates without whitespace. Lists
+with whitespace around them or before their commas and closing bracket
+are handed over with it taken out; whitespace anywhere else is left to
+the grammar.
+"""
+from edtf_validate.lists import ListProductions, bracketed_list
+
+
+def _two_digit(first, last):
+    """Return the zero padded two digit numbers from first to last."""
+    return frozenset('%02d' % number for number in range(first, last + 1))
+
+
+_UA_SYMBOLS = frozenset('?~%')
+_POSITIVE_DIGITS = frozenset('123456789')
+_DIGITS = frozenset('0123456789')
+_DIGITS_OR_X = _DIGITS | {'X'}
+_ONE_THRU_13 = _two_digit(1, 13)
+_ONE_THRU_59 = _two_digit(1, 59)
+_HOURS = _two_digit(0, 23)
+_MINUTES = _two_digit(0, 59)
+_MONTHS = _two_digit(1, 12)
+_DAYS = _two_digit(1, 31)
+_SEASONS = _two_digit(21, 24)
+_EXTENDED_SEASONS = _two_digit(25, 41)
+_MONTH_DAYS = frozenset(
+    [m + '-' + d for m in ('01', '03', '05', '07', '08', '10', '12') for d in _two_digit(1, 31)]
+    + [m + '-' + d for m in ('04', '06', '09', '11') for d in _two_digit(1, 30)]
+    + ['02-' + d for d in _two_digit(1, 29)]
+)
+_MONTHS_WITH_X = frozenset(['X' + c for c in _DIGITS_OR_X] + ['0X', '1X'])
+_DAYS_WITH_X = frozenset(['X' + c for c in _DIGITS_OR_X] + ['0X', '1X', '2X', '3X'])
+# monthWithX "-" dayWithX | month "-" dayWithX | monthWithX "-" day
+_MONTH_DAYS_WITH_X = frozenset(
+    [m + '-' + d for m in _MONTHS_WITH_X for d in _DAYS_WITH_X]
+    + [m + '-' + d for m in _MONTHS for d in _DAYS_WITH_X]
+    + [m + '-' + d for m in _MONTHS_WITH_X for d in _DAYS]
+)
+
+"""
+------------------------------------------------------------------------------
+LEVEL 0
+------------------------------------------------------------------------------
+"""
+
+
+def _four_digits(s, i):
+    """non_negative_year: any four digits."""
+    chunk = s[i:i + 4]
+    if len(chunk) == 4 and chunk.isascii() and chunk.isdigit():
+        return i + 4
+    return -1
+
+
+def _positive_year(s, i):
+    """positive_year: four digits other than 0000."""
+    j = _four_digits(s, i)
+    if j < 0 or s.startswith('0000', i):
+        return -1
+    return j
+
+
+def _extend_date(s, j):
+    """Extend a year ending at j with '-' monthDay or else '-' month."""
+    if s.startswith('-', j):
+        if s[j + 1:j + 6] in _MONTH_DAYS:
+            return j + 6
+        if s[j + 1:j + 3] in _MONTHS:
+            return j + 3
+    return j
+
+
+def _non_negative_date(s, i):
+    """non_negative_yearMonthDay | non_negative_yearMonth | non_negative_year"""
+    j = _four_digits(s, i)
+    if j < 0:
+        return -1
+    return _extend_date(s, j)
+
+
+def _time(s, i):
+    """time: baseTime Optional(zoneOffset)"""
+    if (
+        s[i:i + 2] in _HOURS
+        and s.startswith(':', i + 2)
+        and s[i + 3:i + 5] in _MINUTES
+        and s.startswith(':', i + 5)
+        and s[i + 6:i + 8] in _MINUTES
+    ) or s.startswith('24:00:00', i):
+        i += 8
+    else:
+        return -1
+    j = _zone_offset(s, i)
+    return i if j < 0 else j
+
+
+def _zone_offset(s, i):
+    """zoneOffset: 'Z' | ('+' | '-') (hour [':' minute] | '14:00' | '00:' minute)"""
+    if s.startswith('Z', i):
+        return i + 1
+    if not (s.startswith('+', i) or s.startswith('-', i)):
+        return -1
+    i += 1
+    if s[i:i + 2] in _ONE_THRU_13:
+        if s.startswith(':', i + 2) and s[i + 3:i + 5] in _MINUTES:
+            return i + 5
+        return i + 2
+    if s.startswith('14:00', i):
+        return i + 5
+    if s.startswith('00:', i) and s[i + 3:i + 5] in _ONE_THRU_59:
+        return i + 5
+    return -1
+
+
+def _level0(s):
+    """level0Expression: L0Interval | dateAndTime | non_negative_date"""
+    j = _non_negative_date(s, 0)
+    if j < 0:
+        return -1
+    if s.startswith('/', j):
+        k = _non_negative_date(s, j + 1)
+        if k >= 0:
+            return k
+    if s.startswith('T', j):
+        k = _time(s, j + 1)
+        if k >= 0:
+            return k
+    return j
+
+
+"""
+------------------------------------------------------------------------------
+LEVEL 1
+------------------------------------------------------------------------------
+"""
+
+
+def _year(s, i):
+    """year: positive_year | negative_year | '0000'"""
+    if s.startswith('-', i):
+        return _positive_year(s, i + 1)
+    return _four_digits(s, i)
+
+
+def _year_month(s, i):
+    """yearMonth: year '-' month"""
+    j = _year(s, i)
+    if j >= 0 and s.startswith('-', j) and s[j + 1:j + 3] in _MONTHS:
+        return j + 3
+    return -1
+
+
+def _year_month_day(s, i):
+    """yearMonthDay: year '-' monthDay"""
+    j = _year(s, i)
+    if j >= 0 and s.startswith('-', j) and s[j + 1:j + 6] in _MONTH_DAYS:
+        return j + 6
+    return -1
+
+
+def _date(s, i):
+    """date: yearMonthDay | yearMonth | year"""
+    j = _year(s, i)
+    if j < 0:
+        return -1
+    return _extend_date(s, j)
+
+
+def _negative_date(s, i):
+    """negative_date: negative_year ('-' monthDay | '-' month | )"""
+    if not s.startswith('-', i):
+        return -1
+    j = _positive_year(s, i + 1)
+    if j < 0:
+        return -1
+    return _extend_date(s, j)
+
+
+def _ua(s, i):
+    """Step over a UASymbol at i, or fail."""
+    return i + 1 if s[i:i + 1] in _UA_SYMBOLS else -1
+
+
+def _season(s, i):
+    """season: year '-' seasonNumber"""
+    j = _year(s, i)
+    if j >= 0 and s.startswith('-', j) and s[j + 1:j + 3] in _SEASONS:
+        return j + 3
+    return -1
+
+
+def _date_or_season(s, i):
+    """dateOrSeason: season | date"""
+    j = _season(s, i)
+    if j >= 0:
+        return j
+    return _date(s, i)
+
+
+def _uncertain_or_approx_date(s, i):
+    """uncertainOrApproxDate: date UASymbol"""
+    j = _date(s, i)
+    if j < 0:
+        return -1
+    return _ua(s, j)
+
+
+def _unspecified(s, i):
+    """unspecified: dayAndMonthUnspecified | dayUnspecified | monthUnspecified
+    | yearWithOneOrTwoUnspecifedDigits
+    """
+    j = _year(s, i)
+    if j >= 0:
+        if s.startswith('-XX-XX', j):
+            return j + 6
+        if s.startswith('-', j) and s[j + 1:j + 3] in _MONTHS and s.startswith('-XX', j + 3):
+            return j + 6
+        if s.startswith('-XX', j):
+            return j + 3
+    # Optional('-') digit digit (digit | 'X') 'X'
+    if s.startswith('-', i):
+        i += 1
+    if (
+        s[i:i + 1] in _DIGITS
+        and s[i + 1:i + 2] in _DIGITS
+        and s[i + 2:i + 3] in _DIGITS_OR_X
+        and s.startswith('X', i + 3)
+    ):
+        return i + 4
+    return -1
+
+
+def _open_end(s, i):
+    """dateOrSeason UASymbol | dateOrSeason | '..'"""
+    j = _date_or_season(s, i)
+    if j >= 0:
+        return j + 1 if s[j:j + 1] in _UA_SYMBOLS else j
+    return i + 2 if s.startswith('..', i) else -1
+
+
+def _qualified_end(s, i):
+    """dateOrSeason UASymbol | '..' | season"""
+    j = _date_or_season(s, i)
+    if j >= 0 and s[j:j + 1] in _UA_SYMBOLS:
+        return j + 1
+    if s.startswith('..', i):
+        return i + 2
+    return _season(s, i)
+
+
+def _l1_interval(s, i):
+    """L1Interval"""
+    # negative_date "/" date
+    j = _negative_date(s, i)
+    if j >= 0 and s.startswith('/', j):
+        k = _date(s, j + 1)
+        if k >= 0:
+            return k
+    # open "/" qualified
+    j = _open_end(s, i)
+    if j >= 0 and s.startswith('/', j):
+        k = _qualified_end(s, j + 1)
+        if k >= 0:
+            return k
+    # qualified "/" open
+    j = _qualified_end(s, i)
+    if j >= 0 and s.startswith('/', j):
+        k = _open_end(s, j + 1)
+        if k >= 0:
+            return k
+    # Empty "/" open
+    if s.startswith('/', i):
+        k = _open_end(s, i + 1)
+        if k >= 0:
+            return k
+    # open "/" Empty
+    j = _open_end(s, i)
+    if j >= 0 and s.startswith('/', j):
+        return j + 1
+    return -1
+
+
+def _digit_run(s, i):
+    """ZeroOrMore(digit)"""
+    n = len(s)
+    while i < n and s[i] in _DIGITS:
+        i += 1
+    return i
+
+
+def _long_year_simple(s, i):
+    """longYearSimple: 'Y' Optional('-') positiveDigit digit digit digit OneOrMore(digit)"""
+    if not s.startswith('Y', i):
+        return -1
+    i += 1
+    if s.startswith('-', i):
+        i += 1
+    if s[i:i + 1] not in _POSITIVE_DIGITS:
+        return -1
+    j = _digit_run(s, i + 1)
+    return j if j - i >= 5 else -1
+
+
+def _level1(s):
+    """level1Expression"""
+    for production in (
+        _l1_interval,
+        _long_year_simple,
+        _uncertain_or_approx_date,
+        _unspecified,
+        _season,
+    ):
+        j = production(s, 0)
+        if j >= 0:
+            return j
+    # negative_time | negative_date
+    j = _negative_date(s, 0)
+    if j >= 0 and s.startswith('T', j):
+        k = _time(s, j + 1)
+        if k >= 0:
+            return k
+    return j
+
+
+"""
+------------------------------------------------------------------------------
+LEVEL 2
+------------------------------------------------------------------------------
+"""
+
+
+def _month(s, i):
+    """month"""
+    return i + 2 if s[i:i + 2] in _MONTHS else -1
+
+
+def _day(s, i):
+    """day"""
+    return i + 2 if s[i:i + 2] in _DAYS else -1
+
+
+def _ua_part(s, i, part):
+    """part UASymbol | UASymbol part"""
+    j = part(s, i)
+    if j >= 0 and s[j:j + 1] in _UA_SYMBOLS:
+        return j + 1
+    if s[i:i + 1] in _UA_SYMBOLS:
+        return part(s, i + 1)
+    return -1
+
+
+def _ua_part_or_part(s, i, part):
+    """UAPart | part"""
+    j = _ua_part(s, i, part)
+    if j >= 0:
+        return j
+    return part(s, i)
+
+
+def _internal_uncertain_or_approximate(s, i):
+    """internalUncertainOrApproximate"""
+    # ~(StringStart() + uncertainOrApproxDate + StringEnd())
+    if i == 0 and _uncertain_or_approx_date(s, 0) == len(s):
+        return -1
+    # UAYear Optional("-" UAMonthOrMonth "-" UADayOrDay | "-" UAMonthOrMonth)
+    j = _ua_part(s, i, _year)
+    if j >= 0:
+        if s.startswith('-', j):
+            k = _ua_part_or_part(s, j + 1, _month)
+            if k >= 0:
+                if s.startswith('-', k):
+                    m = _ua_part_or_part(s, k + 1, _day)
+                    if m >= 0:
+                        return m
+                return k
+        return j
+    # UAYearOrYear "-" UAMonth Optional("-" UADayOrDay)
+    j = _year(s, i)
+    if j >= 0 and s.startswith('-', j):
+        k = _ua_part(s, j + 1, _month)
+        if k >= 0:
+            if s.startswith('-', k):
+                m = _ua_part_or_part(s, k + 1, _day)
+                if m >= 0:
+                    return m
+            return k
+        # UAYearOrYear "-" UAMonthOrMonth "-" UADay
+        k = _month(s, j + 1)
+        if k >= 0 and s.startswith('-', k):
+            m = _ua_part(s, k + 1, _day)
+            if m >= 0:
+                return m
+    # season UASymbol
+    j = _season(s, i)
+    if j < 0:
+        return -1
+    return _ua(s, j)
+
+
+def _year_with_x(s, i):
+    """yearWithX: Optional('-') and four of digit or 'X', at least one 'X'"""
+    if s.startswith('-', i):
+        i += 1
+    chunk = s[i:i + 4]
+    if len(chunk) == 4 and 'X' in chunk and all(c in _DIGITS_OR_X for c in chunk):
+        return i + 4
+    return -1
+
+
+def _internal_unspecified(s, i):
+    """internalUnspecified"""
+    # ~(StringStart() + unspecified + StringEnd())
+    if i == 0 and _unspecified(s, 0) == len(s):
+        return -1
+    j = _year_with_x(s, i)
+    if j >= 0:
+        if s.startswith('-', j):
+            # yearWithX "-" monthDayWithX | yearWithX "-" monthDay
+            if s[j + 1:j + 6] in _MONTH_DAYS_WITH_X or s[j + 1:j + 6] in _MONTH_DAYS:
+                return j + 6
+            # yearWithX "-" monthWithX | yearWithX "-" month
+            if s[j + 1:j + 3] in _MONTHS_WITH_X or s[j + 1:j + 3] in _MONTHS:
+                return j + 3
+        return j
+    j = _year(s, i)
+    if j >= 0 and s.startswith('-', j):
+        # year "-" monthDayWithX
+        if s[j + 1:j + 6] in _MONTH_DAYS_WITH_X:
+            return j + 6
+        # year "-" monthWithX
+        if s[j + 1:j + 3] in _MONTHS_WITH_X:
+            return j + 3
+    return -1
+
+
+def _date_with_internal_uncertainty(s, i):
+    """dateWithInternalUncertainty: internalUncertainOrApproximate | internalUnspecified"""
+    j = _internal_uncertain_or_approximate(s, i)
+    if j >= 0:
+        return j
+    return _internal_unspecified(s, i)
+
+
+def _consecutives(s, i):
+    """consecutives: yearMonthDay '..' yearMonthDay | yearMonth '..' yearMonth
+    | year '..' year
+    """
+    j = _year(s, i)
+    if j < 0:
+        return -1
+    if s.startswith('-', j):
+        if s[j + 1:j + 6] in _MONTH_DAYS and s.startswith('..', j + 6):
+            k = _year_month_day(s, j + 8)
+            if k >= 0:
+                return k
+        if s[j + 1:j + 3] in _MONTHS and s.startswith('..', j + 3):
+            k = _year_month(s, j + 5)
+            if k >= 0:
+                return k
+    if s.startswith('..', j):
+        return _year(s, j + 2)
+    return -1
+
+
+def _earlier(s, i):
+    """earlier: '..' date"""
+    if s.startswith('..', i):
+        return _date(s, i + 2)
+    return -1
+
+
+def _later(s, i):
+    """later: date '..'"""
+    j = _date(s, i)
+    if j >= 0 and s.startswith('..', j):
+        return j + 2
+    return -1
+
+
+def _list_element(s, i):
+    """listElement"""
+    for production in (
+        _date_with_internal_uncertainty,
+        _uncertain_or_approx_date,
+        _unspecified,
+        _consecutives,
+        _date,
+    ):
+        j = production(s, i)
+        if j >= 0:
+            return j
+    return -1
+
+
+# listContent is recognized by the lists module, which the grammar engines share
+_LIST_PRODUCTIONS = ListProductions(_list_element, _earlier, _later, _consecutives, _date)
+
+
+def _bracketed_list(s, i, opening, closing):
+    """opening listContent closing"""
+    return bracketed_list(s, i, opening, closing, _LIST_PRODUCTIONS)
+
+
+def _l2_interval(s, i):
+    """L2Interval"""
+    # ~(StringStart() + L1Interval + StringEnd())
+    if i == 0 and _l1_interval(s, 0) == len(s):
+        return -1
+    # dateWithInternalUncertainty "/" dateWithInternalUncertainty
+    j = _date_with_internal_uncertainty(s, i)
+    if j >= 0 and s.startswith('/', j):
+        k = _date_with_internal_uncertainty(s, j + 1)
+        if k >= 0:
+            return k
+    # dateOrSeason "/" dateWithInternalUncertainty
+    k = _date_or_season(s, i)
+    if k >= 0 and s.startswith('/', k):
+        k = _date_with_internal_uncertainty(s, k + 1)
+        if k >= 0:
+            return k
+    # dateWithInternalUncertainty "/" dateOrSeason
+    if j >= 0 and s.startswith('/', j):
+        return _date_or_season(s, j + 1)
+    return -1
+
+
+def _positive_integer(s, i):
+    """positiveInteger: positiveDigit ZeroOrMore(digit)"""
+    if s[i:i + 1] in _POSITIVE_DIGITS:
+        return _digit_run(s, i + 1)
+    return -1
+
+
+def _long_year_scientific(s, i):
+    """longYearScientific: 'Y' Optional('-') positiveInteger 'E' positiveInteger"""
+    if not s.startswith('Y', i):
+        return -1
+    i += 1
+    if s.startswith('-', i):
+        i += 1
+    j = _positive_integer(s, i)
+    if j >= 0 and s.startswith('E', j):
+        return _positive_integer(s, j + 1)
+    return -1
+
+
+def _significant_digit_year(s, i):
+    """significantDigitYear: (year | longYearScientific | longYearSimple) 'S' positiveInteger"""
+    j = _year(s, i)
+    if j < 0:
+        j = _long_year_scientific(s, i)
+    if j < 0:
+        j = _long_year_simple(s, i)
+    if j >= 0 and s.startswith('S', j):
+        return _positive_integer(s, j + 1)
+    return -1
+
+
+def _extended_season(s, i):
+    """extendedSeason: year '-' extendedSeasonNumber"""
+    j = _year(s, i)
+    if j >= 0 and s.startswith('-', j) and s[j + 1:j + 3] in _EXTENDED_SEASONS:
+        return j + 3
+    return -1
+
+
+def _level2(s):
+    """level2Expression"""
+    j = _l2_interval(s, 0)
+    if j >= 0:
+        return j
+    j = _bracketed_list(s, 0, '[', ']')
+    if j >= 0:
+        return j
+    j = _bracketed_list(s, 0, '{', '}')
+    if j >= 0:
+        return j
+    for production in (
+        _internal_unspecified,
+        _internal_uncertain_or_approximate,
+        _extended_season,
+        _significant_digit_year,
+        _long_year_scientific,
+    ):
+        j = production(s, 0)
+        if j >= 0:
+            return j
+    return -1
+
+
+def classify(edtf_candidate):
+    """Return the lowest level whose expression matches the whole candidate.
+
+    Returns None if no level matches. The candidate must not contain
+    whitespace.
+    """
+    end = len(edtf_candidate)
+    if _level0(edtf_candidate) == end:
+        return 0
+    if _level1(edtf_candidate) == end:
+        return 1
+    if _level2(edtf_candidate) == end:
+        return 2
+    return None
@@ -0,0 +1,310 @@
+"""
+server.py keeps one warm validator running for tools that would otherwise
+start edtf-validate, and build its grammar, once per value, and is the
+thin client that talks to it. Both are reached through the console script:
+
+    edtf-validate serve --socket /tmp/edtf.sock
+    edtf-validate client --socket /tmp/edtf.sock -f dates.txt
+
+The protocol is line based, in UTF-8. A line holding a candidate is
+answered by a line holding True, False or TOO_EXPENSIVE. A line holding a
+JSON object, which starts with '{"' as no EDTF list does, is a batch:
+
+    {"id": 7, "candidates": ["1985", "2001-21"], "level": 0}
+    {"id": 7, "valid": [true, false], "levels": [0, 1]}
+
+"level" is optional and works as in validate_many; "levels" holds the
+level each candidate matched, or null. A malformed batch is answered by
+{"id": 7, "error": "..."}. Each connection gets its answers in the order
+of its requests, so clients may send many requests before reading any. A
+line longer than the server's max_line_length is answered by
+{"id": null, "error": "..."} and the connection is closed.
+"""
+import argparse
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import threading
+
+from edtf_validate import valid_edtf
+from edtf_validate.cache import ResultCache
+from edtf_validate.limits import TOO_EXPENSIVE
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8642
+# largest read from a connection at once; every complete line in it is
+# answered with a single write
+_READ_SIZE = 65536
+# longest request line a connection may send, in bytes
+MAX_LINE_LENGTH = 16 * 1024 * 1024
+
+
+def _encode_valid(valid):
+    return 'TOO_EXPENSIVE' if valid is TOO_EXPENSIVE else valid
+
+
+def _decode_valid(valid):
+    return TOO_EXPENSIVE if valid == 'TOO_EXPENSIVE' else valid
+
+
+class Validator(object):
+    """Answers protocol lines, remembering the verdicts of recent candidates.
+
+    The grammar is built when the validator is made. One validator is
+    shared by every connection of a server.
+    """
+
+    def __init__(self, engine=None, cache_size=65536):
+        valid_edtf._prewarm(engine)
+        self._engine_classify = valid_edtf._engine(engine)
+        self._seen = ResultCache(cache_size) if cache_size > 0 else None
+
+    def verdicts(self, edtf_candidates):
+        """Return the (level, valid) verdict of each candidate."""
+        return [verdict for _, verdict in valid_edtf._verdict_pairs(
+            edtf_candidates, self._engine_classify, self._seen)]
+
+    def respond(self, line):
+        """Return the answer to a request line, without its newline."""
+        if not line.startswith('{"'):
+            (_, valid), = self.verdicts([line])
+            return str(valid)
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            candidates = request['candidates']
+            level = request.get('level')
+            if not isinstance(candidates, list) or not all(
+                    isinstance(candidate, str) for candidate in candidates):
+                raise ValueError('candidates must be a list of strings')
+            if level not in (None, 0, 1, 2):
+                raise ValueError('level must be null, 0, 1 or 2')
+        except (ValueError, KeyError, AttributeError) as error:
+            return json.dumps({'id': request_id, 'error': str(error)})
+        valid = []
+        levels = []
+        for found, result in self.verdicts(candidates):
+            if result and level is not None and found > level:
+                result = False
+            valid.append(_encode_valid(result))
+            levels.append(None if found is TOO_EXPENSIVE else found)
+        return json.dumps({'id': request_id, 'valid': valid, 'levels': levels})
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        respond = self.server.validator.respond
+        max_line_length = self.server.max_line_length
+        pending = b''
+        try:
+            while True:
+                chunk = self.rfile.read1(_READ_SIZE)
+                if not chunk:
+                    break
+                lines = (pending + chunk).split(b'\n')
+                pending = lines.pop()
+                if lines:
+                    self.wfile.write(''.join(
+                        respond(line.decode('utf-8', 'replace')) + '\n' for line in lines
+                    ).encode('utf-8'))
+                if len(pending) > max_line_length:
+                    # do not keep buffering a line that will never be answered
+                    self.wfile.write(json.dumps({
+                        'id': None,
+                        'error': 'request line longer than {} bytes'.format(max_line_length),
+                    }).encode('utf-8') + b'\n')
+                    return
+            if pending:
+                # a last request without its newline
+                self.wfile.write((respond(pending.decode('utf-8', 'replace')) + '\n')
+                                 .encode('utf-8'))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socket, 'AF_UNIX') and hasattr(socketserver, 'UnixStreamServer'):
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+def make_server(validator, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None,
+                max_line_length=MAX_LINE_LENGTH):
+    """Return a threading socketserver answering requests with validator.
+
+    It listens on the Unix socket at socket_path if given, replacing a
+    stale socket file, and on host and port otherwise. Connections sending
+    a line of more than max_line_length bytes are closed.
+    """
+    if max_line_length < 1:
+        raise ValueError('max_line_length must be at least 1')
+    if socket_path is None:
+        server = _TCPServer((host, port), _Handler)
+    else:
+        if not hasattr(socket, 'AF_UNIX'):
+            raise ValueError('Unix sockets are not supported on this platform')
+        try:
+            if stat.S_ISSOCK(os.stat(socket_path).st_mode):
+                os.unlink(socket_path)
+        except FileNotFoundError:
+            pass
+        server = _UnixServer(socket_path, _Handler)
+    server.validator = validator
+    server.max_line_length = max_line_length
+    return server
+
+
+class Client(object):
+    """Sends candidates to a server and reads back their verdicts."""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None,
+                 batch_size=1000):
+        if batch_size < 1:
+            raise ValueError('batch_size must be at least 1')
+        if socket_path is None:
+            self._socket = socket.create_connection((host, port))
+        elif not hasattr(socket, 'AF_UNIX'):
+            raise ValueError('Unix sockets are not supported on this platform')
+        else:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(socket_path)
+        self.batch_size = batch_size
+        self._reader = self._socket.makefile('rb')
+
+    def verdicts(self, edtf_candidates, level=None):
+        """Yield (candidate, (level, valid)) pairs in input order.
+
+        Batches are sent from a separate thread while the answers to the
+        earlier ones are read, at most 16 batches ahead. Whatever stops the
+        sending thread, a usage error's SystemExit included, is raised again
+        here.
+        """
+        sent = queue.Queue(16)
+        failure = []
+
+        def send():
+            try:
+                for batch in valid_edtf._chunks(edtf_candidates, self.batch_size):
+                    sent.put(batch)
+                    request = {'candidates': batch}
+                    if level is not None:
+                        request['level'] = level
+                    self._socket.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            except BaseException as error:
+                failure.append(error)
+            finally:
+                sent.put(None)
+
+        sender = threading.Thread(target=send, daemon=True)
+        sender.start()
+        while True:
+            batch = sent.get()
+            if batch is None:
+                break
+            line = self._reader.readline()
+            if not line:
+                raise ConnectionError('the server closed the connection')
+            response = json.loads(line.decode('utf-8'))
+            if 'error' in response:
+                raise ValueError(response['error'])
+            for pair in zip(batch, zip(response['levels'],
+                                       map(_decode_valid, response['valid']))):
+                yield pair
+        sender.join()
+        if failure:
+            raise failure[0]
+
+    def close(self):
+        self._reader.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def _add_address_arguments(parser):
+    parser.add_argument('--socket', dest='socket_path', metavar='PATH',
+                        help='use the Unix socket at PATH instead of TCP')
+    parser.add_argument('--host', default=DEFAULT_HOST,
+                        help='TCP host (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help='TCP port (default: %(default)s)')
+
+
+def main(argv):
+    """Run the serve or client command of the console script."""
+    parser = argparse.ArgumentParser(prog='edtf-validate')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+    serve_parser = commands.add_parser(
+        'serve', help='validate requests on a socket until interrupted')
+    _add_address_arguments(serve_parser)
+    serve_parser.add_argument('--cache-size', type=int, default=65536, metavar='N',
+                              help='remember the results of the last N distinct '
+                                   'candidates (default: %(default)s, 0 to disable)')
+    serve_parser.add_argument('--engine', choices=sorted(valid_edtf.ENGINES), default=None,
+                              help='validation engine (default: %s)'
+                                   % valid_edtf.DEFAULT_ENGINE)
+    serve_parser.add_argument('--max-line-length', type=int, default=MAX_LINE_LENGTH,
+                              metavar='BYTES',
+                              help='close connections sending a longer request line '
+                                   '(default: %(default)s)')
+    valid_edtf._add_limit_arguments(serve_parser)
+    client_parser = commands.add_parser(
+        'client', help='validate candidates with a running server')
+    _add_address_arguments(client_parser)
+    valid_edtf._add_input_arguments(client_parser)
+    valid_edtf._add_output_arguments(client_parser)
+    client_parser.add_argument('--batch-size', type=int, default=1000, metavar='N',
+                               help='candidates per request (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        with valid_edtf._limits_applied(valid_edtf._limits_from(args, serve_parser)):
+            try:
+                server = make_server(Validator(args.engine, args.cache_size),
+                                     args.host, args.port, args.socket_path,
+                                     args.max_line_length)
+            except (OSError, ValueError) as error:
+                serve_parser.error(str(error))
+            sys.stderr.write('listening on {}\n'.format(
+                args.socket_path or '{}:{}'.format(*server.server_address[:2])))
+            sys.stderr.flush()
+            # stop as on Ctrl-C, so a Unix socket file is removed
+            signal.signal(signal.SIGTERM, _interrupt)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                server.server_close()
+                if args.socket_path is not None:
+                    os.unlink(args.socket_path)
+        return
+    try:
+        client = Client(args.host, args.port, args.socket_path, args.batch_size)
+    except (OSError, ValueError) as error:
+        client_parser.error(str(error))
+    with client:
+        candidates = valid_edtf._input_candidates(args, client_parser)
+        try:
+            valid_edtf._write_pairs(client.verdicts(candidates), args)
+        except ConnectionError as error:
+            client_parser.error(str(error))
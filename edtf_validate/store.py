@@ -0,0 +1,196 @@
+"""
+store.py keeps validation verdicts in a SQLite file, so that runs over
+data that has mostly been validated before only parse what is new.
+valid_edtf consults it in validate_many and the command line once it has
+been turned on with valid_edtf.enable_store or --store.
+
+Verdicts are only valid for the code that produced them: the file records
+a fingerprint of the modules that decide them and of pyparsing, and is
+emptied when opened by a different version.
+"""
+import contextlib
+import hashlib
+import os
+import sqlite3
+import threading
+
+import pyparsing
+
+# the modules whose code decides a verdict
+_VERDICT_MODULES = ('valid_edtf', 'scanner', 'lists', 'bounds', 'limits')
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS verdicts (
+    candidate TEXT PRIMARY KEY,
+    level INTEGER,
+    valid INTEGER NOT NULL,
+    used INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS verdicts_used ON verdicts (used);
+"""
+# candidates looked up per query, below SQLite's oldest limit of 999 variables
+_QUERY_SIZE = 900
+# connections inherited from the parent of a forked process; SQLite must not
+# use them, not even to close them, so they are kept here and never freed
+_inherited = []
+
+_version = None
+
+
+def verdict_version():
+    """Return the fingerprint of the code that decides verdicts."""
+    global _version
+    if _version is None:
+        digest = hashlib.sha256(pyparsing.__version__.encode('utf-8'))
+        directory = os.path.dirname(os.path.abspath(__file__))
+        for name in _VERDICT_MODULES:
+            with open(os.path.join(directory, name + '.py'), 'rb') as source:
+                digest.update(source.read())
+        _version = digest.hexdigest()
+    return _version
+
+
+class VerdictStore(object):
+    """Verdicts of candidates, kept in the SQLite file at path.
+
+    Each open is a new run; the candidates looked up or added in it are
+    marked with its number. Once more than max_entries verdicts are kept,
+    trim and close drop those unused for the most runs, and compact also
+    gives the space back to the file system. max_entries None keeps
+    everything. Pass the generation of an open store to share its run,
+    as parallel workers do. The threads of a process share one connection,
+    taking turns; a forked child process that uses the store opens a
+    connection of its own.
+    """
+
+    def __init__(self, path, max_entries=10000000, generation=None):
+        if max_entries is not None and max_entries < 1:
+            raise ValueError('max_entries must be at least 1')
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._opened = self._connect()
+        self._pid = os.getpid()
+        self._lock = threading.RLock()
+        with self._locked() as connection, connection:
+            connection.executescript(_SCHEMA)
+            meta = dict(connection.execute('SELECT key, value FROM meta'))
+            if meta.get('version') != verdict_version():
+                connection.execute('DELETE FROM verdicts')
+                self._set('version', verdict_version())
+            if generation is None:
+                generation = int(meta.get('generation', 0)) + 1
+                self._set('generation', str(generation))
+        self.generation = generation
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        # a lost last commit only costs parsing again
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    @property
+    def _connection(self):
+        """The connection of this process, opened again after a fork."""
+        if self._pid != os.getpid() and self._opened is not None:
+            _inherited.append(self._opened)
+            self._opened = self._connect()
+            self._lock = threading.RLock()
+            self._pid = os.getpid()
+        return self._opened
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Hold the connection of this process for the block, alone."""
+        connection = self._connection
+        with self._lock:
+            yield connection
+
+    def _set(self, key, value):
+        with self._locked() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def __len__(self):
+        with self._locked() as connection:
+            return connection.execute('SELECT count(*) FROM verdicts').fetchone()[0]
+
+    def get_many(self, edtf_candidates):
+        """Return {candidate: (level, valid)} for those of the candidates kept."""
+        found = {}
+        distinct = list(dict.fromkeys(edtf_candidates))
+        with self._locked() as connection, connection:
+            for start in range(0, len(distinct), _QUERY_SIZE):
+                part = distinct[start:start + _QUERY_SIZE]
+                marks = ','.join('?' * len(part))
+                rows = connection.execute(
+                    'SELECT candidate, level, valid FROM verdicts '
+                    'WHERE candidate IN ({})'.format(marks), part)
+                for edtf_candidate, level, valid in rows:
+                    found[edtf_candidate] = (level, bool(valid))
+                connection.execute(
+                    'UPDATE verdicts SET used = ? WHERE used < ? '
+                    'AND candidate IN ({})'.format(marks),
+                    [self.generation, self.generation] + part)
+            self.hits += len(found)
+            self.misses += len(distinct) - len(found)
+        return found
+
+    def put_many(self, verdicts):
+        """Keep (candidate, (level, valid)) pairs."""
+        with self._locked() as connection, connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO verdicts (candidate, level, valid, used) '
+                'VALUES (?, ?, ?, ?)',
+                ((edtf_candidate, level, int(valid), self.generation)
+                 for edtf_candidate, (level, valid) in verdicts))
+
+    def trim(self):
+        """Drop the least recently used verdicts beyond max_entries."""
+        if self.max_entries is None:
+            return
+        with self._locked() as connection:
+            excess = len(self) - self.max_entries
+            if excess > 0:
+                with connection:
+                    connection.execute(
+                        'DELETE FROM verdicts WHERE candidate IN '
+                        '(SELECT candidate FROM verdicts ORDER BY used LIMIT ?)', (excess,))
+
+    def compact(self):
+        """Trim, then rewrite the file without the space freed."""
+        with self._locked() as connection:
+            self.trim()
+            connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            connection.execute('VACUUM')
+
+    def clear(self):
+        """Drop every verdict."""
+        with self._locked() as connection, connection:
+            connection.execute('DELETE FROM verdicts')
+
+    def stats(self):
+        """Return the lookups of this run and the number of verdicts kept."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self),
+            'max_entries': self.max_entries,
+            'generation': self.generation,
+        }
+
+    def close(self):
+        """Trim and close the file."""
+        if self._opened is not None:
+            with self._locked() as connection:
+                self.trim()
+                connection.close()
+                self._opened = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -9,603 +9,1524 @@ https://www.loc.gov/standards/datetime/edtf.html
 from __future__ import print_function
 
 import argparse
-import calendar
-import datetime
+import array
+import collections
+import contextlib
+import itertools
+import os
 import re
+import sys
+import time
+import warnings
+
+from edtf_validate import bounds, lists, parsed, scanner
+from edtf_validate.cache import ResultCache
+from edtf_validate.limits import TOO_EXPENSIVE, BudgetExceeded, Limits, checkpoint
+from edtf_validate.metrics import Registry
+from edtf_validate.packrat import Packrat
+from pyparsing import (Optional, one_of, OneOrMore, ZeroOrMore, Empty, StringStart, StringEnd,
+                       ParseException, ParserElement, Regex)
+
+
+def _productions(namespace):
+    """Return the grammar productions found in a namespace by name."""
+    return {
+        name: value for name, value in namespace.items()
+        if isinstance(value, ParserElement)
+    }
+
+
+def _take(grammar, names):
+    """Return the productions with the given space separated names."""
+    return [grammar[name] for name in names.split()]
+
 
-from pyparsing import Optional, one_of, OneOrMore, ZeroOrMore, Empty, StringStart, StringEnd
 """
 ------------------------------------------------------------------------------
 LEVEL 0 GRAMMAR START
 ------------------------------------------------------------------------------
 """
-positiveDigit = one_of("1 2 3 4 5 6 7 8 9")
-digit = positiveDigit | "0"
-# year definition
-positive_year = (
-    positiveDigit + digit + digit + digit
-    | digit + positiveDigit + digit + digit
-    | digit + digit + positiveDigit + digit
-    | digit + digit + digit + positiveDigit
-)
-non_negative_year = positive_year | "0000"
-# date
-oneThru12 = one_of("01 02 03 04 05 06 07 08 09 10 11 12")
-oneThru13 = oneThru12 | "13"
-oneThru23 = oneThru13 | one_of("14 15 16 17 18 19 20 21 22 23")
-zeroThru23 = "00" | oneThru23
-oneThru29 = oneThru23 | one_of("24 25 26 27 28 29")
-oneThru30 = oneThru29 | "30"
-oneThru31 = oneThru30 | "31"
-oneThru59 = oneThru31 | one_of("32 33 34 35 36 37 38 39 40 41 42 43 44 45 46 \
-    47 48 49 50 51 52 53 54 55 56 57 58 59")
-zeroThru59 = "00" | oneThru59
-month = oneThru12
-monthDay = (
-    one_of("01 03 05 07 08 10 12") + "-" + oneThru31
-    | one_of("04 06 09 11") + "-" + oneThru30
-    | "02-" + oneThru29
-)
-non_negative_yearMonth = non_negative_year + "-" + month
-non_negative_yearMonthDay = non_negative_year + "-" + monthDay
-hour = zeroThru23
-minute = zeroThru59
-second = zeroThru59
-day = oneThru31
-non_negative_date = non_negative_yearMonthDay | non_negative_yearMonth | non_negative_year
-baseTime = hour + ":" + minute + ":" + second | "24:00:00"
-zoneOffsetHour = oneThru13
-zoneOffset = "Z" | (one_of("+ -") + (
-    zoneOffsetHour + Optional(":" + minute)
-    | "14:00"
-    | "00:" + oneThru59
-))
-time = baseTime + Optional(zoneOffset)
-dateAndTime = non_negative_date + "T" + time
-L0Interval = non_negative_date + "/" + non_negative_date
+
+
+def _level0_grammar(optimized):
+    """Build the level 0 productions.
+
+    With optimized set, fixed width terminals are single compiled
+    Regex tokens instead of alternations of literals.
+    """
+    if optimized:
+        positiveDigit = Regex(r"[1-9]")
+        digit = Regex(r"[0-9]")
+        positive_year = Regex(r"(?!0000)[0-9]{4}")
+        non_negative_year = Regex(r"[0-9]{4}")
+        oneThru12 = Regex(r"0[1-9]|1[0-2]")
+        oneThru13 = Regex(r"0[1-9]|1[0-3]")
+        oneThru23 = Regex(r"0[1-9]|1[0-9]|2[0-3]")
+        zeroThru23 = Regex(r"[01][0-9]|2[0-3]")
+        oneThru29 = Regex(r"0[1-9]|[12][0-9]")
+        oneThru30 = Regex(r"0[1-9]|[12][0-9]|30")
+        oneThru31 = Regex(r"0[1-9]|[12][0-9]|3[01]")
+        oneThru59 = Regex(r"0[1-9]|[1-5][0-9]")
+        zeroThru59 = Regex(r"[0-5][0-9]")
+        monthDay = Regex(
+            r"(?:0[13578]|1[02])-(?:0[1-9]|[12][0-9]|3[01])"
+            r"|(?:0[469]|11)-(?:0[1-9]|[12][0-9]|30)"
+            r"|02-(?:0[1-9]|[12][0-9])"
+        )
+        zoneOffset = Regex(
+            r"Z|[+-](?:(?:0[1-9]|1[0-3])(?::[0-5][0-9])?|14:00|00:(?:0[1-9]|[1-5][0-9]))"
+        )
+    else:
+        positiveDigit = one_of("1 2 3 4 5 6 7 8 9")
+        digit = positiveDigit | "0"
+        # year definition
+        positive_year = (
+            positiveDigit + digit + digit + digit
+            | digit + positiveDigit + digit + digit
+            | digit + digit + positiveDigit + digit
+            | digit + digit + digit + positiveDigit
+        )
+        non_negative_year = positive_year | "0000"
+        # date
+        oneThru12 = one_of("01 02 03 04 05 06 07 08 09 10 11 12")
+        oneThru13 = oneThru12 | "13"
+        oneThru23 = oneThru13 | one_of("14 15 16 17 18 19 20 21 22 23")
+        zeroThru23 = "00" | oneThru23
+        oneThru29 = oneThru23 | one_of("24 25 26 27 28 29")
+        oneThru30 = oneThru29 | "30"
+        oneThru31 = oneThru30 | "31"
+        oneThru59 = oneThru31 | one_of("32 33 34 35 36 37 38 39 40 41 42 43 44 45 46 \
+            47 48 49 50 51 52 53 54 55 56 57 58 59")
+        zeroThru59 = "00" | oneThru59
+        monthDay = (
+            one_of("01 03 05 07 08 10 12") + "-" + oneThru31
+            | one_of("04 06 09 11") + "-" + oneThru30
+            | "02-" + oneThru29
+        )
+        zoneOffset = "Z" | (one_of("+ -") + (
+            oneThru13 + Optional(":" + zeroThru59)
+            | "14:00"
+            | "00:" + oneThru59
+        ))
+    month = oneThru12
+    non_negative_yearMonth = non_negative_year + "-" + month
+    non_negative_yearMonthDay = non_negative_year + "-" + monthDay
+    hour = zeroThru23
+    minute = zeroThru59
+    second = zeroThru59
+    day = oneThru31
+    non_negative_date = non_negative_yearMonthDay | non_negative_yearMonth | non_negative_year
+    baseTime = hour + ":" + minute + ":" + second | "24:00:00"
+    zoneOffsetHour = oneThru13
+    time = baseTime + Optional(zoneOffset)
+    dateAndTime = non_negative_date + "T" + time
+    L0Interval = non_negative_date + "/" + non_negative_date
+    # level 0 consists of an interval, date and time or date
+    level0Expression = L0Interval | dateAndTime | non_negative_date.leave_whitespace()
+    return _productions(locals())
+
+
 """
 ------------------------------------------------------------------------------
 LEVEL 1 GRAMMAR START
 ------------------------------------------------------------------------------
 """
-# Negative years
-negative_year = "-" + positive_year
-year = positive_year | negative_year | "0000"
-yearMonth = year + "-" + month
-yearMonthDay = year + "-" + monthDay
-date = yearMonthDay | yearMonth | year
-negative_date = negative_year + "-" + monthDay | negative_year + "-" + month | negative_year
-negative_time = negative_date + "T" + time
-# Auxiliary Assignments for Level 1
-UASymbol = one_of("? ~ %")
-seasonNumber = one_of("21 22 23 24")
-season = year + "-" + seasonNumber
-dateOrSeason = season | date
-# uncertain Or Approximate Date
-uncertainOrApproxDate = date + UASymbol
-# unspecified
-yearWithOneOrTwoUnspecifedDigits = Optional("-") + digit + digit + (digit | 'X') + 'X'
-monthUnspecified = year + '-XX'
-dayUnspecified = yearMonth + '-XX'
-dayAndMonthUnspecified = year + '-XX-XX'
-unspecified = (
-    dayAndMonthUnspecified
-    | dayUnspecified
-    | monthUnspecified
-    | yearWithOneOrTwoUnspecifedDigits
-)
-# L1Interval
-L1Interval = (
-    negative_date + "/" + date
-    | (dateOrSeason + UASymbol | dateOrSeason | "..") + "/"
-    + (dateOrSeason + UASymbol | ".." | season)
-    | (dateOrSeason + UASymbol | ".." | season) + "/"
-    + (dateOrSeason + UASymbol | dateOrSeason | "..")
-    | (Empty() + "/" + (dateOrSeason + UASymbol | dateOrSeason | ".."))
-    | (dateOrSeason + UASymbol | dateOrSeason | "..") + "/" + Empty()
-)
-# Long Year - Simple Form
-longYearSimple = (
-    "Y" + Optional("-")
-    + positiveDigit + digit + digit + digit + OneOrMore(digit)
-)
+
+
+def _level1_grammar(grammar, optimized):
+    """Build the level 1 productions on top of the level 0 ones."""
+    positiveDigit, digit, positive_year, month, monthDay, time = _take(
+        grammar, "positiveDigit digit positive_year month monthDay time"
+    )
+    if optimized:
+        negative_year = Regex(r"-(?!0000)[0-9]{4}")
+        year = Regex(r"-?(?!0000)[0-9]{4}|0000")
+        yearWithOneOrTwoUnspecifedDigits = Regex(r"-?[0-9]{2}[0-9X]X")
+        longYearSimple = Regex(r"Y-?[1-9][0-9]{4,}")
+    else:
+        # Negative years
+        negative_year = "-" + positive_year
+        year = positive_year | negative_year | "0000"
+        yearWithOneOrTwoUnspecifedDigits = Optional("-") + digit + digit + (digit | 'X') + 'X'
+        # Long Year - Simple Form
+        longYearSimple = (
+            "Y" + Optional("-")
+            + positiveDigit + digit + digit + digit + OneOrMore(digit)
+        )
+    yearMonth = year + "-" + month
+    yearMonthDay = year + "-" + monthDay
+    date = yearMonthDay | yearMonth | year
+    negative_date = negative_year + "-" + monthDay | negative_year + "-" + month | negative_year
+    negative_time = negative_date + "T" + time
+    # Auxiliary Assignments for Level 1
+    UASymbol = one_of("? ~ %")
+    seasonNumber = one_of("21 22 23 24")
+    season = year + "-" + seasonNumber
+    dateOrSeason = season | date
+    # uncertain Or Approximate Date
+    uncertainOrApproxDate = date + UASymbol
+    # unspecified
+    monthUnspecified = year + '-XX'
+    dayUnspecified = yearMonth + '-XX'
+    dayAndMonthUnspecified = year + '-XX-XX'
+    unspecified = (
+        dayAndMonthUnspecified
+        | dayUnspecified
+        | monthUnspecified
+        | yearWithOneOrTwoUnspecifedDigits
+    )
+    # L1Interval
+    L1Interval = (
+        negative_date + "/" + date
+        | (dateOrSeason + UASymbol | dateOrSeason | "..") + "/"
+        + (dateOrSeason + UASymbol | ".." | season)
+        | (dateOrSeason + UASymbol | ".." | season) + "/"
+        + (dateOrSeason + UASymbol | dateOrSeason | "..")
+        | (Empty() + "/" + (dateOrSeason + UASymbol | dateOrSeason | ".."))
+        | (dateOrSeason + UASymbol | dateOrSeason | "..") + "/" + Empty()
+    )
+    # Level 2 lists join these without skipping whitespace between their
+    # elements. That is set here, before level1Expression is built on them,
+    # so level 1 matches the same whether or not level 2 has been built.
+    for production in (date, uncertainOrApproxDate, unspecified):
+        production.leave_whitespace()
+    level1Expression = (
+        L1Interval
+        | longYearSimple
+        | uncertainOrApproxDate
+        | unspecified
+        | season
+        | negative_time
+        | negative_date
+    )
+    return _productions(locals())
+
+
 """
 ------------------------------------------------------------------------------
 LEVEL 2 GRAMMAR START
 ------------------------------------------------------------------------------
 """
-# Internal Uncertain or Approximate
-UAYear = (year + UASymbol | UASymbol + year)
-UAYearOrYear = UAYear | year
-UAMonth = (month + UASymbol | UASymbol + month)
-UAMonthOrMonth = UAMonth | month
-UADay = (day + UASymbol | UASymbol + day)
-UADayOrDay = UADay | day
-
-internalUncertainOrApproximate = (
-    ~(StringStart() + uncertainOrApproxDate + StringEnd()) + (
-        UAYear + Optional("-" + UAMonthOrMonth + "-" + UADayOrDay | "-" + UAMonthOrMonth)
-        | UAYearOrYear + "-" + UAMonth + Optional("-" + UADayOrDay)
-        | UAYearOrYear + "-" + UAMonthOrMonth + "-" + UADay
-        | season + UASymbol
+
+
+def _level2_grammar(grammar, optimized):
+    """Build the level 2 productions on top of the level 0 and 1 ones."""
+    positiveDigit, digit, month, day, monthDay = _take(
+        grammar, "positiveDigit digit month day monthDay"
     )
-)
-# Internal Unspecified
-positiveDigitOrX = positiveDigit | "X"
-digitOrX = positiveDigitOrX | "0"
-yearWithX = (
-    Optional("-") + "X" + digitOrX + digitOrX + digitOrX
-    | Optional("-") + digitOrX + "X" + digitOrX + digitOrX
-    | Optional("-") + digitOrX + digitOrX + "X" + digitOrX
-    | Optional("-") + digitOrX + digitOrX + digitOrX + "X"
-)
-monthWithX = "X" + digitOrX | "0X" | "1X"
-oneThru3 = one_of("1 2 3")
-dayWithX = "X" + digitOrX | oneThru3 + "X" | "0X"
-monthDayWithX = (
-    monthWithX + "-" + dayWithX
-    | month + "-" + dayWithX
-    | monthWithX + "-" + day
-)
-yearMonthWithX = (
-    yearWithX + "-" + monthWithX
-    | yearWithX + "-" + month
-    | year + "-" + monthWithX
-)
-yearmonthDayWithX = (
-    yearWithX + "-" + monthDayWithX
-    | yearWithX + "-" + monthDay
-    | year + "-" + monthDayWithX
-)
-internalUnspecified = (
-    ~(StringStart() + unspecified + StringEnd())
-    + (yearmonthDayWithX | yearMonthWithX | yearWithX)
-)
-# Auxiliary Assignments for Level 2
-dateWithInternalUncertainty = (
-    internalUncertainOrApproximate | internalUnspecified
-)
-consecutives = (
-    yearMonthDay + ".." + yearMonthDay
-    | yearMonth + ".." + yearMonth
-    | year + ".." + year
-)
-# Inclusive list and choice list
-earlier = ".." + date
-later = date + ".."
-listElement = (
-    dateWithInternalUncertainty.leave_whitespace()
-    | uncertainOrApproxDate.leave_whitespace()
-    | unspecified.leave_whitespace()
-    | consecutives.leave_whitespace()
-    | date.leave_whitespace()
-)
-listContent = (
-    earlier + "," + ZeroOrMore(listElement + ",") + later
-    | ZeroOrMore(listElement + ",") + consecutives
-    | ZeroOrMore(listElement + ",") + later
-    | earlier + ZeroOrMore("," + listElement)
-    | listElement + OneOrMore("," + listElement)
-    | consecutives
-)
-choiceList = "[" + listContent + "]"
-inclusiveList = "{" + listContent + "}"
-# L2Interval
-L2Interval = (~(StringStart() + L1Interval + StringEnd()) + (
-    dateWithInternalUncertainty + "/" + dateWithInternalUncertainty
-    | dateOrSeason + "/" + dateWithInternalUncertainty
-    | dateWithInternalUncertainty + "/" + dateOrSeason
-))
-# Long Year - Scientific Form
-positiveInteger = positiveDigit + ZeroOrMore(digit)
-longYearScientific = (
-    "Y" + Optional("-") + positiveInteger + "E" + positiveInteger
-)
-# Significant digits
-significantDigitYear = (
-    (year | longYearScientific | longYearSimple)
-    + ("S" + positiveInteger)
-)
-# Season for sub-year grouping
-extendedSeasonNumber = one_of("25 26 27 28 29 30 31 32 33 34 35 36 37 38 39 40 41")
-extendedSeason = year + "-" + extendedSeasonNumber
+    year, yearMonth, yearMonthDay, date, UASymbol, season, dateOrSeason = _take(
+        grammar, "year yearMonth yearMonthDay date UASymbol season dateOrSeason"
+    )
+    uncertainOrApproxDate, unspecified, L1Interval, longYearSimple = _take(
+        grammar, "uncertainOrApproxDate unspecified L1Interval longYearSimple"
+    )
+    if optimized:
+        yearWithX = Regex(r"-?(?=[0-9]{0,3}X)[0-9X]{4}")
+        monthWithX = Regex(r"X[0-9X]|[01]X")
+        dayWithX = Regex(r"X[0-9X]|[0-3]X")
+        positiveInteger = Regex(r"[1-9][0-9]*")
+    else:
+        # Internal Unspecified
+        positiveDigitOrX = positiveDigit | "X"
+        digitOrX = positiveDigitOrX | "0"
+        yearWithX = (
+            Optional("-") + "X" + digitOrX + digitOrX + digitOrX
+            | Optional("-") + digitOrX + "X" + digitOrX + digitOrX
+            | Optional("-") + digitOrX + digitOrX + "X" + digitOrX
+            | Optional("-") + digitOrX + digitOrX + digitOrX + "X"
+        )
+        monthWithX = "X" + digitOrX | "0X" | "1X"
+        oneThru3 = one_of("1 2 3")
+        dayWithX = "X" + digitOrX | oneThru3 + "X" | "0X"
+        positiveInteger = positiveDigit + ZeroOrMore(digit)
+    # Internal Uncertain or Approximate
+    UAYear = (year + UASymbol | UASymbol + year)
+    UAYearOrYear = UAYear | year
+    UAMonth = (month + UASymbol | UASymbol + month)
+    UAMonthOrMonth = UAMonth | month
+    UADay = (day + UASymbol | UASymbol + day)
+    UADayOrDay = UADay | day
+
+    internalUncertainOrApproximate = (
+        ~(StringStart() + uncertainOrApproxDate + StringEnd()) + (
+            UAYear + Optional("-" + UAMonthOrMonth + "-" + UADayOrDay | "-" + UAMonthOrMonth)
+            | UAYearOrYear + "-" + UAMonth + Optional("-" + UADayOrDay)
+            | UAYearOrYear + "-" + UAMonthOrMonth + "-" + UADay
+            | season + UASymbol
+        )
+    )
+    monthDayWithX = (
+        monthWithX + "-" + dayWithX
+        | month + "-" + dayWithX
+        | monthWithX + "-" + day
+    )
+    yearMonthWithX = (
+        yearWithX + "-" + monthWithX
+        | yearWithX + "-" + month
+        | year + "-" + monthWithX
+    )
+    yearmonthDayWithX = (
+        yearWithX + "-" + monthDayWithX
+        | yearWithX + "-" + monthDay
+        | year + "-" + monthDayWithX
+    )
+    internalUnspecified = (
+        ~(StringStart() + unspecified + StringEnd())
+        + (yearmonthDayWithX | yearMonthWithX | yearWithX)
+    )
+    # Auxiliary Assignments for Level 2
+    dateWithInternalUncertainty = (
+        internalUncertainOrApproximate | internalUnspecified
+    )
+    consecutives = (
+        yearMonthDay + ".." + yearMonthDay
+        | yearMonth + ".." + yearMonth
+        | year + ".." + year
+    )
+    # Inclusive list and choice list
+    earlier = ".." + date
+    later = date + ".."
+    listElement = (
+        dateWithInternalUncertainty.leave_whitespace()
+        | uncertainOrApproxDate
+        | unspecified
+        | consecutives.leave_whitespace()
+        | date
+    )
+    listContent = (
+        earlier + "," + ZeroOrMore(listElement + ",") + later
+        | ZeroOrMore(listElement + ",") + consecutives
+        | ZeroOrMore(listElement + ",") + later
+        | earlier + ZeroOrMore("," + listElement)
+        | listElement + OneOrMore("," + listElement)
+        | consecutives
+    )
+    choiceList = "[" + listContent + "]"
+    inclusiveList = "{" + listContent + "}"
+    # L2Interval
+    L2Interval = (~(StringStart() + L1Interval + StringEnd()) + (
+        dateWithInternalUncertainty + "/" + dateWithInternalUncertainty
+        # Empty() skips leading whitespace as dateOrSeason did before level 1
+        # left it off date, whether or not dateOrSeason has been parsed yet.
+        | Empty() + dateOrSeason + "/" + dateWithInternalUncertainty
+        | dateWithInternalUncertainty + "/" + dateOrSeason
+    ))
+    # Long Year - Scientific Form
+    longYearScientific = (
+        "Y" + Optional("-") + positiveInteger + "E" + positiveInteger
+    )
+    # Significant digits
+    significantDigitYear = (
+        (year | longYearScientific | longYearSimple)
+        + ("S" + positiveInteger)
+    )
+    # Season for sub-year grouping
+    extendedSeasonNumber = one_of("25 26 27 28 29 30 31 32 33 34 35 36 37 38 39 40 41")
+    extendedSeason = year + "-" + extendedSeasonNumber
+    level2Expression = (
+        L2Interval
+        | choiceList
+        | inclusiveList
+        | internalUnspecified
+        | internalUncertainOrApproximate
+        | extendedSeason
+        | significantDigitYear
+        | longYearScientific
+    )
+    return _productions(locals())
+
+
 """
 ------------------------------------------------------------------------------
 GLOBAL GRAMMAR START
 ------------------------------------------------------------------------------
 """
-# level 0 consists of an interval, date and time or date
-level0Expression = L0Interval | dateAndTime | non_negative_date.leave_whitespace()
-# level 1
-level1Expression = (
-    L1Interval
-    | longYearSimple
-    | uncertainOrApproxDate
-    | unspecified
-    | season
-    | negative_time
-    | negative_date
-)
-# level 2
-level2Expression = (
-    L2Interval
-    | choiceList
-    | inclusiveList
-    | internalUnspecified
-    | internalUncertainOrApproximate
-    | extendedSeason
-    | significantDigitYear
-    | longYearScientific
-)
-# everything resolves to a 'dateTimeString'
-dateTimeString = level2Expression | level1Expression | level0Expression
+
+
+def _global_grammar(grammar):
+    """Build the expressions that join all three levels."""
+    level0Expression, level1Expression, level2Expression = _take(
+        grammar, "level0Expression level1Expression level2Expression"
+    )
+    # everything resolves to a 'dateTimeString'
+    dateTimeString = level2Expression | level1Expression | level0Expression
+    return _productions(locals())
+
+
+LEVELS = (0, 1, 2)
+_grammars = {}
+# the Packrat memoizing the pyparsing engines, if enabled
+packrat = None
+
+
+def get_grammar(optimized=False, level=2):
+    """Return the productions of levels 0 through level by name.
+
+    Each level is built the first time it is asked for, so importing this
+    module builds nothing and checking a level 0 date never builds level 2.
+    The optimized grammar replaces the fixed width terminals of the
+    reference grammar with compiled Regex tokens. Both accept the same
+    candidates as long as they contain no whitespace.
+    """
+    if level not in LEVELS:
+        raise ValueError('level must be one of %s' % (LEVELS,))
+    key = (optimized, level)
+    if key not in _grammars:
+        if level == 0:
+            grammar = _level0_grammar(optimized)
+        else:
+            grammar = dict(get_grammar(optimized, level - 1))
+            build = _level1_grammar if level == 1 else _level2_grammar
+            grammar.update(build(grammar, optimized))
+        if level == 2:
+            grammar.update(_global_grammar(grammar))
+        if packrat is not None:
+            packrat.apply(grammar.values())
+        _grammars[key] = grammar
+    return _grammars[key]
+
+
+def enable_packrat(maxsize=4096):
+    """Memoize the pyparsing and optimized engines with a bounded Packrat.
+
+    Only this module's grammar is affected; pyparsing's own packrat
+    setting and other grammars in the process are left alone. Each
+    thread keeps at most maxsize results, and only for the candidate it
+    is classifying. Enabling again replaces the Packrat.
+    """
+    global packrat
+    disable_packrat()
+    packrat = Packrat(maxsize)
+    for grammar in _grammars.values():
+        packrat.apply(grammar.values())
+    return packrat
+
+
+def disable_packrat():
+    """Stop memoizing the grammar."""
+    global packrat
+    if packrat is not None:
+        for grammar in _grammars.values():
+            Packrat.remove(grammar.values())
+    packrat = None
+
+
+def __getattr__(name):
+    """Build the reference grammar when one of its productions is imported."""
+    if not name.startswith('_'):
+        for level in LEVELS:
+            grammar = get_grammar(level=level)
+            if name in grammar:
+                return grammar[name]
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+
+def is_valid_interval(edtf_candidate):
+    """Test to see if the edtf candidate is a valid interval"""
+    if edtf_candidate.count('/') != 1:
+        return False
+    start, end = edtf_candidate.split('/')
+    return bounds.in_order(start, end)
+
+
+"""
+------------------------------------------------------------------------------
+DEPRECATED INTERVAL HELPERS
+------------------------------------------------------------------------------
+is_valid_interval used to order endpoints by rewriting them with these and
+parsing the result with strptime. It now goes through bounds; they are kept
+for callers of the old API, work out their results with bounds and will be
+removed in the next major release.
+"""
 interval_replacements = {
     '~': '',
     '?': '',
     '%': '',
 }
+# season start and end months, as bounds.SEASON_MONTHS
+seasons = {
+    str(season): {'from': '%02d' % first, 'to': '%02d' % last}
+    for season, (first, last) in bounds.SEASON_MONTHS.items()
+}
+X_PATTERN = re.compile(r'(-?)([\dX]{4})(-[\dX]{2})?(-[\dX]{2})?/'
+                       r'(-?)([\dX]{4})(-[\dX]{2})?(-[\dX]{2})?')
+
+
+def _deprecated(name, replacement):
+    warnings.warn('{} is deprecated; use {}'.format(name, replacement),
+                  DeprecationWarning, stacklevel=3)
+
+
+def _month_of(month, latest):
+    resolved = bounds.resolve('2000-' + month.lstrip('-'), latest)
+    return None if resolved is None else '%02d' % resolved[1]
+
+
+def _day_of(day, year='2000', month='01', latest=False):
+    resolved = bounds.resolve('{}-{}-{}'.format(year, month.lstrip('-'), day.lstrip('-')),
+                              latest)
+    return None if resolved is None else '%02d' % resolved[2]
 
 
 def replace_all(text, dic):
-    """Takes a string and dictionary. replaces all occurrences of i with j"""
+    """Takes a string and dictionary. replaces all occurrences of i with j
 
+    Deprecated.
+    """
+    _deprecated('replace_all', 'str.replace')
     for i, j in dic.items():
         text = text.replace(i, j)
     return text
 
 
-# season start and end dates for use in interval checking
-# erring toward inclusivity
-seasons = {
-    '21': {'from': '01', 'to': '05'},
-    '22': {'from': '05', 'to': '08'},
-    '23': {'from': '08', 'to': '11'},
-    '24': {'from': '10', 'to': '12'},
-}
-
-
 def replace_season(season_date, marker):
     """Replace a season with a month.
 
+    Deprecated; use bounds.SEASON_MONTHS.
+
     Keyword arguments:
     season_date -- edtf candidate of form year-season
     marker -- 'from' or 'to' representing earliest or latest season month
     """
+    _deprecated('replace_season', 'bounds.SEASON_MONTHS')
     y_part, m_part = season_date.split('-')
-    m_part = seasons[m_part][marker]
-    return '-'.join([y_part, m_part])
-
-
-X_PATTERN = re.compile(r'(-?)([\dX]{4})(-[\dX]{2})?(-[\dX]{2})?/'
-                       r'(-?)([\dX]{4})(-[\dX]{2})?(-[\dX]{2})?')
+    return '-'.join([y_part, seasons[m_part][marker]])
 
 
 def replace_X_start_month(month):
-    """Find the earliest legitimate month."""
-    month = month.lstrip('-')
-    if month == 'XX' or month == '0X':
-        return '01'
-    if month == 'X0':
-        return '10'
-    return month.replace('X', '0')
+    """Find the earliest legitimate month, or None. Deprecated; use bounds.resolve."""
+    _deprecated('replace_X_start_month', 'bounds.resolve')
+    return _month_of(month, latest=False)
 
 
 def replace_X_end_month(month):
-    """Find the latest legitimate month."""
-    month = month.lstrip('-')
-    if month == 'XX' or month == '1X':
-        return '12'
-    if month == 'X0':
-        return '10'
-    if month == '0X':
-        return '09'
-    if month[1] in ['1', '2']:
-        # 'X1' or 'X2'
-        return month.replace('X', '1')
-    # Otherwise it should match r'X[3-9]'.
-    return month.replace('X', '0')
+    """Find the latest legitimate month, or None. Deprecated; use bounds.resolve."""
+    _deprecated('replace_X_end_month', 'bounds.resolve')
+    return _month_of(month, latest=True)
 
 
 def replace_X_start_day(day):
-    """Find the earliest legitimate day."""
-    day = day.lstrip('-')
-    if day == 'XX' or day == '0X':
-        return '01'
-    if day == 'X0':
-        return '10'
-    return day.replace('X', '0')
+    """Find the earliest legitimate day, or None. Deprecated; use bounds.resolve."""
+    _deprecated('replace_X_start_day', 'bounds.resolve')
+    return _day_of(day)
 
 
 def replace_X_end_day(day, year, month):
-    """Find the latest legitimate day."""
-    day = day.lstrip('-')
-    year = int(year)
-    month = int(month.lstrip('-'))
-    if day == 'XX' or day == '3X':
-        # Use the last day of the month for a given year/month.
-        return str(calendar.monthrange(year, month)[1])
-    if day == '0X' or day == '1X':
-        return day.replace('X', '9')
-    if day == '2X' or day == 'X9':
-        if month != '02' or calendar.isleap(year):
-            return '29'
-        elif day == '2X':
-            # It is Feburary and not a leap year.
-            return '28'
-        else:
-            # It is February, not a leap year, day ends in 9.
-            return '19'
-    # 'X2' 'X3' 'X4' 'X5' 'X6' 'X7' 'X8'
-    if 1 < int(day[1]) < 9:
-        return day.replace('X', '2')
-    # 'X0' 'X1'
-    if day == 'X1':
-        if calendar.monthrange(year, month)[1] == 31:
-            # See if the month has a 31st.
-            return '31'
-        else:
-            return '21'
-    if day == 'X0':
-        if calendar.monthrange(year, month)[1] >= 30:
-            return '30'
-    else:
-        return '20'
+    """Find the latest legitimate day of the month, or None.
+
+    Deprecated; use bounds.resolve.
+    """
+    _deprecated('replace_X_end_day', 'bounds.resolve')
+    return _day_of(day, year, month, latest=True)
 
 
 def replace_X(matchobj):
-    """Break the interval into parts, and replace 'X's.
+    """Break an X_PATTERN match into parts, and replace 'X's.
 
-    pieces - [pos/neg, start_year, start_month, start_day,
-              pos/neg, end_year, end_month, end_day]
+    The start takes the earliest and the end the latest digits. Deprecated;
+    use bounds.resolve.
     """
+    _deprecated('replace_X', 'bounds.resolve')
     pieces = list(matchobj.groups(''))
-    # Replace "X"s in start and end years.
-    if 'X' in pieces[1]:
-        pieces[1] = pieces[1].replace('X', '0')
-    if 'X' in pieces[5]:
-        pieces[5] = pieces[5].replace('X', '9')
-    # Replace "X"s in start month.
+    pieces[1] = pieces[1].replace('X', '0')
+    pieces[5] = pieces[5].replace('X', '9')
+    # a month or day no digits make real is left as it is
     if 'X' in pieces[2]:
-        pieces[2] = '-' + replace_X_start_month(pieces[2])
-    # Replace "X"s in end month.
+        pieces[2] = '-' + (_month_of(pieces[2], latest=False) or pieces[2][1:])
     if 'X' in pieces[6]:
-        pieces[6] = '-' + replace_X_end_month(pieces[6])
-    # Replace "X"s in start day.
+        pieces[6] = '-' + (_month_of(pieces[6], latest=True) or pieces[6][1:])
     if 'X' in pieces[3]:
-        pieces[3] = '-' + replace_X_start_day(pieces[3])
-    # Replace "X"s in end day.
+        pieces[3] = '-' + (_day_of(pieces[3]) or pieces[3][1:])
     if 'X' in pieces[7]:
-        pieces[7] = '-' + replace_X_end_day(pieces[7], year=pieces[5],
-                                            month=pieces[6])
+        pieces[7] = '-' + (_day_of(pieces[7], pieces[5], pieces[6], latest=True)
+                           or pieces[7][1:])
     return ''.join((''.join(pieces[:4]), '/', ''.join(pieces[4:])))
 
 
 def zero_year_special_case(from_date, to_date, start, end):
-    """strptime does not resolve a 0000 year, we must handle this."""
-
-    if start == 'pos' and end == 'pos':
-        # always interval from earlier to later
-        if from_date.startswith('0000') and not to_date.startswith('0000'):
-            return True
-        # always interval from later to earlier
-        if not from_date.startswith('0000') and to_date.startswith('0000'):
-            return False
-        # an interval from 0000-MM-DD/0000-MM-DD ??? PARSE !!!
-        if from_date.startswith('0000') and to_date.startswith('0000'):
-            # fill from date assuming first subsequent date object if missing
-            # missing m+d, assume jan 1
-            if len(from_date) == 4:
-                fm, fd = 1, 1
-            # missing d, assume the 1st
-            elif len(from_date) == 7:
-                fm, fd = int(from_date[5:7]), 1
-            # not missing any date objects
-            elif len(from_date) == 10:
-                fm, fd = int(from_date[5:7]), int(from_date[8:10])
-            # fill to date assuming first subsequent date object if missing
-            # missing m+d, assume jan 1
-            if len(to_date) == 4:
-                tm, td = 1, 1
-            # missing d, assume the 1st
-            elif len(to_date) == 7:
-                tm, td = int(to_date[5:7]), 1
-            # not missing any date objects
-            elif len(to_date) == 10:
-                tm, td = int(to_date[5:7]), int(to_date[8:10])
-            # equality check
-            if from_date == to_date:
-                return True
-            # compare the dates
-            if fm <= tm:
-                if fd <= td:
-                    return True
-                else:
-                    return False
-            else:
-                return False
-    # these cases are always one way or the other
-    # "-0000" is an invalid edtf
-    elif start == 'neg' and end == 'neg':
-        return False
-    # False unless start is not "0000"
-    elif start == 'neg' and end == 'pos':
-        if from_date.startswith("0000"):
-            return False
-        else:
-            return True
+    """Return whether an interval with a year 0000 end is in order.
 
+    start and end are 'pos' or 'neg', the signs taken off from_date and
+    to_date. Deprecated; use bounds.in_order.
+    """
+    _deprecated('zero_year_special_case', 'bounds.in_order')
+    return bounds.in_order(('-' if start == 'neg' else '') + from_date,
+                           ('-' if end == 'neg' else '') + to_date)
 
-def is_valid_interval(edtf_candidate):
-    """Test to see if the edtf candidate is a valid interval"""
 
-    # resolve interval into from / to datetime objects
-    from_date = None
-    to_date = None
-    # initialize interval flags for special cases, assume positive
-    end, start = 'pos', 'pos'
-    if edtf_candidate.count('/') == 1:
-        # replace all 'problem' cases (unspecified, 0000 date, %, -, y)
-        # break the interval into two date strings
-        edtf_candidate = replace_all(edtf_candidate, interval_replacements)
-        edtf_candidate = re.sub(X_PATTERN, replace_X, edtf_candidate)
-        parts = edtf_candidate.split('/')
-        # set flag for negative start date
-        if parts[0].startswith("-"):
-            start = 'neg'
-            parts[0] = parts[0][1:]
-        # set flag for negative end date
-        if parts[1].startswith("-"):
-            end = 'neg'
-            parts[1] = parts[1][1:]
-        # if starts positive and ends negative, that's always False
-        if start == 'pos' and end == 'neg':
-            return False
-        # handle special case of 0000 year
-        if parts[0].startswith("0000") or parts[1].startswith("0000"):
-            return zero_year_special_case(parts[0], parts[1], start, end)
-        # 2 '-' characters means we are matching year-month-day
-        if parts[0].count("-") == 2:
-            try:
-                from_date = datetime.datetime.strptime(parts[0], "%Y-%m-%d")
-            except ValueError:
-                return False
-        if parts[1].count("-") == 2:
-            try:
-                to_date = datetime.datetime.strptime(parts[1], "%Y-%m-%d")
-            except ValueError:
-                return False
-        # handle special case of same year season/season range due to
-        # the overlap of the months we are designating for the seasons
-        if parts[0].count("-") == 1 and parts[1].count("-") == 1:
-            from_year, from_month = parts[0].split("-")
-            to_year, to_month = parts[1].split("-")
-            if from_year == to_year and from_month in seasons and to_month in seasons:
-                return from_month <= to_month
-        # 1 '-' character means we are match year-month
-        if parts[0].count("-") == 1:
-            try:
-                from_date = datetime.datetime.strptime(parts[0], "%Y-%m")
-            except ValueError:
-                # month is a season; use earliest possible month
-                replaced_season = replace_season(parts[0], 'from')
-                from_date = datetime.datetime.strptime(replaced_season, "%Y-%m")
-        if parts[1].count("-") == 1:
-            try:
-                to_date = datetime.datetime.strptime(parts[1], "%Y-%m")
-            except ValueError:
-                # month is a season; use latest possible month
-                replaced_season = replace_season(parts[1], 'to')
-                to_date = datetime.datetime.strptime(replaced_season, "%Y-%m")
-        # zero '-' characters means we are matching a year
-        if parts[0].count("-") == 0:
-            # if from_date is unknown, we can assume the lowest possible date
-            if parts[0] in [Empty(), '..']:
-                from_date = datetime.datetime.strptime("0001", "%Y")
-            else:
-                from_date = datetime.datetime.strptime(parts[0], "%Y")
-        if parts[1].count("-") == 0:
-            # when the to_date is open and the from_date is valid, it's valid
-            if not parts[1] in [Empty(), '..']:
-                to_date = datetime.datetime.strptime(parts[1], "%Y")
-        # if it starts negative and ends positive, that's always True
-        if start == 'neg' and end == 'pos':
-            return True
-        # if start and end are negative, the from_date must be >= to_date
-        elif start == 'neg' and end == 'neg':
-            if from_date >= to_date and from_date and to_date:
-                return True
-        # if the to_date is unknown or open, it could be any date, therefore
-        elif (
-            parts[1] == Empty()
-            or parts[1] == '..'
-            or parts[0] == Empty()
-            or parts[0] == '..'
-        ):
-            return True
-        # if start and end are positive, the from_date must be <= to_date
-        elif start == 'pos' and end == 'pos':
-            if from_date <= to_date and from_date and to_date:
-                return True
-            else:
-                return False
-        else:
-            return False
-    else:
+# characters the grammar skips between tokens, which only it models
+GRAMMAR_WHITESPACE = frozenset(' \t\n\r')
+# Every string the grammar accepts is made of these characters (plus the
+# whitespace the grammar skips), starts with one of the first set and ends
+# with one of the last set.
+_PLAUSIBLE_ALPHABET = re.compile(r"[-0-9XYESTZ:+?~%/.,\[\]{} \t\n\r]+")
+_PLAUSIBLE_SHAPE = re.compile(r"[-0-9X?~%/.Y\[{].*[0-9X?~%/.Z\]}]", re.DOTALL)
+# Only long years, significant digits and lists are longer than this.
+MAX_BOUNDED_LENGTH = 29
+UNBOUNDED_MARKERS = frozenset('YS[{')
+
+
+def could_be_valid(edtf_candidate):
+    """Cheaply rule out candidates that no level of the grammar accepts.
+
+    Checks the alphabet, length and first and last characters, and that
+    there is at most one '/'. It never rejects a string the grammar
+    accepts, so a False result is final and True means the grammar
+    still has to decide.
+    """
+    if len(edtf_candidate) < 3 or not _PLAUSIBLE_ALPHABET.fullmatch(edtf_candidate):
+        return False
+    if not GRAMMAR_WHITESPACE.isdisjoint(edtf_candidate):
+        # the grammar may skip whitespace anywhere, so only the alphabet counts
+        return True
+    if edtf_candidate.count('/') > 1:
         return False
+    if (
+        len(edtf_candidate) > MAX_BOUNDED_LENGTH
+        and UNBOUNDED_MARKERS.isdisjoint(edtf_candidate)
+    ):
+        return False
+    return _PLAUSIBLE_SHAPE.fullmatch(edtf_candidate) is not None
 
 
-def isLevel0(edtf_candidate):
-    """Check if the date is of a feature introduced in level 0."""
+_whole_expressions = {}
 
-    if " " not in edtf_candidate:
-        result = edtf_candidate == level0Expression
-    else:
-        result = False
-    return result
 
+def _whole_expression(level, optimized):
+    """Return the level expression anchored to the end of the candidate."""
+    key = (optimized, level)
+    if key not in _whole_expressions:
+        grammar = get_grammar(optimized, level)
+        _whole_expressions[key] = grammar['level%dExpression' % level] + StringEnd()
+    return _whole_expressions[key]
 
-def isLevel1(edtf_candidate):
-    """Check if the date is of a feature introduced in level 1."""
 
-    if " " not in edtf_candidate:
-        result = edtf_candidate == level1Expression
-    else:
-        result = False
-    return result
+def _classify_grammar(edtf_candidate, optimized=False):
+    """Classify the candidate with the pyparsing grammar."""
+    if packrat is None:
+        return _classify_levels(edtf_candidate, optimized)
+    # one memo for all the levels tried, as they share productions
+    with packrat.memoizing():
+        return _classify_levels(edtf_candidate, optimized)
 
 
-def isLevel2(edtf_candidate):
-    """Check if the date is of a feature introduced in level 2."""
+def _grammar_production(expression):
+    """Adapt a grammar production to the calling convention of lists."""
+    def production(s, i):
+        try:
+            return expression.try_parse(s, i)
+        except ParseException:
+            return -1
+    return production
+
+
+_list_productions = {}
+
+
+def _grammar_list_productions(optimized):
+    """Return the lists.ListProductions of the grammar."""
+    if optimized not in _list_productions:
+        grammar = get_grammar(optimized)
+        _list_productions[optimized] = lists.ListProductions(*[
+            _grammar_production(production)
+            for production in _take(grammar, "listElement earlier later consecutives date")
+        ])
+    return _list_productions[optimized]
+
+
+# Characters no level 0 string has, and characters only level 2 strings have
+# (besides the brackets, commas and whitespace of lists, handled on their own).
+_ABOVE_LEVEL0 = frozenset('XY?~%.')
+_ONLY_LEVEL2 = frozenset('SE')
+# Level 2 text: a qualifier before a component, X among a year's first two
+# digits, or a season past 24.
+_LEVEL2_TEXT = re.compile(
+    r"^[?~%]|[?~%][^/]|(?:^|/)-?[0-9]?X|(?:^|/)-?[0-9]{4}-(?:2[5-9]|3[0-9]|4[01])(?:$|[?~%/])"
+)
+
+
+def _lowest_possible_level(edtf_candidate):
+    """Return the lowest level whose grammar could match the candidate's text.
+
+    Level 0 has no unspecified digits, qualifiers, long years, open ends or
+    negative years. Level 1 has no significant digits, exponents or
+    seasons past 24, only puts a qualifier at the end of a date and only
+    leaves a year's last two digits unspecified. Candidates showing any of
+    these skip the levels that would only fail on them. The shapes are
+    only looked for without whitespace, which the grammar may skip
+    between any of their characters.
+    """
+    if not _ONLY_LEVEL2.isdisjoint(edtf_candidate) or (
+        GRAMMAR_WHITESPACE.isdisjoint(edtf_candidate)
+        and _LEVEL2_TEXT.search(edtf_candidate) is not None
+    ):
+        return 2
+    if (
+        not _ABOVE_LEVEL0.isdisjoint(edtf_candidate)
+        or edtf_candidate.startswith(('-', '/'))
+        or edtf_candidate.endswith('/')
+    ):
+        return 1
+    return 0
+
+
+def _classify_levels(edtf_candidate, optimized):
+    if " " in edtf_candidate:
+        # whitespace is only tolerated by the list grammar of level 2
+        if "[" in edtf_candidate or "{" in edtf_candidate:
+            grammar = get_grammar(optimized)
+            return 2 if edtf_candidate == grammar['level2Expression'] else None
+        return None
+    if edtf_candidate.startswith(('[', '{')) and GRAMMAR_WHITESPACE.isdisjoint(edtf_candidate):
+        # Only the lists of level 2 start with a bracket. They are recognized
+        # with the grammar's own productions, once per distinct element.
+        closing = ']' if edtf_candidate[0] == '[' else '}'
+        end = lists.bracketed_list(edtf_candidate, 0, edtf_candidate[0], closing,
+                                   _grammar_list_productions(optimized))
+        return 2 if end == len(edtf_candidate) else None
+    # The lowest level whose whole expression matches. A level is only
+    # built once every level below it has failed to match, and levels the
+    # text rules out are not tried at all.
+    for level in LEVELS[_lowest_possible_level(edtf_candidate):]:
+        checkpoint()
+        try:
+            _whole_expression(level, optimized).parse_string(edtf_candidate)
+        except ParseException:
+            continue
+        return level
+    return None
+
+
+def _classify_optimized(edtf_candidate):
+    """Classify the candidate with the Regex terminal grammar."""
+    return _classify_grammar(edtf_candidate, optimized=True)
+
+
+# validation engines by name; each maps a candidate to its level or None
+ENGINES = {
+    'pyparsing': _classify_grammar,
+    'optimized': _classify_optimized,
+    'scanner': scanner.classify,
+}
+# the engine used when none is passed to a function
+DEFAULT_ENGINE = 'pyparsing'
+
+
+# the ResultCache consulted by the validation functions, if enabled
+result_cache = None
+
+
+def enable_cache(maxsize=65536):
+    """Cache validation results for up to maxsize distinct candidates.
+
+    Covers classify, is_valid, isLevel* and conformsLevel*. Returns the
+    ResultCache, whose counters show the hit rate. Enabling again
+    replaces the cache with an empty one of the new size.
+    """
+    global result_cache
+    result_cache = ResultCache(maxsize)
+    return result_cache
+
+
+def disable_cache():
+    """Stop caching validation results and drop the cache."""
+    global result_cache
+    result_cache = None
 
-    if "[" in edtf_candidate or "{" in edtf_candidate:
-        result = edtf_candidate == level2Expression
-    elif " " in edtf_candidate:
-        result = False
+
+# the VerdictStore consulted by validate_many, if enabled
+verdict_store = None
+
+
+def enable_store(path, max_entries=10000000):
+    """Keep the verdicts of validate_many in the SQLite file at path.
+
+    Verdicts kept by earlier runs of the same version of this library are
+    reused, and new ones added; see VerdictStore. Returns the store,
+    which every thread may use. Enabling again closes the previous store.
+    """
+    global verdict_store
+    # imported here so that importing this module does not load sqlite3
+    from edtf_validate.store import VerdictStore
+    disable_store()
+    verdict_store = VerdictStore(path, max_entries)
+    return verdict_store
+
+
+def disable_store():
+    """Stop using the verdict store and close it."""
+    global verdict_store
+    if verdict_store is not None:
+        verdict_store.close()
+    verdict_store = None
+
+
+# the Limits enforced by the validation functions, if enabled
+limits = None
+
+
+def enable_limits(max_length=65536, max_list_elements=10000, max_year_digits=64,
+                  time_budget=None):
+    """Turn away candidates that are too long or would take too long to parse.
+
+    Candidates longer than max_length characters, lists of more than
+    max_list_elements elements and runs of more than max_year_digits
+    digits, or long years that stand for more once their exponent is
+    counted, are rejected before any parsing. With time_budget set, a call
+    gives up once it has spent that many seconds parsing. Rejected
+    candidates get TOO_EXPENSIVE instead of a result from classify,
+    is_valid, parse, isLevel*, conformsLevel* and validate_many. None
+    turns a limit off. Returns the Limits.
+    """
+    global limits
+    limits = Limits(max_length, max_list_elements, max_year_digits, time_budget)
+    return limits
+
+
+def disable_limits():
+    """Stop enforcing the limits."""
+    global limits
+    limits = None
+
+
+# the metrics Registry the validation functions record to, if enabled
+metrics = None
+
+
+def enable_metrics(registry=None):
+    """Record call counts, paths taken, levels matched and timings.
+
+    Records to registry, or to a new Registry, which is returned. Only
+    the work done in this process is recorded; the workers of
+    parallel_verdicts keep their own. Disabled, each call pays one
+    check of the module setting.
+    """
+    global metrics
+    metrics = registry if registry is not None else Registry()
+    return metrics
+
+
+def disable_metrics():
+    """Stop recording metrics."""
+    global metrics
+    metrics = None
+
+
+def _engine(engine):
+    """Return the classify function of the named or default engine."""
+    try:
+        return ENGINES[engine or DEFAULT_ENGINE]
+    except KeyError:
+        raise ValueError('Unknown engine: {}'.format(engine))
+
+
+def _classify(edtf_candidate, engine_classify):
+    """Classify the candidate with the given engine, bypassing any cache."""
+    call_limits = limits
+    if call_limits is None:
+        return _classify_admitted(edtf_candidate, engine_classify)
+    if not call_limits.admits(edtf_candidate):
+        return _rejected()
+    try:
+        with call_limits.budget():
+            return _classify_admitted(edtf_candidate, engine_classify)
+    except BudgetExceeded:
+        return _rejected()
+
+
+def _rejected():
+    if metrics is not None:
+        metrics.inc('paths', path='limits')
+    return TOO_EXPENSIVE
+
+
+# whitespace the grammar skips in a list: before a comma or the closing bracket
+_LIST_WHITESPACE = re.compile(r"[ \t\n\r]+(?=[,\]}])")
+
+
+def _without_list_whitespace(edtf_candidate):
+    """Return a list candidate without the whitespace the grammar skips in it.
+
+    Only whitespace around the list and before its commas and closing
+    bracket is taken out, as the grammar skips it there whatever the
+    elements are. Returns None if the candidate is not a list or has
+    whitespace anywhere else; only the grammar can decide those.
+    """
+    stripped = edtf_candidate.strip(' \t\n\r')
+    if not stripped.startswith(('[', '{')):
+        return None
+    stripped = _LIST_WHITESPACE.sub('', stripped)
+    if not GRAMMAR_WHITESPACE.isdisjoint(stripped):
+        return None
+    return stripped
+
+
+def _route(edtf_candidate, engine_classify):
+    """Return (path, classify, text) for how the candidate is to be classified.
+
+    classify(text) gives its level; path names the route in the metrics.
+    Returns None if the candidate fails could_be_valid.
+    """
+    if not could_be_valid(edtf_candidate):
+        return None
+    if GRAMMAR_WHITESPACE.isdisjoint(edtf_candidate):
+        return 'engine', engine_classify, edtf_candidate
+    stripped = _without_list_whitespace(edtf_candidate)
+    if stripped is not None:
+        return 'engine', engine_classify, stripped
+    return 'whitespace', _classify_grammar, edtf_candidate
+
+
+def _classify_admitted(edtf_candidate, engine_classify):
+    route = _route(edtf_candidate, engine_classify)
+    if metrics is not None:
+        return _classify_measured(route, metrics)
+    if route is None:
+        return None
+    _, route_classify, text = route
+    return route_classify(text)
+
+
+def _classify_measured(route, registry):
+    """Classify along route, recording the path, time and match to registry."""
+    if route is None:
+        registry.inc('paths', path='prefilter')
+        registry.inc('matches', level='none', production='none')
+        return None
+    path, route_classify, text = route
+    registry.inc('paths', path=path)
+    start = time.perf_counter()
+    level = route_classify(text)
+    registry.observe('seconds', time.perf_counter() - start, phase='grammar')
+    if level is None:
+        registry.inc('matches', level='none', production='none')
     else:
-        result = edtf_candidate == level2Expression
-    return result
+        registry.inc('matches', level=level, production=parsed.kind(text))
+    return level
 
 
-def conformsLevel0(edtf_candidate):
+def _cache_entry(edtf_candidate, engine_classify):
+    """Return the [level, valid] entry for the candidate from result_cache.
+
+    valid is None until is_valid has been asked about the candidate.
+    Candidates rejected by the limits are not looked up, so they get
+    TOO_EXPENSIVE whatever the cache holds, and rejections are not cached,
+    as the limits or the time left may change.
+    """
+    cache = result_cache
+    call_limits = limits
+    if call_limits is not None and not call_limits.admits(edtf_candidate):
+        level = _rejected()
+        return [level, level]
+    entry = cache.get(edtf_candidate)
+    if entry is not None and metrics is not None:
+        metrics.inc('paths', path='cache')
+    if entry is None:
+        level = _classify(edtf_candidate, engine_classify)
+        if level is TOO_EXPENSIVE:
+            return [level, level]
+        entry = [level, None]
+        cache.put(edtf_candidate, entry)
+    return entry
+
+
+def classify(edtf_candidate, engine=None):
+    """Return the lowest EDTF level (0, 1 or 2) the candidate needs.
+
+    Returns None if the candidate matches none of the levels. Candidates
+    that fail could_be_valid are rejected without parsing; the rest are
+    parsed once, by the named engine or DEFAULT_ENGINE. Interval endpoint
+    ordering is not checked here; see is_valid. Returns TOO_EXPENSIVE if
+    the candidate is rejected by the limits; see enable_limits.
+    """
+    if metrics is not None:
+        metrics.inc('calls', entry='classify')
+    return _level(edtf_candidate, engine)
+
+
+def _level(edtf_candidate, engine):
+    engine_classify = _engine(engine)
+    if result_cache is None:
+        return _classify(edtf_candidate, engine_classify)
+    return _cache_entry(edtf_candidate, engine_classify)[0]
+
+
+def _level_in(edtf_candidate, engine, levels, entry):
+    """Return whether the candidate's level is one of levels, or TOO_EXPENSIVE.
+
+    entry names the calling function in the metrics.
+    """
+    if metrics is not None:
+        metrics.inc('calls', entry=entry)
+    level = _level(edtf_candidate, engine)
+    if level is TOO_EXPENSIVE:
+        return level
+    return level in levels
+
+
+def isLevel0(edtf_candidate, engine=None):
+    """Check if the date is of a feature introduced in level 0."""
+    return _level_in(edtf_candidate, engine, (0,), 'isLevel0')
+
+
+def isLevel1(edtf_candidate, engine=None):
+    """Check if the date is of a feature introduced in level 1."""
+    return _level_in(edtf_candidate, engine, (1,), 'isLevel1')
+
+
+def isLevel2(edtf_candidate, engine=None):
+    """Check if the date is of a feature introduced in level 2."""
+    return _level_in(edtf_candidate, engine, (2,), 'isLevel2')
+
+
+def conformsLevel0(edtf_candidate, engine=None):
     """Check if the date is supported at level 0."""
-    return isLevel0(edtf_candidate)
+    return _level_in(edtf_candidate, engine, (0,), 'conformsLevel0')
 
 
-def conformsLevel1(edtf_candidate):
+def conformsLevel1(edtf_candidate, engine=None):
     """Check if the date is supported at level 1."""
-    return isLevel0(edtf_candidate) or isLevel1(edtf_candidate)
+    return _level_in(edtf_candidate, engine, (0, 1), 'conformsLevel1')
 
 
-def conformsLevel2(edtf_candidate):
+def conformsLevel2(edtf_candidate, engine=None):
     """Check if the date is supported at level 2."""
-    return(
-        isLevel0(edtf_candidate)
-        or isLevel1(edtf_candidate)
-        or isLevel2(edtf_candidate)
-    )
+    return _level_in(edtf_candidate, engine, (0, 1, 2), 'conformsLevel2')
 
 
-def is_valid(edtf_candidate):
-    """isValid takes a candidate date and returns if it is valid or not"""
-    if (
-        isLevel0(edtf_candidate)
-        or isLevel1(edtf_candidate)
-        or isLevel2(edtf_candidate)
-    ):
-        if '/' in edtf_candidate:
-            return is_valid_interval(edtf_candidate)
+def _check_valid(edtf_candidate, level):
+    """Combine the level with the interval check into the is_valid result."""
+    if level is None:
+        return False
+    if level is TOO_EXPENSIVE:
+        return level
+    if '/' not in edtf_candidate:
+        return True
+    if metrics is None:
+        return is_valid_interval(edtf_candidate)
+    start = time.perf_counter()
+    valid = is_valid_interval(edtf_candidate)
+    metrics.observe('seconds', time.perf_counter() - start, phase='interval')
+    return valid
+
+
+def _verdict(edtf_candidate, engine_classify):
+    """Return (level, valid) for the candidate, through result_cache if enabled."""
+    if result_cache is None:
+        level = _classify(edtf_candidate, engine_classify)
+        return level, _check_valid(edtf_candidate, level)
+    entry = _cache_entry(edtf_candidate, engine_classify)
+    if entry[1] is None:
+        entry[1] = _check_valid(edtf_candidate, entry[0])
+    return entry[0], entry[1]
+
+
+def is_valid(edtf_candidate, engine=None):
+    """isValid takes a candidate date and returns if it is valid or not
+
+    Returns TOO_EXPENSIVE if the candidate is rejected by the limits.
+    """
+    if metrics is not None:
+        metrics.inc('calls', entry='is_valid')
+    engine_classify = _engine(engine)
+    if result_cache is None:
+        return _check_valid(edtf_candidate, _classify(edtf_candidate, engine_classify))
+    return _verdict(edtf_candidate, engine_classify)[1]
+
+
+def parse(edtf_candidate, engine=None):
+    """Return a ParsedEDTF describing the candidate, or None if it is not valid.
+
+    The candidate is validated once, as is_valid does and through the
+    result cache if enabled, and the accepted text is then taken apart
+    without parsing it again. Returns TOO_EXPENSIVE if the candidate is
+    rejected by the limits.
+    """
+    if metrics is not None:
+        metrics.inc('calls', entry='parse')
+    level, valid = _verdict(edtf_candidate, _engine(engine))
+    if not valid:
+        return valid if valid is TOO_EXPENSIVE else None
+    return parsed.decompose(edtf_candidate, level)
+
+
+def sort_key(edtf_candidate, engine=None):
+    """Return the (earliest, latest) integer sort key of a candidate.
+
+    The key holds the day numbers of ParsedEDTF.earliest and latest, with
+    parsed.KEY_MIN and KEY_MAX in place of open or unknown ends, so
+    sorting keys orders values by when they start and then end, whatever
+    their years' signs, seasons, X digits or kind. Returns None if the
+    candidate is not valid, and TOO_EXPENSIVE if it is rejected by the
+    limits.
+    """
+    if metrics is not None:
+        metrics.inc('calls', entry='sort_key')
+    valid = _verdict(edtf_candidate, _engine(engine))[1]
+    if not valid:
+        return valid if valid is TOO_EXPENSIVE else None
+    return parsed.span_key(edtf_candidate)
+
+
+def sort_keys(edtf_candidates, engine=None):
+    """Return the sort keys of many candidates as two arrays of 64-bit ints.
+
+    The arrays hold the earliest and the latest of each candidate's
+    sort_key, in input order, and can be handed to NumPy or a database
+    without copying. Candidates that are not valid, or are rejected by the
+    limits, get parsed.INVALID_KEY. Each distinct string is validated and
+    taken apart once.
+    """
+    if metrics is not None:
+        metrics.inc('calls', entry='sort_keys')
+    engine_classify = _engine(engine)
+    earliest = array.array('q')
+    latest = array.array('q')
+    keys = {}
+    for edtf_candidate in edtf_candidates:
+        key = keys.get(edtf_candidate)
+        if key is None:
+            if _verdict(edtf_candidate, engine_classify)[1]:
+                key = parsed.span_key(edtf_candidate)
+            else:
+                key = parsed.INVALID_KEY
+            keys[edtf_candidate] = key
+        elif metrics is not None:
+            metrics.inc('paths', path='batch')
+        earliest.append(key[0])
+        latest.append(key[1])
+    return earliest, latest
+
+
+class BatchSummary(object):
+    """Counts gathered while validate_many runs.
+
+    levels maps each level to the number of valid candidates that need it,
+    invalid lists the positions of the candidates that were not valid and
+    total counts every candidate seen.
+    """
+
+    __slots__ = ('total', 'levels', 'invalid')
+
+    def __init__(self):
+        self.total = 0
+        self.levels = {0: 0, 1: 0, 2: 0}
+        self.invalid = []
+
+    def __repr__(self):
+        return 'BatchSummary(total={}, levels={}, invalid={})'.format(
+            self.total, self.levels, len(self.invalid))
+
+
+def validate_many(edtf_candidates, level=None, engine=None, summary=None, workers=None,
+                  chunksize=1024):
+    """Validate an iterable of candidates, yielding a bool for each in order.
+
+    With level set to 0, 1 or 2 a candidate must also be supported at that
+    level. Unlike conformsLevel*, interval endpoints must be in order
+    either way. Each distinct string is classified once per call; the
+    engine is looked up once. Pass a BatchSummary as summary to have it
+    filled in as results are yielded. Candidates rejected by the limits
+    yield TOO_EXPENSIVE and are counted as invalid.
+
+    With workers above 1 the candidates are sent in chunks of chunksize
+    to that many processes; results still come back in input order, and
+    each worker remembers the verdicts of its last 65536 distinct
+    candidates. Verdicts are looked up in and added to the verdict store,
+    if enabled.
+    """
+    _check_level(level)
+    if metrics is not None:
+        metrics.inc('calls', entry='validate_many')
+    engine_classify = _engine(engine)
+    if workers is not None and workers > 1:
+        pairs = parallel_verdicts(edtf_candidates, engine, workers, chunksize,
+                                  store=verdict_store)
+    elif verdict_store is not None:
+        pairs = _stored_verdict_pairs(edtf_candidates, engine_classify, {}, verdict_store)
+    else:
+        pairs = _verdict_pairs(edtf_candidates, engine_classify, {})
+    return _validate_many(pairs, level, summary)
+
+
+def _check_level(level):
+    """Raise ValueError unless level is None, 0, 1 or 2, as validate_many takes."""
+    if level not in (None, 0, 1, 2):
+        raise ValueError('level must be None, 0, 1 or 2, not {!r}'.format(level))
+
+
+def _limits_admit(edtf_candidate):
+    """Return whether the limits, if any, admit the candidate.
+
+    Callers that decide some candidates without parsing pass the longest
+    they decide, and leave everything to the grammar if it is rejected.
+    """
+    return limits is None or limits.admits(edtf_candidate)
+
+
+def _verdict_pairs(edtf_candidates, engine_classify, seen):
+    """Yield (candidate, (level, valid)) pairs, remembering verdicts in seen.
+
+    seen is a dict or a ResultCache, or None to remember nothing.
+    """
+    for edtf_candidate in edtf_candidates:
+        verdict = seen.get(edtf_candidate) if seen is not None else None
+        if verdict is not None and metrics is not None:
+            metrics.inc('paths', path='batch')
+        if verdict is None:
+            verdict = _verdict(edtf_candidate, engine_classify)
+            if seen is not None:
+                seen[edtf_candidate] = verdict
+        yield edtf_candidate, verdict
+
+
+# candidates looked up in a VerdictStore at once
+STORE_CHUNK_SIZE = 4096
+
+
+def _stored_verdict_pairs(edtf_candidates, engine_classify, seen, store):
+    """_verdict_pairs, looking verdicts up in store and adding the new ones.
+
+    Candidates are read STORE_CHUNK_SIZE at a time. Candidates rejected by
+    the limits are not looked up, so they get TOO_EXPENSIVE whatever the
+    store holds, and rejections are not stored.
+    """
+    call_limits = limits
+    for chunk in _chunks(edtf_candidates, STORE_CHUNK_SIZE):
+        if call_limits is None:
+            verdicts = store.get_many(chunk)
         else:
-            return True
+            verdicts = store.get_many([edtf_candidate for edtf_candidate in chunk
+                                       if call_limits.admits(edtf_candidate)])
+        missing = [edtf_candidate for edtf_candidate in dict.fromkeys(chunk)
+                   if edtf_candidate not in verdicts]
+        new = dict(_verdict_pairs(missing, engine_classify, seen))
+        store.put_many((edtf_candidate, verdict) for edtf_candidate, verdict in new.items()
+                       if verdict[1] is not TOO_EXPENSIVE)
+        verdicts.update(new)
+        for edtf_candidate in chunk:
+            yield edtf_candidate, verdicts[edtf_candidate]
+
+
+def _validate_many(pairs, level, summary):
+    """Generate validate_many results from verdict pairs."""
+    for index, (edtf_candidate, (found, valid)) in enumerate(pairs):
+        if valid and level is not None and found > level:
+            valid = False
+        if summary is not None:
+            summary.total += 1
+            if valid:
+                summary.levels[found] += 1
+            else:
+                summary.invalid.append(index)
+        yield valid
+
+
+def _chunks(iterable, size):
+    """Yield lists of up to size items from the iterable."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _prewarm(engine):
+    """Build what the named engine needs before it validates anything."""
+    get_grammar()
+    if (engine or DEFAULT_ENGINE) == 'optimized':
+        get_grammar(optimized=True)
+
+
+# the engine, verdict cache and store of a parallel_verdicts worker process
+_worker_engine = None
+_worker_seen = None
+_worker_store = None
+
+
+def _init_worker(engine, cache_size, parent_limits, store_args):
+    """Set up a parallel_verdicts worker; a no-op rebuild if it was forked.
+
+    store_args is the (path, generation) of the parent's VerdictStore, or
+    None. The worker opens its own connection, which never trims.
+    """
+    global _worker_engine, _worker_seen, _worker_store, limits
+    limits = parent_limits
+    _prewarm(engine)
+    _worker_engine = _engine(engine)
+    _worker_seen = ResultCache(cache_size)
+    if store_args is not None:
+        from edtf_validate.store import VerdictStore
+        path, generation = store_args
+        _worker_store = VerdictStore(path, None, generation)
+
+
+def _validate_chunk(chunk):
+    """Return the (level, valid) verdicts of a chunk of candidates."""
+    if _worker_store is not None:
+        pairs = _stored_verdict_pairs(chunk, _worker_engine, _worker_seen, _worker_store)
     else:
-        return False
+        pairs = _verdict_pairs(chunk, _worker_engine, _worker_seen)
+    return [verdict for _, verdict in pairs]
+
+
+def _pool_context():
+    """Prefer forking, so workers start with the parent's built grammar."""
+    # imported here so that importing this module does not load it
+    import multiprocessing
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+
+def parallel_verdicts(edtf_candidates, engine=None, workers=None, chunksize=1024,
+                      cache_size=65536, store=None):
+    """Yield (candidate, (level, valid)) pairs computed by a process pool.
+
+    Candidates are read lazily and sent to the workers in chunks; at most
+    two chunks per worker are in flight, so memory use does not grow with
+    the input. Pairs come back in input order. workers defaults to the
+    number of CPUs. With a VerdictStore as store, the workers look up and
+    add verdicts in its file.
+    """
+    engine = engine or DEFAULT_ENGINE
+    _engine(engine)
+    workers = workers or os.cpu_count() or 1
+    # built before forking so every worker inherits it
+    _prewarm(engine)
+    store_args = (store.path, store.generation) if store is not None else None
+    pool = _pool_context().Pool(workers, _init_worker,
+                                (engine, cache_size, limits, store_args))
+    try:
+        pending = collections.deque()
+        for chunk in _chunks(edtf_candidates, chunksize):
+            pending.append((chunk, pool.apply_async(_validate_chunk, (chunk,))))
+            if len(pending) >= 2 * workers:
+                chunk, result = pending.popleft()
+                for pair in zip(chunk, result.get()):
+                    yield pair
+        while pending:
+            chunk, result = pending.popleft()
+            for pair in zip(chunk, result.get()):
+                yield pair
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def read_candidates(paths):
+    """Yield newline-delimited candidates from the files; '-' reads stdin.
+
+    Bytes that are not UTF-8 are replaced with U+FFFD, so the line they are
+    on is read as a candidate that is not valid.
+    """
+    for path in paths:
+        if path == '-':
+            if hasattr(sys.stdin, 'reconfigure'):
+                sys.stdin.reconfigure(errors='replace')
+            for line in sys.stdin:
+                yield line.rstrip('\n')
+        else:
+            with open(path, encoding='utf-8', errors='replace') as lines:
+                for line in lines:
+                    yield line.rstrip('\n')
+
+
+def _add_input_arguments(parser):
+    parser.add_argument('edtf', type=str, nargs='?',
+                        help='edtf candidate; when omitted candidates are read from '
+                             '--file or stdin, one per line')
+    parser.add_argument('-f', '--file', dest='files', action='append', default=[],
+                        metavar='PATH',
+                        help='read candidates from PATH, one per line ("-" for stdin); '
+                             'may be repeated')
+
+
+def _add_output_arguments(parser):
+    parser.add_argument('--invalid-only', action='store_true',
+                        help='only output candidates that are not valid')
+    parser.add_argument('--level', action='store_true',
+                        help='output the level a valid candidate needs instead of True, '
+                             'and "invalid" instead of False')
+    parser.add_argument('--summary', action='store_true',
+                        help='finish with a summary line on stderr')
+
 
+def _add_limit_arguments(parser):
+    parser.add_argument('--max-length', type=int, metavar='N',
+                        help='reject candidates longer than N characters')
+    parser.add_argument('--max-list-elements', type=int, metavar='N',
+                        help='reject lists of more than N elements')
+    parser.add_argument('--max-year-digits', type=int, metavar='N',
+                        help='reject candidates with a run of more than N digits or a '
+                             'long year of more than N digits')
+    parser.add_argument('--time-budget', type=float, metavar='SECONDS',
+                        help='reject candidates that take longer than SECONDS to parse')
 
-def main():
+
+def _limits_from(args, parser):
+    """Return the Limits asked for on the command line, or None."""
+    limit_args = (args.max_length, args.max_list_elements, args.max_year_digits,
+                  args.time_budget)
+    if all(limit is None for limit in limit_args):
+        return None
+    try:
+        return Limits(*limit_args)
+    except ValueError as error:
+        parser.error(str(error))
+
+
+@contextlib.contextmanager
+def _limits_applied(call_limits):
+    """Enforce call_limits, if not None, in the block."""
+    global limits
+    if call_limits is None:
+        yield
+        return
+    outer_limits = limits
+    limits = call_limits
+    try:
+        yield
+    finally:
+        limits = outer_limits
+
+
+def _input_candidates(args, parser):
+    """Return the candidates named by the input arguments."""
+    if args.edtf is not None:
+        return [args.edtf]
+    return _read_or_exit(args.files or ['-'], parser)
+
+
+def _read_or_exit(paths, parser):
+    """read_candidates, exiting with a usage error if a file cannot be read."""
+    try:
+        for edtf_candidate in read_candidates(paths):
+            yield edtf_candidate
+    except OSError as error:
+        parser.error(str(error))
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in ('serve', 'client'):
+        # no EDTF candidate is spelled like either, so they are free to use
+        from edtf_validate import server
+        server.main(argv)
+        return
     # setup the argument parser to accept the edtf candidate identifier
-    parser = argparse.ArgumentParser(description='edtf compliance.')
-    parser.add_argument('edtf', type=str, help='edtf candidate')
-    args = parser.parse_args()
-    print(args.edtf + '\t' + str(is_valid(args.edtf)))
+    parser = argparse.ArgumentParser(
+        description='edtf compliance.',
+        epilog='"%(prog)s serve" keeps a validator running on a socket and '
+               '"%(prog)s client" sends it candidates; see their --help.')
+    _add_input_arguments(parser)
+    _add_output_arguments(parser)
+    parser.add_argument('--cache-size', type=int, default=65536, metavar='N',
+                        help='remember the results of the last N distinct candidates '
+                             '(default: %(default)s, 0 to disable)')
+    parser.add_argument('--engine', choices=sorted(ENGINES), default=None,
+                        help='validation engine (default: %s)' % DEFAULT_ENGINE)
+    _add_limit_arguments(parser)
+    parser.add_argument('-j', '--jobs', type=int, default=1, metavar='N',
+                        help='validate with N worker processes (default: %(default)s)')
+    parser.add_argument('--store', metavar='PATH',
+                        help='reuse and keep verdicts in the SQLite file PATH across runs')
+    parser.add_argument('--store-size', type=int, default=10000000, metavar='N',
+                        help='keep at most N verdicts in the store (default: %(default)s)')
+    parser.add_argument('--scan', action='store_true',
+                        help='memory-map each --file and only output PATH and the line '
+                             'number of each candidate that is not valid')
+    parser.add_argument('--offsets', action='store_true',
+                        help='with --scan, output byte offsets instead of line numbers')
+    args = parser.parse_args(argv)
+    if args.scan:
+        _scan_files(args, parser)
+        return
+    engine_classify = _engine(args.engine)
+    with _limits_applied(_limits_from(args, parser)), _opened_store(args, parser) as store:
+        candidates = _input_candidates(args, parser)
+        if args.jobs > 1:
+            pairs = parallel_verdicts(candidates, args.engine, args.jobs,
+                                      cache_size=max(args.cache_size, 1), store=store)
+        else:
+            seen = ResultCache(args.cache_size) if args.cache_size > 0 else None
+            if store is not None:
+                pairs = _stored_verdict_pairs(candidates, engine_classify, seen, store)
+            else:
+                pairs = _verdict_pairs(candidates, engine_classify, seen)
+        _write_pairs(pairs, args)
+
+
+@contextlib.contextmanager
+def _opened_store(args, parser):
+    """Open the VerdictStore asked for on the command line for the block."""
+    if args.store is None:
+        yield None
+        return
+    import sqlite3
+    from edtf_validate.store import VerdictStore
+    try:
+        store = VerdictStore(args.store, args.store_size)
+    except (ValueError, sqlite3.Error) as error:
+        parser.error('--store: {}'.format(error))
+    with store:
+        yield store
+
+
+def _scan_files(args, parser):
+    """Write out where the candidates in the --file paths are not valid."""
+    # imported here as mapped imports this module
+    from edtf_validate import mapped
+    if args.edtf is not None or not args.files or '-' in args.files:
+        parser.error('--scan needs --file paths and reads neither stdin nor a candidate')
+    counts = {0: 0, 1: 0, 2: 0, None: 0}
+    write = sys.stdout.write
+    with _limits_applied(_limits_from(args, parser)):
+        for path in args.files:
+            try:
+                scan = mapped.scan_file(path, engine=args.engine,
+                                        line_numbers=not args.offsets,
+                                        cache_size=args.cache_size)
+            except OSError as error:
+                parser.error(str(error))
+            for where in scan.invalid:
+                write('{}\t{}\n'.format(path, where))
+            for found in scan.levels:
+                counts[found] += scan.levels[found]
+            counts[None] += len(scan.invalid)
+    if args.summary:
+        _write_summary(counts)
+
+
+def _write_summary(counts):
+    """Write the --summary line for counts per level, None for invalid."""
+    sys.stdout.flush()
+    sys.stderr.write('total={} valid={} invalid={} level0={} level1={} level2={}\n'.format(
+        sum(counts.values()), counts[0] + counts[1] + counts[2], counts[None],
+        counts[0], counts[1], counts[2]))
+
+
+def _write_pairs(pairs, args):
+    """Write out (candidate, (level, valid)) pairs as the output arguments ask."""
+    counts = {0: 0, 1: 0, 2: 0, None: 0}
+    write = sys.stdout.write
+    for edtf_candidate, (level, valid) in pairs:
+        counts[level if valid else None] += 1
+        if valid and args.invalid_only:
+            continue
+        if args.level and valid:
+            result = str(level)
+        elif args.level and valid is False:
+            result = 'invalid'
+        else:
+            # True, False or TOO_EXPENSIVE
+            result = str(valid)
+        write(edtf_candidate + '\t' + result + '\n')
+    if args.summary:
+        _write_summary(counts)
 
 
 if __name__ == '__main__':
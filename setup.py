@@ -21,6 +21,11 @@ setup(
         "argparse",
         "datetime",
     ],
+    extras_require={
+        'numpy': ['numpy'],
+        'pandas': ['pandas'],
+        'arrow': ['pyarrow', 'numpy'],
+    },
     keywords=['edtf', 'extended', 'datetime', 'validate'],
     classifiers=[
         'Natural Language :: English',
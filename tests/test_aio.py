@@ -0,0 +1,162 @@
+import asyncio
+import concurrent.futures
+import time
+
+import pytest
+from edtf_validate import aio, valid_edtf
+from edtf_validate.aio import AsyncValidator
+from edtf_validate.valid_edtf import validate_many
+from tests.test_valid_edtf import L0_L1_L2, invalid_edtf_intervals
+
+candidates = list(L0_L1_L2) + list(invalid_edtf_intervals) + ['Jan 12, 1990']
+
+
+@pytest.fixture
+def threads():
+    executor = concurrent.futures.ThreadPoolExecutor(2)
+    yield executor
+    executor.shutdown()
+
+
+async def _async_candidates(values):
+    for value in values:
+        await asyncio.sleep(0)
+        yield value
+
+
+class TestAsyncValidator(object):
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            AsyncValidator(batch_size=0)
+        with pytest.raises(ValueError):
+            AsyncValidator(max_pending=0)
+        with pytest.raises(ValueError):
+            AsyncValidator(engine='nope')
+
+    @pytest.mark.parametrize('level', [None, 1])
+    def test_concurrent_calls_are_batched(self, threads, level):
+        validator = AsyncValidator(executor=threads, batch_size=16, max_pending=2)
+
+        async def main():
+            return await asyncio.gather(*[validator.validate(candidate, level)
+                                          for candidate in candidates])
+        assert asyncio.run(main()) == list(validate_many(candidates, level))
+
+    @pytest.mark.parametrize('source', [list, _async_candidates])
+    def test_stream_keeps_order(self, threads, source):
+        validator = AsyncValidator(executor=threads, batch_size=7, max_pending=2)
+
+        async def main():
+            return [valid async for valid in validator.validate_stream(source(candidates))]
+        assert asyncio.run(main()) == list(validate_many(candidates))
+
+    def test_stream_reads_ahead_at_most_max_pending_batches(self, threads):
+        validator = AsyncValidator(executor=threads, batch_size=2, max_pending=2)
+        read = []
+
+        def source():
+            for candidate in candidates:
+                read.append(candidate)
+                yield candidate
+
+        async def main():
+            stream = validator.validate_stream(source())
+            first = await stream.__anext__()
+            await stream.aclose()
+            return first
+        assert asyncio.run(main()) is True
+        assert len(read) == 4
+
+    def test_cancelled_call(self, threads):
+        validator = AsyncValidator(executor=threads)
+
+        async def main():
+            task = asyncio.ensure_future(validator.validate('1985'))
+            await asyncio.sleep(0)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return await validator.validate('1985~')
+        assert asyncio.run(main()) is True
+
+    def test_worker_processes(self):
+        async def main():
+            async with AsyncValidator(workers=2, batch_size=8) as validator:
+                single = await validator.validate('2004-06/2006-08')
+                streamed = [valid async for valid in validator.validate_stream(candidates)]
+            return single, streamed
+        single, streamed = asyncio.run(main())
+        assert single is True
+        assert streamed == list(validate_many(candidates))
+
+    def test_worker_processes_not_forked(self):
+        assert aio._executor_context().get_start_method() != 'fork'
+
+    def test_worker_processes_take_limits(self):
+        async def main():
+            async with AsyncValidator(workers=1) as validator:
+                return [valid async for valid in validator.validate_stream(
+                    ['1985', '1985-04-12'])]
+        valid_edtf.enable_limits(max_length=5)
+        try:
+            assert asyncio.run(main()) == [True, valid_edtf.TOO_EXPENSIVE]
+        finally:
+            valid_edtf.disable_limits()
+
+    def test_default_engine_of_the_parent(self, threads, monkeypatch):
+        engines = []
+        initargs = []
+
+        def recording_batch(edtf_candidates, level, engine):
+            engines.append(engine)
+            return list(validate_many(edtf_candidates, level, engine))
+
+        def recording_pool(*args, **kwargs):
+            initargs.append(kwargs['initargs'])
+            return threads
+        monkeypatch.setattr(aio, '_validate_batch', recording_batch)
+        monkeypatch.setattr(aio.concurrent.futures, 'ProcessPoolExecutor', recording_pool)
+        monkeypatch.setattr(valid_edtf, 'DEFAULT_ENGINE', 'scanner')
+        validator = AsyncValidator(batch_size=2)
+
+        async def main():
+            await validator.validate('1985')
+            return [valid async for valid in validator.validate_stream(candidates[:3])]
+        assert asyncio.run(main()) == list(validate_many(candidates[:3]))
+        assert initargs[0][0] == 'scanner'
+        assert set(engines) == {'scanner'}
+
+    def test_stream_shares_pending_batches(self, threads, monkeypatch):
+        running = []
+        most = []
+
+        def counting_batch(edtf_candidates, level, engine):
+            running.append(None)
+            most.append(len(running))
+            time.sleep(0.01)
+            running.pop()
+            return list(validate_many(edtf_candidates, level, engine))
+        monkeypatch.setattr(aio, '_validate_batch', counting_batch)
+        validator = AsyncValidator(executor=threads, batch_size=2, max_pending=1)
+
+        async def main():
+            stream = [valid async for valid in validator.validate_stream(candidates[:8])]
+            return stream, await asyncio.gather(*[validator.validate(candidate)
+                                                  for candidate in candidates[:8]])
+
+        async def both():
+            return await asyncio.gather(main(), main())
+        for stream, single in asyncio.run(both()):
+            assert stream == single == list(validate_many(candidates[:8]))
+        assert max(most) == 1
+
+
+def test_module_functions():
+    async def main():
+        single = await aio.avalidate('2001-21', level=0)
+        streamed = [valid async for valid in aio.avalidate_stream(['1985', 'n.d.'])]
+        return single, streamed
+    try:
+        assert asyncio.run(main()) == (False, [True, False])
+    finally:
+        aio.shutdown()
@@ -0,0 +1,69 @@
+import pytest
+from edtf_validate import valid_edtf
+from tests.test_engines import all_candidates
+
+np = pytest.importorskip('numpy')
+from edtf_validate.arrays import INVALID, validate_array  # noqa: E402
+
+FIXED_WIDTH = [
+    '1985', '0000', '2004-06', '2004-13', '2004-00', '2001-21', '2001-33', '2001-42',
+    '2015-02-29', '2015-02-30', '2004-04-31', '2004-12-31',
+    '2015-02-29/2016', '2016-02-29/2016-03', '2004-06/2004', '2004/2004-06', '1985/1984',
+    '0000/0000', '1985-04-12/1985-04-12', '1900-02-29/1901', '2000-02-29/2001',
+    '2001-21/2001-22', '2004-13/2005',
+]
+
+
+class TestValidateArray(object):
+    @pytest.mark.parametrize('level', [None, 0, 1, 2])
+    def test_same_as_validate_many(self, level):
+        candidates = list(all_candidates) + FIXED_WIDTH
+        expected = list(valid_edtf.validate_many(candidates, level=level))
+        assert validate_array(np.array(candidates), level=level).tolist() == expected
+
+    def test_codes(self):
+        candidates = FIXED_WIDTH + ['2004-06-~11', 'Jan 12, 1990']
+        expected = [
+            valid_edtf.classify(candidate) if valid_edtf.is_valid(candidate) else INVALID
+            for candidate in candidates
+        ]
+        result = validate_array(np.array(candidates), codes=True)
+        assert result.dtype == np.int8
+        assert result.tolist() == expected
+
+    def test_object_array(self):
+        candidates = np.array(['1985', None, float('nan'), '2004-06/2004', '2001-21'],
+                              dtype=object)
+        assert validate_array(candidates).tolist() == [True, False, False, False, True]
+
+    def test_bytes_and_lists(self):
+        assert validate_array(np.array([b'1985', b'1985?'])).tolist() == [True, True]
+        assert validate_array(['1985', 'nope']).tolist() == [True, False]
+        assert validate_array([]).tolist() == []
+
+    def test_long_candidates(self):
+        long_list = '[%s]' % ','.join(str(year) for year in range(1000, 3000))
+        candidates = ['1985', long_list, '1985-04-12/1985-04-13' + '0' * 100, '2004-06/2004-07']
+        assert validate_array(np.array(candidates)).tolist() == [True, True, False, True]
+
+    def test_shape_kept(self):
+        result = validate_array(np.array([['1985', '2001-22'], ['x', '2004']]), codes=True)
+        assert result.tolist() == [[0, 1], [INVALID, 0]]
+
+    def test_limits(self):
+        candidates = ['1985', '1985-04-12', '1985-04-12/1985-04-13']
+        valid_edtf.enable_limits(max_length=6)
+        try:
+            expected = [bool(verdict) for verdict in valid_edtf.validate_many(candidates)]
+            assert expected == [True, False, False]
+            assert validate_array(np.array(candidates)).tolist() == expected
+        finally:
+            valid_edtf.disable_limits()
+
+    def test_not_strings(self):
+        with pytest.raises(TypeError):
+            validate_array(np.array([1985]))
+
+    def test_invalid_level(self):
+        with pytest.raises(ValueError):
+            validate_array(['1985'], level=3)
@@ -0,0 +1,87 @@
+import pytest
+from itertools import chain
+from edtf_validate import valid_edtf
+from edtf_validate.valid_edtf import BatchSummary, is_valid, parallel_verdicts, validate_many
+from tests.test_valid_edtf import (Level0, Level1, L0_L1_L2, invalid_edtf_dates,
+                                   invalid_edtf_intervals)
+
+mixed = list(chain(L0_L1_L2, invalid_edtf_dates, invalid_edtf_intervals))
+
+
+class TestValidateMany(object):
+    def test_same_as_is_valid_in_order(self):
+        assert list(validate_many(mixed)) == [is_valid(date) for date in mixed]
+
+    def test_accepts_any_iterable(self):
+        assert list(validate_many(iter(['1985', 'nope', '1985']))) == [True, False, True]
+
+    @pytest.mark.parametrize('engine', ['pyparsing', 'scanner'])
+    def test_engine(self, engine):
+        assert list(validate_many(mixed, engine=engine)) == [is_valid(date) for date in mixed]
+
+    def test_distinct_strings_parsed_once(self, monkeypatch):
+        calls = []
+
+        def counting_classify(candidate):
+            calls.append(candidate)
+            return valid_edtf.scanner.classify(candidate)
+        monkeypatch.setitem(valid_edtf.ENGINES, 'counting', counting_classify)
+        results = list(validate_many(['1985', '19XX', '1985', '19XX'], engine='counting'))
+        assert results == [True] * 4
+        assert calls == ['1985', '19XX']
+
+    @pytest.mark.parametrize('level, expected', [
+        (0, [True, False, False, False]),
+        (1, [True, True, False, False]),
+        (2, [True, True, True, False]),
+    ])
+    def test_level(self, level, expected):
+        candidates = ['1985', '1985~', '2001-25', '2012-24/2012-21']
+        assert list(validate_many(candidates, level=level)) == expected
+
+    def test_bad_level(self):
+        with pytest.raises(ValueError):
+            validate_many(['1985'], level=3)
+
+    def test_summary(self):
+        summary = BatchSummary()
+        candidates = list(chain(Level0, Level1, ['Jan 12, 1990', '1985', '2012-24/2012-21']))
+        list(validate_many(candidates, summary=summary))
+        assert summary.total == len(candidates)
+        assert summary.levels == {0: len(Level0) + 1, 1: len(Level1), 2: 0}
+        assert summary.invalid == [len(Level0) + len(Level1), len(candidates) - 1]
+
+    def test_uses_result_cache(self):
+        cache = valid_edtf.enable_cache()
+        try:
+            list(validate_many(['1985', '1985']))
+            list(validate_many(['1985']))
+            assert (cache.misses, cache.hits) == (1, 1)
+        finally:
+            valid_edtf.disable_cache()
+
+
+class TestParallel(object):
+    @pytest.mark.parametrize('engine', ['pyparsing', 'scanner'])
+    def test_same_results_in_order(self, engine):
+        candidates = mixed * 3
+        results = validate_many(candidates, engine=engine, workers=2, chunksize=7)
+        assert list(results) == [is_valid(date) for date in candidates]
+
+    def test_summary(self):
+        serial, parallel = BatchSummary(), BatchSummary()
+        list(validate_many(mixed, summary=serial))
+        list(validate_many(mixed, summary=parallel, workers=3, chunksize=5))
+        assert (parallel.total, parallel.levels, parallel.invalid) == (
+            serial.total, serial.levels, serial.invalid)
+
+    def test_pairs(self):
+        pairs = list(parallel_verdicts(iter(['1985', '19XX', 'nope']), 'scanner', 2, 2))
+        assert pairs == [('1985', (0, True)), ('19XX', (1, True)), ('nope', (None, False))]
+
+    def test_empty_input(self):
+        assert list(validate_many([], workers=2)) == []
+
+    def test_unknown_engine(self):
+        with pytest.raises(ValueError):
+            validate_many(['1985'], engine='nope', workers=2)
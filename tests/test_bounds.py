@@ -0,0 +1,98 @@
+import datetime
+import pytest
+from edtf_validate import bounds
+from edtf_validate.bounds import day_number, first_day, last_day, resolve
+
+
+class TestDayNumber(object):
+    def test_epoch(self):
+        assert day_number(1970, 1, 1) == 0
+
+    def test_matches_datetime(self):
+        epoch = datetime.date(1970, 1, 1).toordinal()
+        date = datetime.date(1, 1, 1)
+        while date.year < 2401:
+            assert day_number(date.year, date.month, date.day) == date.toordinal() - epoch
+            date += datetime.timedelta(days=7)
+
+    @pytest.mark.parametrize('year', [-10001, -401, -5, -1, 0])
+    def test_continuous_before_year_one(self, year):
+        assert day_number(year + 1, 1, 1) - day_number(year, 12, 31) == 1
+        assert day_number(year, 3, 1) - day_number(year, 2, 28) == (
+            2 if bounds.is_leap(year) else 1)
+
+    def test_leap_years(self):
+        assert [bounds.is_leap(year) for year in (0, -4, -100, -400, 1900, 2000)] == [
+            True, True, False, True, False, True]
+
+
+class TestResolve(object):
+    @pytest.mark.parametrize('date, earliest, latest', [
+        ('1985', (1985, None, None, None), (1985, None, None, None)),
+        ('-0333-06-01', (-333, 6, 1, None), (-333, 6, 1, None)),
+        ('198X', (1980, None, None, None), (1989, None, None, None)),
+        ('-198X', (-1989, None, None, None), (-1980, None, None, None)),
+        ('-XXXX', (-9999, None, None, None), (-1, None, None, None)),
+        ('-X000', (-9000, None, None, None), (-1000, None, None, None)),
+        ('2004-XX', (2004, 1, None, None), (2004, 12, None, None)),
+        ('2004-1X-XX', (2004, 10, 1, None), (2004, 12, 31, None)),
+        ('2015-02-XX', (2015, 2, 1, None), (2015, 2, 28, None)),
+        ('2015-XX-31', (2015, 1, 31, None), (2015, 12, 31, None)),
+        ('2001-22', (2001, 5, None, 22), (2001, 8, None, 22)),
+        ('Y-17E7', (-170000000, None, None, None), (-170000000, None, None, None)),
+    ])
+    def test_resolve(self, date, earliest, latest):
+        assert resolve(date) == earliest
+        assert resolve(date, latest=True) == latest
+
+    @pytest.mark.parametrize('date', [
+        '2015-02-29', '2004-13', '2004-00', '2004-04-31', '2001-21-01', '2001-25',
+        '198', '1985-04-12T23:20:30', '..', 'XX-XX', 'Y', '-0000', '-0000-21',
+    ])
+    def test_not_a_date(self, date):
+        assert resolve(date) is None
+        assert resolve(date, latest=True) is None
+
+    @pytest.mark.parametrize('date, year', [
+        ('Y999999999999999999', 999999999999999999),
+        ('Y1E10000000', bounds.SATURATED_YEAR),
+        ('Y-117E1010000', -bounds.SATURATED_YEAR),
+        ('Y1E' + '9' * 5000, bounds.SATURATED_YEAR),
+    ])
+    def test_long_year_saturated(self, date, year):
+        assert resolve(date) == (year, None, None, None)
+
+    def test_long_year_digits(self):
+        assert bounds.long_year_digits('17', '7') == 9
+        assert bounds.long_year_digits('117', '1010000') == 1010003
+        assert bounds.long_year_digits('000', None) == 0
+        assert bounds.year_digits('1950') == bounds.year_digits('Y-17') == 4
+        assert bounds.year_digits('Y1E5000') == 5001
+
+    def test_first_and_last_day(self):
+        assert first_day(resolve('2016-02')) == day_number(2016, 2, 1)
+        assert last_day(resolve('2016-02')) == day_number(2016, 2, 29)
+        assert last_day(resolve('-0001')) == day_number(-1, 12, 31)
+        assert last_day(resolve('2016-02-03')) == day_number(2016, 2, 3)
+
+
+class TestInOrder(object):
+    @pytest.mark.parametrize('start, end', [
+        ('', ''), ('..', '-2004'), ('2004-06~', '..'), ('2001-21', '2001-22'),
+        ('-2001-24', '2001-21'), ('0000', '0000-12'), ('1985 ', '\t1986'),
+        ('-XXXX', '0000'), ('-X000', '0000'), ('-XXXX', '-0001'),
+        ('Y1E30', 'Y2E30'), ('Y10E29', 'Y1E30'), ('Y-1E5000', 'Y1E4999'),
+        ('Y-1E5000', 'Y-1E4999'), ('Y17E7', 'Y1E19'),
+    ])
+    def test_in_order(self, start, end):
+        assert bounds.in_order(start, end)
+
+    @pytest.mark.parametrize('start, end', [
+        ('2001-22', '2001-21'), ('2001-24', '2001-23'), ('2004-06', '2004'),
+        ('..', '2004-13'), ('2004-02-30', ''), ('nope', '2004'),
+        ('0000', '-X000'), ('0000', '-XXXX'), ('0000-06', '-0XXX-12'),
+        ('Y2E30', 'Y1E30'), ('Y1E5000', 'Y1E4999'), ('Y-1E4999', 'Y-1E5000'),
+        ('Y1E19', 'Y17E7'),
+    ])
+    def test_not_in_order(self, start, end):
+        assert not bounds.in_order(start, end)
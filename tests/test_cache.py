@@ -0,0 +1,80 @@
+import pytest
+from edtf_validate import valid_edtf
+from edtf_validate.cache import ResultCache
+from tests.test_valid_edtf import L0_L1_L2, invalid_edtf_intervals
+
+
+@pytest.fixture
+def cache():
+    yield valid_edtf.enable_cache(maxsize=8)
+    valid_edtf.disable_cache()
+
+
+class TestResultCache(object):
+    def test_miss_then_hit(self):
+        results = ResultCache(maxsize=2)
+        assert results.get('1985') is None
+        results.put('1985', 0)
+        assert results.get('1985') == 0
+        assert (results.hits, results.misses, results.evictions) == (1, 1, 0)
+        assert results.hit_rate == 0.5
+
+    def test_least_recently_used_is_evicted(self):
+        results = ResultCache(maxsize=2)
+        results.put('a', 1)
+        results.put('b', 2)
+        results.get('a')
+        results.put('c', 3)
+        assert results.get('b') is None
+        assert results.get('a') == 1
+        assert results.get('c') == 3
+        assert results.evictions == 1
+        assert len(results) == 2
+
+    def test_clear(self):
+        results = ResultCache(maxsize=2)
+        results.put('a', 1)
+        results.get('a')
+        results.clear()
+        assert results.stats() == {
+            'hits': 0, 'misses': 0, 'evictions': 0, 'size': 0, 'maxsize': 2, 'hit_rate': 0.0,
+        }
+
+    def test_invalid_maxsize(self):
+        with pytest.raises(ValueError):
+            ResultCache(maxsize=0)
+
+
+class TestValidationCache(object):
+    def test_disabled_by_default(self):
+        assert valid_edtf.result_cache is None
+
+    def test_repeats_are_hits(self, cache):
+        for _ in range(3):
+            assert valid_edtf.is_valid('1900/1999')
+            assert valid_edtf.isLevel0('1900/1999')
+            assert valid_edtf.conformsLevel1('1900/1999')
+        assert cache.misses == 1
+        assert cache.hits == 8
+
+    def test_interval_result_is_cached(self, cache):
+        assert not valid_edtf.is_valid('2012-24/2012-21')
+        assert valid_edtf.isLevel1('2012-24/2012-21')
+        assert not valid_edtf.is_valid('2012-24/2012-21')
+        assert cache.stats()['size'] == 1
+
+    @pytest.mark.parametrize('date', L0_L1_L2)
+    def test_same_results_when_cached(self, cache, date):
+        for _ in range(2):
+            assert valid_edtf.is_valid(date)
+            assert valid_edtf.conformsLevel2(date)
+
+    @pytest.mark.parametrize('date', invalid_edtf_intervals)
+    def test_same_invalid_results_when_cached(self, cache, date):
+        for _ in range(2):
+            assert not valid_edtf.is_valid(date)
+
+    def test_unknown_engine_on_hit(self, cache):
+        valid_edtf.is_valid('1985')
+        with pytest.raises(ValueError):
+            valid_edtf.is_valid('1985', engine='nope')
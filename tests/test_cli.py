@@ -0,0 +1,85 @@
+import io
+import pytest
+from edtf_validate.valid_edtf import main
+
+
+@pytest.fixture
+def dates_file(tmp_path):
+    path = tmp_path / 'dates.txt'
+    path.write_text('1985\n19XX\nJan 12, 1990\n1985\n2012-24/2012-21\n', encoding='utf-8')
+    return str(path)
+
+
+class TestMain(object):
+    def test_single_candidate(self, capsys):
+        main(['2015'])
+        assert capsys.readouterr().out == '2015\tTrue\n'
+
+    def test_single_candidate_level(self, capsys):
+        main(['2001-25', '--level'])
+        assert capsys.readouterr().out == '2001-25\t2\n'
+
+    def test_file(self, capsys, dates_file):
+        main(['--file', dates_file])
+        assert capsys.readouterr().out == (
+            '1985\tTrue\n19XX\tTrue\nJan 12, 1990\tFalse\n1985\tTrue\n2012-24/2012-21\tFalse\n'
+        )
+
+    def test_several_files(self, capsys, dates_file):
+        main(['-f', dates_file, '-f', dates_file, '--invalid-only'])
+        assert capsys.readouterr().out.count('\tFalse\n') == 4
+
+    def test_stdin(self, capsys, monkeypatch):
+        monkeypatch.setattr('sys.stdin', io.StringIO('1985\n[n.d.]\n'))
+        main(['--engine', 'scanner'])
+        assert capsys.readouterr().out == '1985\tTrue\n[n.d.]\tFalse\n'
+
+    def test_dash_reads_stdin(self, capsys, monkeypatch):
+        monkeypatch.setattr('sys.stdin', io.StringIO('1985~'))
+        main(['-f', '-', '--level'])
+        assert capsys.readouterr().out == '1985~\t1\n'
+
+    def test_missing_file(self, capsys, tmp_path):
+        with pytest.raises(SystemExit) as exit_info:
+            main(['-f', str(tmp_path / 'missing.txt')])
+        assert exit_info.value.code == 2
+        assert 'missing.txt' in capsys.readouterr().err
+
+    def test_undecodable_line(self, capsys, tmp_path):
+        path = tmp_path / 'dates.txt'
+        path.write_bytes(b'1985\n19\xff5\n2001-21\n')
+        main(['-f', str(path), '--summary'])
+        captured = capsys.readouterr()
+        assert captured.out == '1985\tTrue\n19\ufffd5\tFalse\n2001-21\tTrue\n'
+        assert captured.err == 'total=3 valid=2 invalid=1 level0=1 level1=1 level2=0\n'
+
+    def test_undecodable_stdin(self, capsys, monkeypatch):
+        monkeypatch.setattr('sys.stdin', io.TextIOWrapper(io.BytesIO(b'\xff\n1985\n'),
+                                                          encoding='utf-8'))
+        main(['--invalid-only'])
+        assert capsys.readouterr().out == '\ufffd\tFalse\n'
+
+    @pytest.mark.parametrize('cache_size', ['0', '1', '100'])
+    def test_invalid_only_level_summary(self, capsys, dates_file, cache_size):
+        main(['-f', dates_file, '--invalid-only', '--level', '--summary',
+              '--cache-size', cache_size])
+        captured = capsys.readouterr()
+        assert captured.out == 'Jan 12, 1990\tinvalid\n2012-24/2012-21\tinvalid\n'
+        assert captured.err == 'total=5 valid=3 invalid=2 level0=2 level1=1 level2=0\n'
+
+    def test_jobs(self, capsys, dates_file):
+        main(['-f', dates_file, '--jobs', '2', '--summary'])
+        captured = capsys.readouterr()
+        assert captured.out == (
+            '1985\tTrue\n19XX\tTrue\nJan 12, 1990\tFalse\n1985\tTrue\n2012-24/2012-21\tFalse\n'
+        )
+        assert captured.err == 'total=5 valid=3 invalid=2 level0=2 level1=1 level2=0\n'
+
+    def test_limits(self, capsys, dates_file):
+        main(['-f', dates_file, '--max-length', '6', '--level'])
+        assert capsys.readouterr().out == (
+            '1985\t0\n19XX\t1\nJan 12, 1990\tTOO_EXPENSIVE\n1985\t0\n'
+            '2012-24/2012-21\tTOO_EXPENSIVE\n'
+        )
+        main(['1985-04-12'])
+        assert capsys.readouterr().out == '1985-04-12\tTrue\n'
@@ -0,0 +1,102 @@
+import pytest
+from edtf_validate import valid_edtf
+from tests.test_engines import all_candidates
+
+pd = pytest.importorskip('pandas')
+from edtf_validate.columns import LEVELS, column_levels, validate_column  # noqa: E402
+
+CANDIDATES = list(all_candidates) + ['1985', '1985', '2001-21', 'Jan 12, 1990']
+
+
+def expected_levels(candidates):
+    return [valid_edtf.classify(candidate) if valid_edtf.is_valid(candidate) else None
+            for candidate in candidates]
+
+
+class TestSeries(object):
+    @pytest.mark.parametrize('level', [None, 0, 1, 2])
+    def test_same_as_validate_many(self, level):
+        series = pd.Series(CANDIDATES)
+        expected = list(valid_edtf.validate_many(CANDIDATES, level=level))
+        assert validate_column(series, level=level).tolist() == expected
+
+    def test_index_and_name_kept(self):
+        series = pd.Series(['1985', 'n.d.'], index=[10, 20], name='date')
+        result = validate_column(series)
+        assert result.name == 'date'
+        assert result.index.tolist() == [10, 20]
+
+    def test_missing_values_invalid(self):
+        series = pd.Series(['1985', None, float('nan'), '2001-21'])
+        assert validate_column(series).tolist() == [True, False, False, True]
+
+    def test_categorical(self):
+        series = pd.Series(CANDIDATES, dtype='category')
+        assert validate_column(series).tolist() == list(valid_edtf.validate_many(CANDIDATES))
+
+    def test_levels(self):
+        result = column_levels(pd.Series(CANDIDATES))
+        assert list(result.cat.categories) == list(LEVELS)
+        assert [None if pd.isna(found) else found for found in result] == \
+            expected_levels(CANDIDATES)
+
+    def test_accessor(self):
+        series = pd.Series(['1985', '2001-21', 'n.d.'])
+        assert series.edtf.is_valid(level=0).tolist() == [True, False, False]
+        assert series.edtf.level().tolist()[:2] == [0, 1]
+
+    def test_limits(self):
+        valid_edtf.enable_limits(max_length=6)
+        try:
+            result = validate_column(pd.Series(['1985', '1985-04-12']))
+        finally:
+            valid_edtf.disable_limits()
+        assert result.tolist() == [True, False]
+
+    def test_bad_arguments(self):
+        with pytest.raises(ValueError):
+            validate_column(pd.Series(['1985']), level=3)
+        with pytest.raises(TypeError):
+            validate_column(['1985'])
+
+
+@pytest.fixture
+def pa():
+    return pytest.importorskip('pyarrow')
+
+
+class TestArrow(object):
+    def test_same_as_validate_many(self, pa):
+        array = pa.array(CANDIDATES + [None])
+        expected = list(valid_edtf.validate_many(CANDIDATES)) + [False]
+        assert validate_column(array).to_pylist() == expected
+
+    def test_chunked_and_dictionary(self, pa):
+        array = pa.array(CANDIDATES).dictionary_encode()
+        chunked = pa.chunked_array([array, array])
+        result = validate_column(chunked, level=0)
+        assert isinstance(result, pa.ChunkedArray)
+        assert result.to_pylist() == list(valid_edtf.validate_many(CANDIDATES, level=0)) * 2
+
+    def test_chunks_share_verdicts(self, pa, monkeypatch):
+        calls = []
+
+        def counting_classify(candidate):
+            calls.append(candidate)
+            return valid_edtf.scanner.classify(candidate)
+        monkeypatch.setitem(valid_edtf.ENGINES, 'counting', counting_classify)
+        chunked = pa.chunked_array([['1985~', '[1667,1668]', None]] * 50)
+        result = validate_column(chunked, engine='counting')
+        assert result.num_chunks == 50
+        assert result.to_pylist() == [True, True, False] * 50
+        assert sorted(calls) == ['1985~', '[1667,1668]']
+        assert column_levels(chunked.dictionary_encode()).to_pylist() == [1, 2, None] * 50
+
+    def test_empty_chunked(self, pa):
+        assert validate_column(pa.chunked_array([], type=pa.string())).to_pylist() == []
+        assert column_levels(pa.chunked_array([[]], type=pa.string())).to_pylist() == []
+
+    def test_levels(self, pa):
+        result = column_levels(pa.array(CANDIDATES + [None]))
+        assert pa.types.is_dictionary(result.type)
+        assert result.to_pylist() == expected_levels(CANDIDATES) + [None]
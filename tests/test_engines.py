@@ -0,0 +1,54 @@
+import pytest
+from itertools import chain
+from edtf_validate import valid_edtf
+from edtf_validate.valid_edtf import ENGINES, classify, is_valid
+from tests.test_valid_edtf import (L0_L1_L2, invalid_edtf_dates, invalid_edtf_datetimes,
+                                   invalid_edtf_intervals)
+
+all_candidates = list(chain(L0_L1_L2, invalid_edtf_dates, invalid_edtf_datetimes,
+                            invalid_edtf_intervals, [
+                                '1985\n',
+                                '[1667,\t1668]',
+                                '2004-06-1X',
+                                '1985-04-12T23:20:30+12:60',
+                                '[1670..1672,1680..1690]',
+                                '{..1984,1990..}',
+                                'Y12345E',
+                            ]))
+
+
+@pytest.mark.parametrize('engine', ['optimized', 'scanner'])
+class TestEngines(object):
+    @pytest.mark.parametrize('date', all_candidates)
+    def test_same_level_as_pyparsing(self, engine, date):
+        assert classify(date, engine=engine) == classify(date, engine='pyparsing')
+
+    @pytest.mark.parametrize('date', all_candidates)
+    def test_same_validity_as_pyparsing(self, engine, date):
+        assert is_valid(date, engine=engine) == is_valid(date, engine='pyparsing')
+
+
+@pytest.mark.parametrize('engine', sorted(ENGINES))
+@pytest.mark.parametrize('date', [
+    ' [1667,1668] ', '\t{1667 ,\n1668}', '[1667,1668 ]', '{-1667,1668 ,1670..1672}',
+    '[1760-12.. ]', '{1667?\r,1668~ }', '[1667 ,1668', '[1667, 1668]', '[ ..1668]',
+    '[1667 ..1668]', '[16 67,1668]',
+])
+def test_list_whitespace_as_grammar(engine, date):
+    # whitespace the engines are handed lists without, or left to the grammar
+    assert classify(date, engine=engine) == valid_edtf._classify_grammar(date)
+
+
+class TestEngineSelection(object):
+    def test_engines(self):
+        assert sorted(ENGINES) == ['optimized', 'pyparsing', 'scanner']
+
+    def test_default_engine(self, monkeypatch):
+        monkeypatch.setattr(valid_edtf, 'DEFAULT_ENGINE', 'nope')
+        with pytest.raises(ValueError):
+            is_valid('1985')
+        assert is_valid('1985', engine='scanner')
+
+    def test_unknown_engine(self):
+        with pytest.raises(ValueError):
+            classify('1985', engine='nope')
@@ -0,0 +1,91 @@
+import random
+import pytest
+from edtf_validate import valid_edtf
+from edtf_validate.bounds import day_number
+from edtf_validate.index import AFTER_ALL, BEFORE_ALL, RangeIndex
+from edtf_validate.valid_edtf import parse
+from tests.test_engines import all_candidates
+
+RECORDS = ['1850', '1860/1875', '1985/..', '../1790', '19XX', '1871-22', '[1667,1868]',
+           '1869-04-01']
+
+
+@pytest.fixture
+def index():
+    return RangeIndex(RECORDS, engine='scanner')
+
+
+class TestRangeIndex(object):
+    def test_overlapping(self, index):
+        assert index.overlapping('1850/1870') == [
+            '[1667,1868]', '1850', '1860/1875', '1869-04-01']
+        assert index.overlapping('1871-22') == ['1860/1875', '1871-22']
+        assert index.overlapping('1999') == ['19XX', '1985/..']
+
+    def test_containing(self, index):
+        assert index.containing('1869') == ['1860/1875']
+        assert index.at(day_number(1790, 12, 31)) == ['../1790', '[1667,1868]']
+        assert index.at('3000-01-01') == ['1985/..']
+
+    def test_within(self, index):
+        assert index.within('1850/1870') == ['1850', '1869-04-01']
+        assert index.within((None, day_number(1800))) == ['../1790']
+
+    def test_values_and_skipped(self):
+        index = RangeIndex(['1985', 'Jan 12, 1990', '2004-06/2004'], values=['a', 'b', 'c'])
+        assert len(index) == 1
+        assert index.skipped == 2
+        assert index.insert('1986', 'd')
+        assert not index.insert('nope')
+        assert index.overlapping('1985/1986') == ['a', 'd']
+
+    def test_invalid_query(self, index):
+        with pytest.raises(ValueError):
+            index.overlapping('Jan 12, 1990')
+
+    def test_limits(self):
+        valid_edtf.enable_limits(max_length=10)
+        try:
+            index = RangeIndex(['1985', '1985-04-12/1986'], engine='scanner')
+            assert len(index) == 1
+            assert index.skipped == 1
+            with pytest.raises(ValueError):
+                index.overlapping('1985-04-12/1986')
+        finally:
+            valid_edtf.disable_limits()
+
+    def test_reversed_consecutives(self):
+        index = RangeIndex(['[1990..1980]'])
+        assert index.overlapping('1985') == ['[1990..1980]']
+
+    def test_runs_stay_few(self):
+        index = RangeIndex()
+        for year in range(1000, 2024):
+            index.insert('%04d' % year)
+        assert len(index) == 1024
+        assert len(index._runs) <= 11
+        assert index.overlapping('1500') == ['1500']
+
+    def test_matches_linear_scan(self):
+        candidates = list(all_candidates)
+        index = RangeIndex(candidates[:150], engine='scanner')
+        for candidate in candidates[150:]:
+            index.insert(candidate)
+        spans = []
+        for candidate in candidates:
+            result = parse(candidate, engine='scanner')
+            if result is not None:
+                spans.append((
+                    BEFORE_ALL if result.earliest is None else result.earliest,
+                    AFTER_ALL if result.latest is None else result.latest,
+                    candidate))
+        rng = random.Random(0)
+        for _ in range(500):
+            first = rng.randint(-800000, 30000)
+            last = first + rng.randint(0, 40000)
+            assert sorted(index.overlapping((first, last))) == sorted(
+                c for start, end, c in spans if start <= last and end >= first)
+            assert sorted(index.containing((first, last))) == sorted(
+                c for start, end, c in spans if start <= first and end >= last)
+            assert sorted(index.within((first, last))) == sorted(
+                c for start, end, c in spans if start >= first and end <= last)
@@ -0,0 +1,125 @@
+import itertools
+import pickle
+
+import pytest
+from edtf_validate import limits as limits_module
+from edtf_validate import valid_edtf
+from edtf_validate.limits import TOO_EXPENSIVE, Limits
+
+
+@pytest.fixture
+def limits():
+    yield valid_edtf.enable_limits(max_length=40, max_list_elements=4, max_year_digits=6)
+    valid_edtf.disable_limits()
+
+
+@pytest.fixture
+def slow_clock(monkeypatch):
+    """Make every reading of the clock a second later than the last."""
+    seconds = itertools.count()
+    monkeypatch.setattr(limits_module.time, 'monotonic', lambda: next(seconds))
+
+
+class TestLimits(object):
+    @pytest.mark.parametrize('kwargs', [
+        {'max_length': 0},
+        {'max_list_elements': 0},
+        {'max_year_digits': 0},
+        {'time_budget': 0},
+    ])
+    def test_invalid_limits(self, kwargs):
+        with pytest.raises(ValueError):
+            Limits(**kwargs)
+
+    @pytest.mark.parametrize('candidate, admitted', [
+        ('1985-04-12', True),
+        ('1985-04-12T23:20:30+04:00/1985-04-12T23:20:30+04:00', False),
+        ('[1667,1668,1670..1672,1680]', True),
+        ('[1667,1668,1670..1672,1680,1690,1700]', False),
+        ('Y170000', True),
+        ('Y1700000', False),
+        ('Y-17E1234567', False),
+        ('Y1E10000000', False),
+        ('Y17E4', True),
+        ('Y17E5', False),
+        ('[1667,Y1E9]', False),
+    ])
+    def test_admits(self, candidate, admitted):
+        assert Limits(max_length=40, max_list_elements=5,
+                      max_year_digits=6).admits(candidate) is admitted
+
+    def test_none_turns_a_limit_off(self):
+        assert Limits(None, None, None).admits('[%s]' % ','.join(['Y' + '9' * 100] * 500))
+
+    def test_too_expensive_is_false_but_distinct(self):
+        assert not TOO_EXPENSIVE
+        assert TOO_EXPENSIVE is not False and TOO_EXPENSIVE != 0
+        assert pickle.loads(pickle.dumps(TOO_EXPENSIVE)) is TOO_EXPENSIVE
+
+
+@pytest.mark.parametrize('engine', sorted(valid_edtf.ENGINES))
+class TestEnforced(object):
+    @pytest.mark.parametrize('candidate', [
+        '1985-04-12T23:20:30+04:00/1985-04-12T23:20:30+04:00',
+        '{1667,1668,1670..1672,1680,1690}',
+        'Y17000000',
+        'Y1E10000000',
+    ])
+    def test_rejected(self, limits, engine, candidate):
+        assert valid_edtf.classify(candidate, engine) is TOO_EXPENSIVE
+        assert valid_edtf.is_valid(candidate, engine) is TOO_EXPENSIVE
+        assert valid_edtf.parse(candidate, engine) is TOO_EXPENSIVE
+        assert valid_edtf.isLevel2(candidate, engine) is TOO_EXPENSIVE
+        assert valid_edtf.conformsLevel2(candidate, engine) is TOO_EXPENSIVE
+
+    @pytest.mark.parametrize('candidate, valid', [
+        ('1985-04-12', True),
+        ('{1667,1668,1670..1672}', True),
+        ('Y170000', True),
+        ('Y17E4', True),
+        ('Jan 12, 1990', False),
+    ])
+    def test_admitted(self, limits, engine, candidate, valid):
+        assert valid_edtf.is_valid(candidate, engine) is valid
+
+    def test_validate_many_counts_rejections_as_invalid(self, limits, engine):
+        summary = valid_edtf.BatchSummary()
+        results = list(valid_edtf.validate_many(['1985', 'Y17000000', '1985/19'],
+                                                engine=engine, summary=summary))
+        assert results == [True, TOO_EXPENSIVE, False]
+        assert results[1] is TOO_EXPENSIVE
+        assert summary.invalid == [1, 2]
+
+    def test_time_budget(self, engine, slow_clock):
+        valid_edtf.enable_limits(time_budget=3)
+        try:
+            assert valid_edtf.is_valid('1985', engine) is True
+            candidate = '[%s]' % ','.join(str(year) for year in range(1000, 1100))
+            assert valid_edtf.is_valid(candidate, engine) is TOO_EXPENSIVE
+        finally:
+            valid_edtf.disable_limits()
+        assert valid_edtf.is_valid(candidate, engine) is True
+
+    def test_rejections_are_not_cached(self, limits, engine):
+        valid_edtf.enable_cache(maxsize=8)
+        try:
+            assert valid_edtf.is_valid('Y17000000', engine) is TOO_EXPENSIVE
+            valid_edtf.disable_limits()
+            assert valid_edtf.is_valid('Y17000000', engine) is True
+        finally:
+            valid_edtf.disable_cache()
+
+    def test_cached_results_are_checked(self, engine):
+        candidate = '[1667,1668,1669]'
+        valid_edtf.enable_cache(maxsize=8)
+        try:
+            assert valid_edtf.is_valid(candidate, engine) is True
+            valid_edtf.enable_limits(max_list_elements=2)
+            assert valid_edtf.is_valid(candidate, engine) is TOO_EXPENSIVE
+            assert valid_edtf.classify(candidate, engine) is TOO_EXPENSIVE
+            assert list(valid_edtf.validate_many([candidate], engine=engine)) == [TOO_EXPENSIVE]
+            valid_edtf.disable_limits()
+            assert valid_edtf.classify(candidate, engine) == 2
+        finally:
+            valid_edtf.disable_limits()
+            valid_edtf.disable_cache()
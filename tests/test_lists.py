@@ -0,0 +1,66 @@
+import pytest
+from pyparsing import ParseException
+from edtf_validate import lists, valid_edtf
+from edtf_validate.valid_edtf import classify
+from tests.test_engines import all_candidates
+
+# whitespace is skipped by the grammar itself, so only lists without any are here
+list_candidates = [candidate for candidate in all_candidates
+                   if candidate[:1] in '[{' and ' ' not in candidate] + [
+    '[1667]',
+    '[1667,1667,1667]',
+    '[1667?,1667?,1667-XX]',
+    '[..1667,1668,1670..]',
+    '[..1667,1668..]',
+    '[1667,..1668]',
+    '[1670..1672,1667]',
+    '[1670..1672,1680..]',
+    '{1667,1668-12-%01,1670..}',
+    '{1667,1668,}',
+    '{,1667}',
+    '[1667,,1668]',
+    '[1667..1668..1669]',
+    '[1667,1668]]',
+    '[1667,1668}',
+    '[]',
+    '{2004-06-~01,2004-06-~01,1985-XX-XX}',
+]
+
+
+def grammar_level(candidate, optimized):
+    """Parse the candidate with the whole level 2 expression only."""
+    try:
+        valid_edtf._whole_expression(2, optimized).parse_string(candidate)
+    except ParseException:
+        return None
+    return 2
+
+
+@pytest.mark.parametrize('engine', sorted(valid_edtf.ENGINES))
+@pytest.mark.parametrize('candidate', list_candidates)
+def test_same_verdict_as_list_grammar(engine, candidate):
+    assert classify(candidate, engine=engine) == grammar_level(candidate, False)
+
+
+@pytest.mark.parametrize('engine', sorted(valid_edtf.ENGINES))
+def test_long_list_grows_linearly(engine, monkeypatch):
+    calls = []
+    memoized = lists._memoized
+
+    def counted(production, s, plain=None):
+        parse = memoized(production, s, plain)
+
+        def counted_parse(i):
+            calls.append(i)
+            return parse(i)
+        return counted_parse
+
+    monkeypatch.setattr(lists, '_memoized', counted)
+    for count in (10, 2000, 20000):
+        del calls[:]
+        # every element distinct, so none is looked up instead of parsed
+        elements = ['%04d-%02d-%02d' % (1000 + i // 336 % 900, i // 28 % 12 + 1, i % 28 + 1)
+                    for i in range(count)]
+        assert classify('[%s,1990..]' % ','.join(elements), engine=engine) == 2
+        # a production is tried at each element a bounded number of times
+        assert len(calls) <= 2 * count + 10
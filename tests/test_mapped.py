@@ -0,0 +1,97 @@
+import pytest
+from edtf_validate import mapped, valid_edtf
+from edtf_validate.mapped import scan_buffer, scan_file
+from edtf_validate.valid_edtf import main
+from tests.test_arrays import FIXED_WIDTH
+from tests.test_engines import all_candidates
+
+# every month and day of the fixed width forms, in and out of range
+FIXED_DATES = ['{}-{:02d}-{:02d}'.format(year, month, day)
+               for year in ('1900', '2000', '2015') for month in range(14) for day in range(33)]
+FIXED_DATES += ['1985-{:02d}'.format(month) for month in range(45)]
+CANDIDATES = [candidate for candidate in list(all_candidates) + FIXED_WIDTH + FIXED_DATES
+              + ['', ' 1985', '1985 ', '19851', 'é']
+              if '\n' not in candidate and '\r' not in candidate]
+
+
+def expected_invalid(candidates, level=None):
+    return [number for number, valid in enumerate(
+        valid_edtf.validate_many(candidates, level=level), 1) if not valid]
+
+
+class TestScanBuffer(object):
+    @pytest.mark.parametrize('level', [None, 0, 1, 2])
+    def test_same_as_validate_many(self, level):
+        scan = scan_buffer('\n'.join(CANDIDATES).encode('utf-8'), level=level)
+        assert list(scan.invalid) == expected_invalid(CANDIDATES, level)
+        assert scan.total == len(CANDIDATES)
+        assert sum(scan.levels.values()) + len(scan.invalid) == scan.total
+
+    def test_offsets(self):
+        data = b'1985\nn.d.\n2004-06\n2001-21\nJan 12, 1990\n'
+        assert list(scan_buffer(data, line_numbers=False).invalid) == [5, 26]
+        assert list(scan_buffer(data, level=0, line_numbers=False).invalid) == [5, 18, 26]
+
+    def test_line_endings(self):
+        scan = scan_buffer(b'1985\r\n\r\n2001-21\r\n\xff\n1986')
+        assert list(scan.invalid) == [2, 4]
+        assert (scan.total, scan.levels) == (5, {0: 2, 1: 1, 2: 0})
+
+    @pytest.mark.parametrize('data, total', [
+        (b'', 0), (b'\n', 1), (b'1985', 1), (b'1985\n', 1), (b'1985\nn.d.', 2)])
+    def test_ends(self, data, total):
+        assert scan_buffer(data).total == total
+
+    def test_long_runs_and_other_buffers(self):
+        data = bytearray(b'1985-04-12\n' * 3000 + b'n.d.\n' + b'2004\n' * 3000)
+        assert list(scan_buffer(data).invalid) == [3001]
+        assert list(scan_buffer(memoryview(data)).invalid) == [3001]
+
+    def test_repeated_lines_parsed_once(self, monkeypatch):
+        calls = []
+
+        def counting_classify(candidate):
+            calls.append(candidate)
+            return valid_edtf.scanner.classify(candidate)
+        monkeypatch.setitem(valid_edtf.ENGINES, 'counting', counting_classify)
+        scan = scan_buffer(b'19XX\n1985\n19XX\n1985~\n19XX\n', engine='counting')
+        assert scan.levels == {0: 1, 1: 4, 2: 0}
+        assert calls == ['19XX', '1985~']
+
+    def test_limits(self):
+        valid_edtf.enable_limits(max_length=6)
+        try:
+            assert not valid_edtf._limits_admit(mapped._LONGEST_DATE)
+            assert list(scan_buffer(b'1985\n1985-04-12\n').invalid) == [2]
+        finally:
+            valid_edtf.disable_limits()
+
+    def test_bad_level(self):
+        with pytest.raises(ValueError):
+            scan_buffer(b'1985', level=3)
+
+
+class TestScanFile(object):
+    def test_file(self, tmp_path):
+        path = tmp_path / 'dates.txt'
+        path.write_bytes('\n'.join(CANDIDATES).encode('utf-8') + b'\n')
+        assert list(scan_file(str(path)).invalid) == expected_invalid(CANDIDATES)
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / 'empty.txt'
+        path.write_bytes(b'')
+        assert scan_file(str(path)).total == 0
+
+    def test_command_line(self, tmp_path, capsys):
+        path = tmp_path / 'dates.txt'
+        path.write_text('1985\n19XX\nJan 12, 1990\n1985\n2012-24/2012-21\n', encoding='utf-8')
+        main(['--scan', '-f', str(path), '--summary'])
+        captured = capsys.readouterr()
+        assert captured.out == '{0}\t3\n{0}\t5\n'.format(path)
+        assert captured.err == 'total=5 valid=3 invalid=2 level0=2 level1=1 level2=0\n'
+        main(['--scan', '--offsets', '-f', str(path)])
+        assert capsys.readouterr().out == '{0}\t10\n{0}\t28\n'.format(path)
+
+    def test_command_line_needs_files(self, capsys):
+        with pytest.raises(SystemExit):
+            main(['--scan', '1985'])
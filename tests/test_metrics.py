@@ -0,0 +1,124 @@
+import pytest
+from edtf_validate import valid_edtf
+from edtf_validate.metrics import Histogram, Registry
+from tests.test_engines import all_candidates
+
+
+@pytest.fixture
+def registry():
+    yield valid_edtf.enable_metrics()
+    valid_edtf.disable_metrics()
+
+
+class TestRegistry(object):
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram((1.0, 2.0))
+        for value in (0.5, 1.0, 1.5, 3.0):
+            histogram.observe(value)
+        assert histogram.cumulative() == [(1.0, 2), (2.0, 3), (float('inf'), 4)]
+        assert (histogram.count, histogram.sum) == (4, 6.0)
+
+    def test_as_dict(self):
+        metrics = Registry(buckets=(1.0,))
+        metrics.inc('calls', entry='is_valid')
+        metrics.inc('calls', 2, entry='is_valid')
+        metrics.inc('matches', production='date', level=0)
+        metrics.observe('seconds', 0.5, phase='grammar')
+        assert metrics.as_dict() == {
+            'calls': {'entry=is_valid': 3},
+            'matches': {'level=0,production=date': 1},
+            'seconds': {'phase=grammar': {
+                'count': 1, 'sum': 0.5, 'buckets': {1.0: 1, float('inf'): 1}}},
+        }
+
+    def test_prometheus(self):
+        metrics = Registry(buckets=(1.0,))
+        assert metrics.prometheus() == ''
+        metrics.inc('calls', entry='is_valid')
+        metrics.observe('seconds', 0.25, phase='interval')
+        assert metrics.prometheus() == (
+            '# HELP edtf_validate_calls_total Calls per validation entry point.\n'
+            '# TYPE edtf_validate_calls_total counter\n'
+            'edtf_validate_calls_total{entry="is_valid"} 1\n'
+            '# HELP edtf_validate_seconds Seconds spent per phase: grammar or interval.\n'
+            '# TYPE edtf_validate_seconds histogram\n'
+            'edtf_validate_seconds_bucket{phase="interval",le="1.0"} 1\n'
+            'edtf_validate_seconds_bucket{phase="interval",le="+Inf"} 1\n'
+            'edtf_validate_seconds_sum{phase="interval"} 0.25\n'
+            'edtf_validate_seconds_count{phase="interval"} 1\n'
+        )
+
+    def test_clear(self):
+        metrics = Registry()
+        metrics.inc('calls', entry='is_valid')
+        metrics.clear()
+        assert metrics.as_dict() == {}
+
+
+class TestRecorded(object):
+    def test_disabled_by_default(self):
+        assert valid_edtf.metrics is None
+
+    def test_entry_points(self, registry):
+        valid_edtf.is_valid('1985')
+        valid_edtf.isLevel1('1985')
+        valid_edtf.conformsLevel2('1985')
+        valid_edtf.classify('1985')
+        valid_edtf.parse('1985')
+        list(valid_edtf.validate_many(['1985']))
+        assert registry.as_dict()['calls'] == {
+            'entry=classify': 1,
+            'entry=conformsLevel2': 1,
+            'entry=isLevel1': 1,
+            'entry=is_valid': 1,
+            'entry=parse': 1,
+            'entry=validate_many': 1,
+        }
+
+    @pytest.mark.parametrize('engine', sorted(valid_edtf.ENGINES))
+    def test_paths_matches_and_timings(self, registry, engine):
+        for candidate in ('1985', '2004-06/2006-08', '[ ..1668]', 'Jan 12, 1990',
+                          '2001-21', '2012/2011'):
+            valid_edtf.is_valid(candidate, engine)
+        recorded = registry.as_dict()
+        assert recorded['paths'] == {'path=engine': 4, 'path=prefilter': 1,
+                                     'path=whitespace': 1}
+        assert recorded['matches'] == {
+            'level=0,production=date': 1,
+            'level=0,production=interval': 2,
+            'level=1,production=season': 1,
+            'level=2,production=choice_list': 1,
+            'level=none,production=none': 1,
+        }
+        assert recorded['seconds']['phase=grammar']['count'] == 5
+        assert recorded['seconds']['phase=interval']['count'] == 2
+
+    @pytest.mark.parametrize('engine', sorted(valid_edtf.ENGINES))
+    def test_same_levels_as_unmeasured(self, engine):
+        candidates = list(all_candidates) + ['[1667, 1668 ]', '{ 1667,\t1668}', ' 1985']
+        expected = [valid_edtf.classify(candidate, engine) for candidate in candidates]
+        registry = valid_edtf.enable_metrics()
+        try:
+            assert [valid_edtf.classify(candidate, engine)
+                    for candidate in candidates] == expected
+        finally:
+            valid_edtf.disable_metrics()
+        assert sum(registry.as_dict()['paths'].values()) == len(candidates)
+
+    def test_cache_batch_and_limits(self, registry):
+        valid_edtf.enable_cache(maxsize=8)
+        valid_edtf.enable_limits(max_length=10)
+        try:
+            valid_edtf.is_valid('1985')
+            valid_edtf.is_valid('1985')
+            valid_edtf.is_valid('1985-04-12T23:20:30')
+        finally:
+            valid_edtf.disable_cache()
+            valid_edtf.disable_limits()
+        list(valid_edtf.validate_many(['2001', '2001']))
+        assert registry.as_dict()['paths'] == {
+            'path=batch': 1,
+            'path=cache': 1,
+            'path=engine': 2,
+            'path=limits': 1,
+        }
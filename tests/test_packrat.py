@@ -0,0 +1,69 @@
+import pytest
+from pyparsing import ParserElement, Word, nums
+from edtf_validate import valid_edtf
+from edtf_validate.packrat import Packrat
+from tests.test_engines import all_candidates
+
+
+@pytest.fixture
+def packrat():
+    yield valid_edtf.enable_packrat(maxsize=64)
+    valid_edtf.disable_packrat()
+
+
+class TestPackrat(object):
+    def test_invalid_maxsize(self):
+        with pytest.raises(ValueError):
+            Packrat(maxsize=0)
+
+    def test_memo_is_bounded(self):
+        packrat = Packrat(maxsize=3)
+        number = Word(nums)
+        expression = number + ',' + number + ',' + number + ',' + number
+        packrat.apply([number, expression])
+        with packrat.memoizing():
+            assert expression.parse_string('1,2,3,4')
+            assert len(packrat._local.memo) == 3
+        assert packrat._local.memo is None
+
+    def test_matches_without_memoizing(self):
+        packrat = Packrat()
+        number = Word(nums)
+        packrat.apply([number])
+        assert list(number.parse_string('12')) == ['12']
+
+    def test_remove(self):
+        packrat = Packrat()
+        number = Word(nums)
+        packrat.apply([number])
+        Packrat.remove([number])
+        assert '_parse' not in vars(number)
+
+
+class TestGrammarPackrat(object):
+    def test_disabled_by_default(self):
+        assert valid_edtf.packrat is None
+
+    def test_pyparsing_left_alone(self, packrat):
+        assert not ParserElement._packratEnabled
+        assert '_parse' not in vars(Word(nums))
+
+    @pytest.mark.parametrize('engine', ['pyparsing', 'optimized'])
+    @pytest.mark.parametrize('date', all_candidates)
+    def test_same_results(self, packrat, engine, date):
+        level = valid_edtf.classify(date, engine=engine)
+        valid_edtf.disable_packrat()
+        assert level == valid_edtf.classify(date, engine=engine)
+
+    def test_levels_built_later_are_memoized(self, packrat, monkeypatch):
+        monkeypatch.setattr(valid_edtf, '_grammars', {})
+        monkeypatch.setattr(valid_edtf, '_whole_expressions', {})
+        assert valid_edtf.isLevel2('[1667,1668,1670..1672]')
+        expression = valid_edtf.get_grammar()['listContent']
+        assert vars(expression)['_parse'].func == packrat._parse
+
+    def test_disable(self, packrat):
+        valid_edtf.isLevel2('[1667,1668,1670..1672]')
+        valid_edtf.disable_packrat()
+        assert valid_edtf.packrat is None
+        assert '_parse' not in vars(valid_edtf.get_grammar()['listContent'])
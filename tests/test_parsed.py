@@ -0,0 +1,168 @@
+import pickle
+import pytest
+from edtf_validate import bounds, valid_edtf
+from edtf_validate.bounds import day_number
+from edtf_validate.parsed import (DAY_DIGITS, INVALID_KEY, KEY_MAX, KEY_MIN, MONTH_DIGITS,
+                                  YEAR_DIGITS, ParsedEDTF)
+from edtf_validate.valid_edtf import parse, sort_key, sort_keys
+from tests.test_engines import all_candidates
+
+
+class TestParse(object):
+    @pytest.mark.parametrize('engine', ['pyparsing', 'optimized', 'scanner'])
+    @pytest.mark.parametrize('date', all_candidates)
+    def test_parsed_when_valid(self, engine, date):
+        result = parse(date, engine=engine)
+        assert (result is not None) == valid_edtf.is_valid(date)
+        if result is not None:
+            assert result.level == valid_edtf.classify(date)
+            if result.earliest is not None and result.latest is not None:
+                assert result.earliest <= result.latest
+
+    @pytest.mark.parametrize('date, kind', [
+        ('1985-04-12', 'date'),
+        ('-1985-04~', 'date'),
+        ('1985-04-12T23:20:30Z', 'datetime'),
+        ('2001-21', 'season'),
+        ('2001-33', 'season'),
+        ('Y170000002', 'long_year'),
+        ('Y-17E7', 'long_year'),
+        ('1950S2', 'significant_digits'),
+        ('2004-06/2006-08', 'interval'),
+        ('[1667,1668]', 'choice_list'),
+        ('{1667,1668}', 'inclusive_list'),
+    ])
+    def test_kind(self, date, kind):
+        assert parse(date).kind == kind
+
+    def test_date(self):
+        assert parse('1985-04') == ParsedEDTF(
+            '1985-04', 0, 'date', ('1985-04',), '', (0,),
+            day_number(1985, 4, 1), day_number(1985, 4, 30))
+
+    def test_interval(self):
+        result = parse('2004-06~/..')
+        assert result.endpoints == ('2004-06~', '..')
+        assert result.qualifiers == '~'
+        assert result.earliest == day_number(2004, 6, 1)
+        assert result.latest is None
+
+    def test_list(self):
+        result = parse('{1667 ,1668,1670..1672}')
+        assert result.text == '{1667,1668,1670..1672}'
+        assert result.endpoints == ('1667', '1668', '1670..1672')
+        assert result.earliest == day_number(1667)
+        assert result.latest == day_number(1672, 12, 31)
+        assert parse('[..1760-12-03,1762]').earliest is None
+
+    def test_qualifiers(self):
+        assert parse('?2004-06-~11').qualifiers == '?~'
+        assert parse('%2004-06-11').qualifiers == '%'
+
+    @pytest.mark.parametrize('date, mask', [
+        ('1985-04-12', 0),
+        ('19XX', 0b00110000),
+        ('2004-XX-XX', MONTH_DIGITS | DAY_DIGITS),
+        ('XXXX-12', YEAR_DIGITS),
+        ('-156X-1X-2X', 0b00010101),
+    ])
+    def test_unspecified(self, date, mask):
+        assert parse(date).unspecified == (mask,)
+
+    @pytest.mark.parametrize('date, earliest, latest', [
+        ('198X', day_number(1980), day_number(1989, 12, 31)),
+        ('2001-22', day_number(2001, 5), day_number(2001, 8, 31)),
+        ('2001-28', day_number(2001, 12), day_number(2002, 2, 28)),
+        ('1950S2', day_number(1900), day_number(1999, 12, 31)),
+        ('-XXXX', day_number(-9999), day_number(-1, 12, 31)),
+        ('Y-17E7', day_number(-170000000), day_number(-170000000, 12, 31)),
+        ('Y171010000S3', day_number(171000000), day_number(171999999, 12, 31)),
+        ('[1990..1980]', day_number(1980), day_number(1990, 12, 31)),
+        ('{1985,1990-06..1990-02}', day_number(1985), day_number(1990, 6, 30)),
+    ])
+    def test_bounds(self, date, earliest, latest):
+        result = parse(date)
+        assert (result.earliest, result.latest) == (earliest, latest)
+
+    @pytest.mark.parametrize('date', [
+        'Y1E5000', 'Y1E5000S3', 'Y117E1010000', 'Y117E1010000S3', 'Y-1E5000S2',
+    ])
+    def test_long_year_saturated(self, date):
+        # far past any 64-bit day number, so the year is not worked out
+        result = parse(date)
+        year = bounds.SATURATED_YEAR if '-' not in date else -bounds.SATURATED_YEAR
+        assert (result.earliest, result.latest) == (day_number(year),
+                                                    day_number(year, 12, 31))
+        assert date in repr(result)
+
+    def test_not_valid(self):
+        assert parse('2004-06/2004') is None
+        assert parse('Jan 12, 1990') is None
+
+
+class TestParsedEDTF(object):
+    def test_immutable(self):
+        result = parse('1985')
+        with pytest.raises(AttributeError):
+            result.level = 2
+        with pytest.raises(AttributeError):
+            del result.kind
+        with pytest.raises(AttributeError):
+            result.extra = True
+
+    def test_no_instance_dict(self):
+        assert not hasattr(parse('1985'), '__dict__')
+
+    def test_hashable_and_picklable(self):
+        result = parse('[1667,1668]')
+        assert pickle.loads(pickle.dumps(result)) == result
+        assert len({result, parse('[1667,1668]')}) == 1
+        assert result != parse('{1667,1668}')
+
+
+class TestSortKey(object):
+    @pytest.mark.parametrize('date', all_candidates)
+    def test_same_as_parse(self, date):
+        result = parse(date)
+        if result is None:
+            assert sort_key(date) is None
+        else:
+            assert sort_key(date) == (
+                KEY_MIN if result.earliest is None else result.earliest,
+                KEY_MAX if result.latest is None else result.latest)
+
+    def test_order(self):
+        dates = ['2000/2001', '1985/..', '1985', '-0001', '19XX', '../1984', '1985-04-12',
+                 '2004-06~', '-1985']
+        assert sorted(dates, key=sort_key) == [
+            '../1984', '-1985', '-0001', '19XX', '1985', '1985/..', '1985-04-12', '2000/2001',
+            '2004-06~']
+
+    def test_clamped(self):
+        assert sort_key('Y17E30') == (KEY_MAX - 1, KEY_MAX - 1)
+        assert sort_key('Y-17E30') == (KEY_MIN + 1, KEY_MIN + 1)
+
+    @pytest.mark.parametrize('date, key', [
+        ('Y1E10000000', (KEY_MAX - 1, KEY_MAX - 1)),
+        ('Y-1E10000000S2', (KEY_MIN + 1, KEY_MIN + 1)),
+    ])
+    def test_clamped_without_building_the_year(self, date, key):
+        # building a ten million digit year would take tens of seconds
+        assert abs(bounds.resolve(date.split('S')[0])[0]) == bounds.SATURATED_YEAR
+        assert sort_key(date) == key
+        assert sort_keys([date, date])[0].tolist() == [key[0]] * 2
+
+    def test_too_expensive(self):
+        valid_edtf.enable_limits(max_length=4)
+        try:
+            assert sort_key('1985-04') is valid_edtf.TOO_EXPENSIVE
+            assert sort_keys(['1985-04'])[0].tolist() == [INVALID_KEY[0]]
+        finally:
+            valid_edtf.disable_limits()
+
+    def test_bulk(self):
+        dates = list(all_candidates) * 2
+        earliest, latest = sort_keys(iter(dates), engine='scanner')
+        assert (earliest.typecode, latest.typecode) == ('q', 'q')
+        assert list(zip(earliest, latest)) == [
+            sort_key(date) or INVALID_KEY for date in dates]
@@ -0,0 +1,138 @@
+import io
+import json
+
+import pytest
+from edtf_validate import records, valid_edtf
+from edtf_validate.records import (jsonl_fields, validate_fields, validate_jsonl,
+                                   validate_xml, xml_fields)
+
+UNTL = b"""<?xml version="1.0" encoding="UTF-8"?>
+<records>
+  <metadata>
+    <meta qualifier="ark">ark:/67531/metapth1</meta>
+    <date qualifier="creation">2004-06</date>
+    <date qualifier="digitized">
+      2015-13-01
+    </date>
+  </metadata>
+  <metadata>
+    <meta qualifier="ark">ark:/67531/metapth2</meta>
+    <date qualifier="creation">19XX</date>
+    <date qualifier="digitized"/>
+  </metadata>
+</records>
+"""
+
+OAI_DC = b"""<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">
+  <ListRecords>
+    <record>
+      <header><identifier>oai:example:1</identifier></header>
+      <metadata>
+        <oai_dc:dc xmlns:oai_dc="http://www.openarchives.org/OAI/2.0/oai_dc/"
+                   xmlns:dc="http://purl.org/dc/elements/1.1/" id="1">
+          <dc:date>1985-04-12</dc:date>
+          <dc:date>Jan 12, 1990</dc:date>
+        </oai_dc:dc>
+      </metadata>
+    </record>
+  </ListRecords>
+</OAI-PMH>
+"""
+DC = '{http://www.openarchives.org/OAI/2.0/oai_dc/}dc'
+DC_NAMESPACES = {'dc': 'http://purl.org/dc/elements/1.1/'}
+
+
+class TestXML(object):
+    def test_untl(self):
+        fields = {'created': "date[@qualifier='creation']", 'date': 'date'}
+        assert list(validate_xml(io.BytesIO(UNTL), 'metadata', fields,
+                                 record_id="meta[@qualifier='ark']")) == [
+            ('ark:/67531/metapth1', 'created', '2004-06', True),
+            ('ark:/67531/metapth1', 'date', '2004-06', True),
+            ('ark:/67531/metapth1', 'date', '2015-13-01', False),
+            ('ark:/67531/metapth2', 'created', '19XX', True),
+            ('ark:/67531/metapth2', 'date', '19XX', True),
+        ]
+
+    def test_dublin_core(self):
+        assert list(validate_xml(io.BytesIO(OAI_DC), DC, 'dc:date', record_id='@id',
+                                 namespaces=DC_NAMESPACES, level=0)) == [
+            ('1', 'dc:date', '1985-04-12', True), ('1', 'dc:date', 'Jan 12, 1990', False)]
+
+    def test_numbered_records(self, tmp_path):
+        path = tmp_path / 'untl.xml'
+        path.write_bytes(UNTL)
+        assert [(number, value) for number, _, value in xml_fields(
+            str(path), 'metadata', "date[@qualifier='creation']")] == [
+                (1, '2004-06'), (2, '19XX')]
+
+    def test_records_dropped_once_read(self, monkeypatch):
+        document = (b'<list>' + b'<record><header/><metadata><dc><date>1985</date></dc>'
+                    b'</metadata></record>' * 10000 + b'</list>')
+        roots = []
+        iterparse = records.ElementTree.iterparse
+
+        def spying_iterparse(source, events):
+            for event, element in iterparse(source, events):
+                if not roots:
+                    roots.append(element)
+                yield event, element
+        monkeypatch.setattr(records.ElementTree, 'iterparse', spying_iterparse)
+        sizes = [len(roots[0]) for _ in xml_fields(io.BytesIO(document), 'dc', 'date')]
+        # only the records parsed ahead from the last chunk read are kept
+        assert len(sizes) == 10000
+        assert max(sizes) < 1000
+
+
+class TestJSONLines(object):
+    LINES = [
+        json.dumps({'id': 'a', 'dates': {'created': '2004-06', 'other': ['1985', None, 7]}}),
+        '',
+        json.dumps({'id': 'b', 'dates': [{'created': 'n.d.'}, {'created': '1985~'}]}),
+        json.dumps({'dates': {}}),
+    ]
+
+    def test_fields(self):
+        fields = {'created': 'dates.created', 'other': 'dates.other'}
+        assert list(validate_jsonl(self.LINES, fields, record_id='id')) == [
+            ('a', 'created', '2004-06', True),
+            ('a', 'other', '1985', True),
+            ('a', 'other', 7, False),
+            ('b', 'created', 'n.d.', False),
+            ('b', 'created', '1985~', True),
+        ]
+
+    def test_level_and_numbered_records(self):
+        assert list(validate_jsonl(self.LINES, 'dates.created', level=0)) == [
+            (1, 'dates.created', '2004-06', True),
+            (3, 'dates.created', 'n.d.', False),
+            (3, 'dates.created', '1985~', False),
+        ]
+
+    def test_file(self, tmp_path):
+        path = tmp_path / 'records.jsonl'
+        path.write_text('\n'.join(self.LINES) + '\n', encoding='utf-8')
+        with open(str(path), encoding='utf-8') as lines:
+            assert len(list(jsonl_fields(lines, ['dates.created', 'dates.other']))) == 5
+
+    def test_malformed_line(self):
+        with pytest.raises(ValueError, match='line 2'):
+            list(jsonl_fields(['{"date": "1985"}', '{"date": '], 'date'))
+
+
+class TestValidateFields(object):
+    def test_values_validated_once(self, monkeypatch):
+        calls = []
+
+        def counting_classify(candidate):
+            calls.append(candidate)
+            return valid_edtf.scanner.classify(candidate)
+        monkeypatch.setitem(valid_edtf.ENGINES, 'counting', counting_classify)
+        values = [(number, 'date', '19XX') for number in range(5)]
+        assert [valid for _, _, _, valid in validate_fields(values, engine='counting')] == [
+            True] * 5
+        assert calls == ['19XX']
+
+    def test_bad_level(self):
+        with pytest.raises(ValueError):
+            list(validate_fields([], level=3))
@@ -0,0 +1,171 @@
+import io
+import json
+import socket
+import threading
+
+import pytest
+from edtf_validate import server, valid_edtf
+from edtf_validate.limits import TOO_EXPENSIVE
+
+
+@pytest.fixture(params=['tcp', 'unix'])
+def address(request, tmp_path):
+    if request.param == 'tcp':
+        running = server.make_server(server.Validator(), port=0)
+        host, port = running.server_address[:2]
+        address = {'host': host, 'port': port}
+    else:
+        path = str(tmp_path / 'edtf.sock')
+        running = server.make_server(server.Validator(), socket_path=path)
+        address = {'socket_path': path}
+    thread = threading.Thread(target=running.serve_forever, daemon=True)
+    thread.start()
+    yield address
+    running.shutdown()
+    running.server_close()
+
+
+def exchange(address, payload):
+    """Send payload in one go, then read every answer line."""
+    if 'socket_path' in address:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(address['socket_path'])
+    else:
+        connection = socket.create_connection((address['host'], address['port']))
+    with connection:
+        connection.sendall(payload.encode('utf-8'))
+        connection.shutdown(socket.SHUT_WR)
+        return connection.makefile('r', encoding='utf-8').read().splitlines()
+
+
+class TestValidator(object):
+    def test_plain_lines(self):
+        validator = server.Validator()
+        assert validator.respond('1985') == 'True'
+        assert validator.respond('{1667,1668}') == 'True'
+        assert validator.respond('2012/2011') == 'False'
+
+    def test_batch(self):
+        answer = server.Validator().respond(json.dumps(
+            {'id': 'a', 'candidates': ['1985', '2001-21', 'n.d.'], 'level': 0}))
+        assert json.loads(answer) == {'id': 'a', 'valid': [True, False, False],
+                                      'levels': [0, 1, None]}
+
+    @pytest.mark.parametrize('request_line', [
+        '{"id": 1}',
+        '{"id": 1, "candidates": "1985"}',
+        '{"id": 1, "candidates": ["1985"], "level": 3}',
+        '{"id": 1, "candidates": [',
+    ])
+    def test_malformed_batch(self, request_line):
+        answer = json.loads(server.Validator().respond(request_line))
+        assert set(answer) == {'id', 'error'}
+
+    def test_too_expensive(self):
+        valid_edtf.enable_limits(max_length=6)
+        try:
+            validator = server.Validator(cache_size=0)
+            assert validator.respond('1985-04-12') == 'TOO_EXPENSIVE'
+            assert json.loads(validator.respond('{"candidates": ["1985-04-12"]}')) == {
+                'id': None, 'valid': ['TOO_EXPENSIVE'], 'levels': [None]}
+        finally:
+            valid_edtf.disable_limits()
+
+
+class TestServer(object):
+    def test_pipelined_requests(self, address):
+        lines = ['1985', 'Jan 12, 1990', '{"id": 2, "candidates": ["2004-06~"]}', '1985?']
+        assert exchange(address, '\n'.join(lines)) == [
+            'True', 'False', '{"id": 2, "valid": [true], "levels": [1]}', 'True']
+
+    def test_many_pipelined_lines(self, address):
+        answers = exchange(address, '1985\n2001-21\n' * 20000)
+        assert answers == ['True', 'True'] * 20000
+
+    def test_client(self, address):
+        candidates = ['1985', '2001-21', 'n.d.', '[1667,1668]'] * 10
+        with server.Client(batch_size=3, **address) as client:
+            pairs = list(client.verdicts(candidates))
+            assert pairs == [(candidate, verdict) for candidate, verdict in zip(
+                candidates, [(0, True), (1, True), (None, False), (2, True)] * 10)]
+            assert [valid for _, (_, valid) in client.verdicts(candidates[:2], level=0)] == [
+                True, False]
+
+    def test_client_command(self, address, capsys, monkeypatch):
+        monkeypatch.setattr('sys.stdin', io.StringIO('1985\n19XX\nJan 12, 1990\n'))
+        if 'socket_path' in address:
+            options = ['--socket', address['socket_path']]
+        else:
+            options = ['--host', address['host'], '--port', str(address['port'])]
+        valid_edtf.main(['client', '--level', '--summary'] + options)
+        captured = capsys.readouterr()
+        assert captured.out == '1985\t0\n19XX\t1\nJan 12, 1990\tinvalid\n'
+        assert captured.err == 'total=3 valid=2 invalid=1 level0=1 level1=1 level2=0\n'
+
+    def test_client_command_unreadable_file(self, address, tmp_path, capsys):
+        if 'socket_path' in address:
+            options = ['--socket', address['socket_path']]
+        else:
+            options = ['--host', address['host'], '--port', str(address['port'])]
+        with pytest.raises(SystemExit) as excinfo:
+            valid_edtf.main(['client', '-f', str(tmp_path / 'missing.txt')] + options)
+        assert excinfo.value.code == 2
+        assert 'missing.txt' in capsys.readouterr().err
+
+
+def test_serve_command_port_in_use(capsys):
+    with socket.socket() as taken:
+        taken.bind(('127.0.0.1', 0))
+        taken.listen()
+        port = taken.getsockname()[1]
+        with pytest.raises(SystemExit) as excinfo:
+            valid_edtf.main(['serve', '--host', '127.0.0.1', '--port', str(port)])
+    assert excinfo.value.code == 2
+    assert 'error:' in capsys.readouterr().err
+
+
+def test_client_command_disconnected(capsys, monkeypatch):
+    with socket.socket() as listening:
+        listening.bind(('127.0.0.1', 0))
+        listening.listen()
+
+        def hang_up():
+            connection, _ = listening.accept()
+            connection.close()
+        thread = threading.Thread(target=hang_up, daemon=True)
+        thread.start()
+        monkeypatch.setattr('sys.stdin', io.StringIO('1985\n'))
+        with pytest.raises(SystemExit) as excinfo:
+            valid_edtf.main(['client', '--host', '127.0.0.1',
+                             '--port', str(listening.getsockname()[1])])
+        thread.join()
+    assert excinfo.value.code == 2
+    assert 'error:' in capsys.readouterr().err
+
+
+def test_long_line_closes_connection():
+    running = server.make_server(server.Validator(), port=0, max_line_length=100)
+    thread = threading.Thread(target=running.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = running.server_address[:2]
+        answers = exchange({'host': host, 'port': port}, '1985\n' + '1' * 1000)
+        assert answers[0] == 'True'
+        assert json.loads(answers[1]) == {
+            'id': None, 'error': 'request line longer than 100 bytes'}
+        assert len(answers) == 2
+    finally:
+        running.shutdown()
+        running.server_close()
+
+
+def test_unix_socket_unsupported(monkeypatch):
+    monkeypatch.delattr(socket, 'AF_UNIX')
+    with pytest.raises(ValueError):
+        server.make_server(server.Validator(), socket_path='edtf.sock')
+    with pytest.raises(ValueError):
+        server.Client(socket_path='edtf.sock')
+
+
+def test_client_decodes_too_expensive():
+    assert server._decode_valid('TOO_EXPENSIVE') is TOO_EXPENSIVE
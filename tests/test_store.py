@@ -0,0 +1,183 @@
+import asyncio
+import concurrent.futures
+import multiprocessing
+import sqlite3
+from itertools import chain
+
+import pytest
+from edtf_validate import store as store_module
+from edtf_validate import valid_edtf
+from edtf_validate.aio import AsyncValidator
+from edtf_validate.store import VerdictStore
+from edtf_validate.valid_edtf import is_valid, main, validate_many
+from tests.test_valid_edtf import L0_L1_L2, invalid_edtf_dates, invalid_edtf_intervals
+
+mixed = list(chain(L0_L1_L2, invalid_edtf_dates, invalid_edtf_intervals))
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'verdicts.sqlite')
+
+
+@pytest.fixture
+def counting(monkeypatch):
+    calls = []
+
+    def counting_classify(candidate):
+        calls.append(candidate)
+        return valid_edtf.scanner.classify(candidate)
+    monkeypatch.setitem(valid_edtf.ENGINES, 'counting', counting_classify)
+    return calls
+
+
+def _use_inherited_store(inherited_id):
+    store = valid_edtf.verdict_store
+    assert id(store._connection) != inherited_id
+    assert store.get_many(['1985']) == {'1985': (0, True)}
+    store.put_many([('2001-21', (1, True))])
+
+
+class TestVerdictStore(object):
+    def test_invalid_max_entries(self, path):
+        with pytest.raises(ValueError):
+            VerdictStore(path, max_entries=0)
+
+    def test_put_and_get(self, path):
+        with VerdictStore(path) as store:
+            store.put_many([('1985', (0, True)), ('2012/2011', (0, False)),
+                            ('n.d.', (None, False))])
+            assert store.get_many(['1985', 'n.d.', 'nope', '1985']) == {
+                '1985': (0, True), 'n.d.': (None, False)}
+            assert (store.hits, store.misses, len(store)) == (2, 1, 3)
+
+    def test_kept_across_runs(self, path):
+        with VerdictStore(path) as store:
+            store.put_many([('1985', (0, True))])
+            assert store.generation == 1
+        with VerdictStore(path) as store:
+            assert store.generation == 2
+            assert store.get_many(['1985']) == {'1985': (0, True)}
+
+    def test_emptied_by_another_version(self, path, monkeypatch):
+        with VerdictStore(path) as store:
+            store.put_many([('1985', (0, True))])
+        monkeypatch.setattr(store_module, '_version', 'another')
+        with VerdictStore(path) as store:
+            assert len(store) == 0
+
+    def test_least_recently_used_trimmed(self, path):
+        with VerdictStore(path, max_entries=2) as store:
+            store.put_many([('1985', (0, True)), ('1986', (0, True))])
+        with VerdictStore(path, max_entries=2) as store:
+            store.get_many(['1985'])
+            store.put_many([('1987', (0, True))])
+            store.compact()
+            assert len(store) == 2
+            assert set(store.get_many(['1985', '1986', '1987'])) == {'1985', '1987'}
+
+    def test_many_lookups(self, path):
+        candidates = [str(year) for year in range(1000, 4000)]
+        with VerdictStore(path) as store:
+            store.put_many((candidate, (0, True)) for candidate in candidates)
+            assert len(store.get_many(candidates)) == len(candidates)
+
+
+class TestEnabled(object):
+    def test_validate_many_reuses_verdicts(self, path, counting):
+        valid_edtf.enable_store(path)
+        try:
+            assert list(validate_many(mixed, engine='counting')) == [
+                is_valid(date) for date in mixed]
+            parsed = len(counting)
+            assert list(validate_many(mixed + ['1999'], engine='counting')) == [
+                is_valid(date) for date in mixed + ['1999']]
+            assert counting[parsed:] == ['1999']
+        finally:
+            valid_edtf.disable_store()
+        assert valid_edtf.verdict_store is None
+
+    def test_parallel_workers_share_the_file(self, path):
+        store = valid_edtf.enable_store(path)
+        try:
+            assert list(validate_many(mixed, workers=2, chunksize=50)) == [
+                is_valid(date) for date in mixed]
+            assert len(store) == len(set(mixed))
+        finally:
+            valid_edtf.disable_store()
+
+    @pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(),
+                        reason='needs fork')
+    def test_forked_child_opens_its_own_connection(self, path):
+        store = valid_edtf.enable_store(path)
+        try:
+            store.put_many([('1985', (0, True))])
+            inherited = store._connection
+            context = multiprocessing.get_context('fork')
+            child = context.Process(target=_use_inherited_store, args=(id(inherited),))
+            child.start()
+            child.join()
+            assert child.exitcode == 0
+            assert store._connection is inherited
+            assert store.get_many(['1985', '2001-21']) == {
+                '1985': (0, True), '2001-21': (1, True)}
+        finally:
+            valid_edtf.disable_store()
+
+    def test_threads_share_the_store(self, path):
+        store = valid_edtf.enable_store(path)
+        try:
+            with concurrent.futures.ThreadPoolExecutor(4) as executor:
+                results = list(executor.map(
+                    lambda date: list(validate_many([date])), mixed * 4))
+            assert results == [[is_valid(date)] for date in mixed * 4]
+            assert len(store) == len(set(mixed))
+        finally:
+            valid_edtf.disable_store()
+
+    def test_async_validator_in_threads(self, path):
+        valid_edtf.enable_store(path)
+        executor = concurrent.futures.ThreadPoolExecutor(2)
+        try:
+            validator = AsyncValidator(executor=executor)
+            assert asyncio.run(validator.validate('1985')) is True
+        finally:
+            executor.shutdown()
+            valid_edtf.disable_store()
+
+    def test_rejections_are_not_stored(self, path):
+        store = valid_edtf.enable_store(path)
+        valid_edtf.enable_limits(max_length=4)
+        try:
+            assert list(validate_many(['1985', '1985-04'])) == [True, valid_edtf.TOO_EXPENSIVE]
+            assert store.get_many(['1985', '1985-04']) == {'1985': (0, True)}
+        finally:
+            valid_edtf.disable_limits()
+            valid_edtf.disable_store()
+
+    def test_limits_before_stored_verdicts(self, path):
+        store = valid_edtf.enable_store(path)
+        store.put_many([('1985-04-12', (0, True)), ('1985', (0, True))])
+        valid_edtf.enable_limits(max_length=5)
+        try:
+            assert list(validate_many(['1985-04-12', '1985'])) == [
+                valid_edtf.TOO_EXPENSIVE, True]
+        finally:
+            valid_edtf.disable_limits()
+            valid_edtf.disable_store()
+
+
+class TestCommandLine(object):
+    def test_store(self, path, tmp_path, capsys, counting):
+        dates = tmp_path / 'dates.txt'
+        dates.write_text('1985\n19XX\nJan 12, 1990\n', encoding='utf-8')
+        for _ in range(2):
+            main(['-f', str(dates), '--store', path, '--engine', 'counting'])
+            assert capsys.readouterr().out == '1985\tTrue\n19XX\tTrue\nJan 12, 1990\tFalse\n'
+        # 'Jan 12, 1990' never reaches the engine
+        assert counting == ['1985', '19XX']
+        assert sqlite3.connect(path).execute('SELECT count(*) FROM verdicts').fetchone() == (3,)
+
+    def test_bad_store(self, tmp_path, capsys):
+        with pytest.raises(SystemExit):
+            main(['1985', '--store', str(tmp_path)])
@@ -1,7 +1,12 @@
+import random
+import subprocess
+import sys
 import pytest
 from itertools import chain
+from edtf_validate import valid_edtf
 from edtf_validate.valid_edtf import (is_valid_interval, is_valid, isLevel0, isLevel1,
-                                      isLevel2, conformsLevel0, conformsLevel1, conformsLevel2)
+                                      isLevel2, conformsLevel0, conformsLevel1, conformsLevel2,
+                                      classify, could_be_valid, get_grammar)
 
 L0_Intervals = [
     '1964/2008',
@@ -269,7 +274,7 @@ invalid_edtf_intervals = [
     '0000-01-03/0000-01',
     '0000/-0001',
     '0000-02/0000',
-    'Y-61000/-2000',
+    '-2000/Y-61000',
     '2004-06-11%/2004-%06',
     '2004-06-11%/2004-06~',
     '2005-07-25T10:10:10Z/2006-01-01T10:10:10Z',
@@ -308,6 +313,58 @@ class TestIsValidInterval(object):
     def test_valid_intervals(self, date):
         assert is_valid_interval(date)
 
+    @pytest.mark.parametrize('date, valid', [
+        # negative dates are ordered by time, not by their digits
+        ('-1984-06-02/-1984-06-03', True),
+        ('-1984-06/-1984-02', False),
+        ('../-1985', True),
+        ('-198X/-1985', True),
+        ('-198X/-1990', False),
+        # X digits of a negative year never stand for 0000
+        ('0000/-X000', False),
+        ('0000/-XXXX', False),
+        ('-XXXX/0000', True),
+        ('-XXXX/-0001', True),
+        # the latest day X digits allow depends on the month and leap years
+        ('2015-01-01/2015-02-2X', True),
+        ('2015-02-20/2015-02-X0', True),
+        ('1906-02-29/2000', False),
+        ('19X6-02-29/1915', False),
+        ('19X6-02-29/1917', True),
+        ('2015-02-3X/2016', False),
+        # long years are beyond what datetime can hold
+        ('Y-61000/-2000', True),
+        ('Y-20000/Y-61000', False),
+        ('2000/Y170000002', True),
+        ('Y17E7/Y170000002', True),
+        ('Y17E8/Y170000002', False),
+    ])
+    def test_interval_order(self, date, valid):
+        assert is_valid_interval(date) is valid
+
+
+class TestDeprecatedIntervalHelpers(object):
+    @pytest.mark.parametrize('call, result', [
+        (lambda: valid_edtf.replace_all('1985?~', valid_edtf.interval_replacements), '1985'),
+        (lambda: valid_edtf.replace_season('2001-21', 'to'), '2001-05'),
+        (lambda: valid_edtf.replace_X_start_month('X1'), '01'),
+        (lambda: valid_edtf.replace_X_end_month('0X'), '09'),
+        (lambda: valid_edtf.replace_X_start_day('X0'), '10'),
+        (lambda: valid_edtf.replace_X_end_day('XX', '2000', '02'), '29'),
+        (lambda: valid_edtf.replace_X_end_day('3X', '2001', '02'), None),
+        (lambda: valid_edtf.X_PATTERN.sub(valid_edtf.replace_X, '19XX/20XX-1X-XX'),
+         '1900/2099-12-31'),
+        (lambda: valid_edtf.zero_year_special_case('0000', '0000-12', 'pos', 'pos'), True),
+        (lambda: valid_edtf.zero_year_special_case('1985', '0000', 'neg', 'pos'), True),
+        (lambda: valid_edtf.zero_year_special_case('0001', '0000', 'neg', 'neg'), False),
+    ])
+    def test_deprecated(self, call, result):
+        with pytest.deprecated_call():
+            assert call() == result
+
+    def test_seasons(self):
+        assert valid_edtf.seasons['24'] == {'from': '10', 'to': '12'}
+
 
 class TestIsValid(object):
     @pytest.mark.parametrize('date', L0_L1_L2)
@@ -320,6 +377,129 @@ class TestIsValid(object):
         assert not is_valid(date)
 
 
+class TestClassify(object):
+    @pytest.mark.parametrize('level, dates', [(0, Level0), (1, Level1), (2, Level2)])
+    def test_classify_level(self, level, dates):
+        assert [classify(date) for date in dates] == [level] * len(dates)
+
+    @pytest.mark.parametrize('date', chain(invalid_edtf_dates, invalid_edtf_datetimes))
+    def test_classify_invalid(self, date):
+        assert classify(date) is None
+
+    @pytest.mark.parametrize('level, dates', [(0, Level0), (1, Level1), (2, Level2)])
+    def test_lowest_possible_level(self, level, dates):
+        # never above the level the grammar finds, so no level is skipped wrongly
+        assert all(valid_edtf._lowest_possible_level(date) <= level for date in dates)
+        # the grammar skips trailing whitespace, even after a qualifier
+        assert all(valid_edtf._lowest_possible_level(date + whitespace) <= level
+                   for date in dates for whitespace in ('\n', '\r', '\t'))
+
+    @pytest.mark.parametrize('date', ['1985?\n', '1985~\r', '1985-04?\r', '2004-06-11%\n'])
+    def test_qualifier_then_whitespace(self, date):
+        assert classify(date) == 1
+        assert is_valid(date)
+
+    @pytest.mark.parametrize('date, level', [
+        ('1985-04-12', 0), ('2001-21', 0), ('1984?', 1), ('-1985', 1), ('1985/..', 1),
+        ('1950S2', 2), ('Y-17E7', 2), ('2004-06-~01', 2), ('1XXX', 2), ('2001-25', 2),
+    ])
+    def test_levels_ruled_out(self, date, level):
+        assert valid_edtf._lowest_possible_level(date) == level
+
+
+def run_python(code):
+    """Run code in a fresh interpreter and return what it printed."""
+    return subprocess.check_output([sys.executable, '-c', code]).decode()
+
+
+class TestGetGrammar(object):
+    def test_import_builds_nothing(self):
+        assert run_python(
+            'from edtf_validate import valid_edtf; print(len(valid_edtf._grammars))'
+        ) == '0\n'
+
+    def test_level0_does_not_build_higher_levels(self):
+        assert run_python(
+            'from edtf_validate import valid_edtf\n'
+            'valid_edtf.isLevel0("1985-04-12")\n'
+            'print(sorted(valid_edtf._grammars))'
+        ) == '[(False, 0)]\n'
+
+    @pytest.mark.parametrize('level, present, absent', [
+        (0, 'level0Expression', 'level1Expression'),
+        (1, 'level1Expression', 'level2Expression'),
+        (2, 'dateTimeString', None),
+    ])
+    def test_levels(self, level, present, absent):
+        grammar = get_grammar(level=level)
+        assert present in grammar
+        assert absent not in grammar
+
+    def test_invalid_level(self):
+        with pytest.raises(ValueError):
+            get_grammar(level=3)
+
+    def test_productions_importable(self):
+        assert valid_edtf.level1Expression is get_grammar()['level1Expression']
+        with pytest.raises(AttributeError):
+            valid_edtf.notAProduction
+
+    def test_build_order_does_not_change_results(self):
+        # leading whitespace is where build order used to leak into results
+        code = (
+            'from edtf_validate import valid_edtf\n'
+            'PREBUILD\n'
+            'print([valid_edtf.classify(c) for c in '
+            '["1984?/2004", "\\r1987/199X", "\\t1985", "[1667, 1668]", "2004-06~"]])'
+        )
+        assert (run_python(code.replace('PREBUILD', 'valid_edtf.isLevel1("1984?")'))
+                == run_python(code.replace('PREBUILD', 'valid_edtf.get_grammar()')))
+
+
+def random_candidates(count, seed=0):
+    """Build EDTF-like strings by mutating and joining valid ones."""
+    rnd = random.Random(seed)
+    alphabet = '0123456789-/X?~%.,[]{}YESTZ:+ \n'
+    for _ in range(count):
+        chars = list(rnd.choice(L0_L1_L2))
+        if rnd.random() < 0.2:
+            chars += rnd.choice('/,.') + rnd.choice(L0_L1_L2)
+        for _ in range(rnd.randint(0, 2)):
+            position = rnd.randint(0, len(chars))
+            if rnd.random() < 0.5:
+                chars.insert(position, rnd.choice(alphabet))
+            elif chars:
+                del chars[min(position, len(chars) - 1)]
+        yield ''.join(chars)
+
+
+class TestCouldBeValid(object):
+    @pytest.mark.parametrize('date', L0_L1_L2)
+    def test_valid_passes(self, date):
+        assert could_be_valid(date)
+
+    @pytest.mark.parametrize('date', [
+        'Jan 12, 1990',
+        'circa 1850s',
+        '[n.d.]',
+        '',
+        '19',
+        '2012///4444',
+        '2012-10-10T10:50:10Z15:',
+        '1985-04-12T23:20:30+04:30/1985-04-12T23:20:30',
+    ])
+    def test_junk_rejected(self, date):
+        assert not could_be_valid(date)
+
+    def test_never_rejects_grammar_match(self):
+        # property: anything a level expression accepts passes the filter
+        grammar = get_grammar()
+        expressions = [grammar['level%dExpression' % level] for level in range(3)]
+        for candidate in random_candidates(2000):
+            if not could_be_valid(candidate):
+                assert not any(candidate == expression for expression in expressions)
+
+
 class TestLevel0(object):
     @pytest.mark.parametrize('date', Level0)
     def test_valid_level_0(self, date):